@@ -3,7 +3,7 @@
 # Copyright (c) 2018 Steven H. Berguin
 # Distributed under the terms of the MIT License.
 
-from . import core, model, synthetic, utils
+from . import core, model, search, synthetic, utils
 
 __version__ = "1.0.8"
 
@@ -11,6 +11,7 @@ __all__ = [
     "__version__",
     "core",
     "model",
+    "search",
     "utils",
     "synthetic",
 ]
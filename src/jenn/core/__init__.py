@@ -6,10 +6,14 @@
 from . import (
     activation,
     cache,
+    callbacks,
+    checkpoint,
     cost,
     data,
+    ensemble,
     optimization,
     parameters,
+    profiling,
     propagation,
     training,
 )
@@ -17,10 +21,14 @@ from . import (
 __all__ = [
     "activation",
     "cache",
+    "callbacks",
+    "checkpoint",
     "cost",
     "data",
+    "ensemble",
     "optimization",
     "parameters",
+    "profiling",
     "propagation",
     "training",
 ]
@@ -0,0 +1,198 @@
+"""Array API.
+=============
+
+This module routes array creation and math through an `array API
+<https://data-apis.org/array-api/>`_ compatible namespace, so that the
+same propagation code runs on alternative array libraries (e.g. the strict
+reference implementation `array_api_strict`). The namespace is chosen per
+model by name, e.g. `Parameters(..., array_namespace="array_api_strict")`.
+
+.. note::
+    NumPy arrays keep a fast path: results are written directly into
+    preallocated buffers using the `out=` keyword, which is not part of
+    the array API standard. Other namespaces compute a new array and copy
+    it into the buffer instead.
+"""  # noqa: W291
+
+import functools
+import importlib
+from types import ModuleType
+from typing import Union
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+NUMPY = "numpy"
+
+
+@functools.lru_cache(maxsize=None)
+def get_namespace(name: str = NUMPY) -> ModuleType:
+    """Return array namespace from the name of the module implementing it.
+
+    :param name: name of an importable module that implements the array
+        API standard, e.g. "numpy" or "array_api_strict"
+    """
+    if name == NUMPY:
+        return np
+    module = importlib.import_module(name)
+    if not hasattr(module, "__array_api_version__"):
+        msg = f"'{name}' is not an array API compatible namespace"
+        raise ValueError(msg)
+    return module
+
+
+def array_namespace(x: np.ndarray) -> ModuleType:
+    """Return namespace of array.
+
+    :param x: array (or scalar, in which case NumPy is returned)
+    """
+    if isinstance(x, (np.ndarray, np.generic, float, int)):
+        return np
+    return x.__array_namespace__()
+
+
+def as_dtype(xp: ModuleType, dtype: DTypeLike) -> DTypeLike:
+    """Return data type of namespace equivalent to given data type.
+
+    :param xp: array namespace
+    :param dtype: data type, e.g. `np.float32` or namespace data type
+    """
+    try:
+        name = np.dtype(dtype).name
+    except TypeError:  # already a data type of the namespace
+        return dtype
+    return getattr(xp, name)
+
+
+def asarray(
+    x: np.ndarray, xp: ModuleType, dtype: Union[DTypeLike, None] = None
+) -> np.ndarray:
+    """Convert array to given namespace.
+
+    :param x: array to convert (e.g. NumPy array)
+    :param xp: array namespace
+    :param dtype: data type of result [defaulted to that of x] (optional)
+    """
+    if xp is np:
+        return np.asarray(x, dtype)
+    if isinstance(x, np.ndarray) and dtype is None:
+        dtype = x.dtype
+    if dtype is not None:
+        dtype = as_dtype(xp, dtype)
+    return xp.asarray(x, dtype=dtype)
+
+
+def to_numpy(x: np.ndarray) -> np.ndarray:
+    """Convert array to NumPy (without copy when possible).
+
+    :param x: array of any namespace supporting DLPack
+    """
+    if isinstance(x, np.ndarray):
+        return x
+    return np.from_dlpack(x)
+
+
+def astype(x: np.ndarray, dtype: DTypeLike) -> np.ndarray:
+    """Cast array to data type (without copy if already that type).
+
+    :param x: array to cast
+    :param dtype: data type, e.g. `np.float32`
+    """
+    if isinstance(x, np.ndarray):
+        return x.astype(dtype, copy=False)
+    xp = array_namespace(x)
+    return xp.astype(x, as_dtype(xp, dtype), copy=False)
+
+
+def assign(out: np.ndarray, value: np.ndarray) -> np.ndarray:
+    """Copy value into array (in place), casting it to the array type.
+
+    :param out: array to update in place
+    :param value: array (or scalar) broadcastable to `out`
+    """
+    if isinstance(out, np.ndarray) or not hasattr(value, "dtype"):
+        out[...] = value
+    else:
+        out[...] = array_namespace(out).astype(value, out.dtype, copy=False)
+    return out
+
+
+def _elementwise(
+    name: str, *args: np.ndarray, out: Union[np.ndarray, None] = None
+) -> np.ndarray:
+    """Apply element-wise function of namespace, optionally in place."""
+    if out is None:
+        return getattr(array_namespace(args[0]), name)(*args)
+    if isinstance(out, np.ndarray):
+        return getattr(np, name)(*args, out=out)
+    return assign(out, getattr(array_namespace(out), name)(*args))
+
+
+def tanh(x: np.ndarray, out: Union[np.ndarray, None] = None) -> np.ndarray:
+    """Compute hyperbolic tangent, optionally in place.
+
+    :param x: input array
+    :param out: output array (optional)
+    """
+    return _elementwise("tanh", x, out=out)
+
+
+def square(x: np.ndarray, out: Union[np.ndarray, None] = None) -> np.ndarray:
+    """Compute square, optionally in place.
+
+    :param x: input array
+    :param out: output array (optional)
+    """
+    return _elementwise("square", x, out=out)
+
+
+def multiply(
+    x1: np.ndarray, x2: np.ndarray, out: Union[np.ndarray, None] = None
+) -> np.ndarray:
+    """Compute element-wise product, optionally in place.
+
+    :param x1: first input array
+    :param x2: second input array
+    :param out: output array (optional)
+    """
+    return _elementwise("multiply", x1, x2, out=out)
+
+
+def matmul(
+    x1: np.ndarray, x2: np.ndarray, out: Union[np.ndarray, None] = None
+) -> np.ndarray:
+    """Compute matrix product of 2D arrays, optionally in place.
+
+    :param x1: first input array, of shape (n, p)
+    :param x2: second input array, of shape (p, m)
+    :param out: output array of any shape with n * m elements, e.g. a
+        buffer of shape (n, n_p, k) when x2 is of shape (p, n_p * k)
+        (optional)
+    """
+    if isinstance(x1, np.ndarray):  # dot has less overhead for small arrays
+        if out is None:
+            return np.dot(x1, x2)
+        view = out.reshape((x1.shape[0], x2.shape[1]))  # contiguous buffer
+        try:
+            np.dot(x1, x2, out=view)
+        except ValueError:  # e.g. higher precision output (mixed precision)
+            np.matmul(x1, x2, out=view)
+        return out
+    if out is None:
+        return x1 @ x2
+    xp = array_namespace(out)
+    return assign(out, xp.reshape(x1 @ x2, out.shape))
+
+
+def sum_rows(x: np.ndarray, out: Union[np.ndarray, None] = None) -> np.ndarray:
+    """Sum array of shape (n, m) along its rows, optionally in place.
+
+    :param x: input array, of shape (n, m)
+    :param out: output array, of shape (n, 1) (optional)
+    """
+    if isinstance(out, np.ndarray):
+        return np.sum(x, axis=1, keepdims=True, out=out)
+    total = array_namespace(x).sum(x, axis=1, keepdims=True)
+    if out is None:
+        return total
+    return assign(out, total)
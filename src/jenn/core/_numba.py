@@ -0,0 +1,289 @@
+"""Numba Kernels.
+=================
+
+This module implements optional `Numba <https://numba.pydata.org>`_ kernels
+that fuse the loops of forward, partials and backward propagation for one
+layer. For small networks, the cost of propagation is dominated by Python
+and NumPy dispatch overhead rather than floating point operations, which
+these kernels avoid.
+
+.. note::
+    Numba is an optional dependency. If it is not installed, the kernels
+    are plain Python functions (correct but slow) and
+    :mod:`jenn.core.propagation` falls back to the NumPy implementation.
+"""  # noqa: W291
+
+import math
+from collections.abc import Callable
+from importlib.util import find_spec
+
+import numpy as np
+
+from .activation import FastTanh
+
+NUMBA_INSTALLED = find_spec("numba") is not None
+
+if NUMBA_INSTALLED:
+    import numba
+
+    def _jit(func: Callable) -> Callable:
+        return numba.njit(cache=True, nogil=True)(func)
+
+else:
+
+    def _jit(func: Callable) -> Callable:
+        return func
+
+
+# Activations supported by the kernels (mapped to integer codes for Numba)
+CODES = dict(
+    linear=0,
+    tanh=1,
+    relu=2,
+    fast_tanh=3,
+)
+
+# Coefficients of rational approximation of tanh (see `FastTanh`)
+FAST_TANH_CLIP = FastTanh.CLIP
+FAST_TANH_ALPHA = np.array(FastTanh.ALPHA)
+FAST_TANH_BETA = np.array(FastTanh.BETA)
+
+
+@_jit
+def _fast_tanh(z: float) -> float:
+    x = min(max(z, -FAST_TANH_CLIP), FAST_TANH_CLIP)
+    x2 = x * x
+    p = FAST_TANH_ALPHA[6]
+    for k in range(5, -1, -1):
+        p = p * x2 + FAST_TANH_ALPHA[k]
+    q = FAST_TANH_BETA[3]
+    for k in range(2, -1, -1):
+        q = q * x2 + FAST_TANH_BETA[k]
+    return x * p / q
+
+
+@_jit
+def _evaluate(z: float, code: int) -> float:
+    if code == 1:  # noqa: PLR2004
+        return math.tanh(z)
+    if code == 2:  # noqa: PLR2004
+        return z if z > 0.0 else 0.0
+    if code == 3:  # noqa: PLR2004
+        return _fast_tanh(z)
+    return z
+
+
+@_jit
+def _first_derivative(z: float, a: float, code: int) -> float:
+    if code == 1 or code == 3:  # noqa: PLR1714, PLR2004
+        return 1.0 - a * a
+    if code == 2:  # noqa: PLR2004
+        return 1.0 if z > 0.0 else 0.0
+    return 1.0
+
+
+@_jit
+def _second_derivative(z: float, a: float, da: float, code: int) -> float:
+    if code == 1 or code == 3:  # noqa: PLR1714, PLR2004
+        return -2.0 * a * da
+    return 0.0
+
+
+@_jit
+def forward(
+    W: np.ndarray,
+    b: np.ndarray,
+    A_prev: np.ndarray,
+    Z: np.ndarray,
+    A: np.ndarray,
+    G_prime: np.ndarray,
+    G_prime_prime: np.ndarray,
+    code: int,
+    order: int,
+) -> None:
+    """Propagate forward through one layer (in place).
+
+    :param W: weights of current layer, array of shape (n, p)
+    :param b: biases of current layer, array of shape (n, 1)
+    :param A_prev: activations of previous layer, array of shape (p, m)
+    :param Z: output array for linear part, array of shape (n, m)
+    :param A: output array for activations, array of shape (n, m)
+    :param G_prime: output array for activation 1st derivative, array
+        of shape (n, m) (only written if order >= 1)
+    :param G_prime_prime: output array for activation 2nd derivative,
+        array of shape (n, m) (only written if order >= 2)
+    :param code: activation code (see `CODES`)
+    :param order: highest order of activation derivatives to compute
+    """
+    n, p = W.shape
+    m = A_prev.shape[1]
+    for i in range(n):
+        for t in range(m):
+            Z[i, t] = b[i, 0]
+        for k in range(p):
+            w = W[i, k]
+            for t in range(m):
+                Z[i, t] += w * A_prev[k, t]
+        for t in range(m):
+            A[i, t] = _evaluate(Z[i, t], code)
+            if order >= 1:
+                G_prime[i, t] = _first_derivative(Z[i, t], A[i, t], code)
+            if order >= 2:  # noqa: PLR2004
+                G_prime_prime[i, t] = _second_derivative(
+                    Z[i, t], A[i, t], G_prime[i, t], code
+                )
+
+
+@_jit
+def partials(
+    W: np.ndarray,
+    A_prime_prev: np.ndarray,
+    G_prime: np.ndarray,
+    Z_prime: np.ndarray,
+    A_prime: np.ndarray,
+) -> None:
+    """Propagate partials forward through one layer (in place).
+
+    :param W: weights of current layer, array of shape (n, p)
+    :param A_prime_prev: partials of previous layer, array of shape
+        (p, n_p, m)
+    :param G_prime: activation 1st derivative, array of shape (n, m)
+    :param Z_prime: output array for partials of linear part, array of
+        shape (n, n_p, m)
+    :param A_prime: output array for partials of activations, array of
+        shape (n, n_p, m)
+    """
+    n, p = W.shape
+    n_p = A_prime_prev.shape[1]
+    m = G_prime.shape[1]
+    for i in range(n):
+        for j in range(n_p):
+            for t in range(m):
+                Z_prime[i, j, t] = 0.0
+            for k in range(p):
+                w = W[i, k]
+                for t in range(m):
+                    Z_prime[i, j, t] += w * A_prime_prev[k, j, t]
+            for t in range(m):
+                A_prime[i, j, t] = G_prime[i, t] * Z_prime[i, j, t]
+
+
+@_jit
+def backward(
+    W: np.ndarray,
+    A_prev: np.ndarray,
+    dA: np.ndarray,
+    G_prime: np.ndarray,
+    dW: np.ndarray,
+    db: np.ndarray,
+    dA_prev: np.ndarray,
+    coefficient: float,
+    lambd: float,
+) -> None:
+    """Propagate backward through one layer (in place).
+
+    :param W: weights of current layer, array of shape (n, p)
+    :param A_prev: activations of previous layer, array of shape (p, m)
+    :param dA: cost partials w.r.t. activations of current layer, array
+        of shape (n, m)
+    :param G_prime: activation 1st derivative, array of shape (n, m)
+    :param dW: output array for cost partials w.r.t. weights, array of
+        shape (n, p)
+    :param db: output array for cost partials w.r.t. biases, array of
+        shape (n, 1)
+    :param dA_prev: output array for cost partials w.r.t. activations of
+        previous layer, array of shape (p, m)
+    :param coefficient: coefficient 1 / m applied to partials
+    :param lambd: regularization coefficient
+    """
+    n, p = W.shape
+    m = A_prev.shape[1]
+    for k in range(p):
+        for t in range(m):
+            dA_prev[k, t] = 0.0
+    for i in range(n):
+        total = 0.0
+        for t in range(m):
+            total += G_prime[i, t] * dA[i, t]
+        db[i, 0] = coefficient * total
+        for k in range(p):
+            w = W[i, k]
+            total = 0.0
+            for t in range(m):
+                delta = G_prime[i, t] * dA[i, t]
+                total += delta * A_prev[k, t]
+                dA_prev[k, t] += w * delta
+            dW[i, k] = coefficient * (total + lambd * w)
+
+
+@_jit
+def gradient_enhancement(
+    W: np.ndarray,
+    A_prev: np.ndarray,
+    A_prime_prev: np.ndarray,
+    Z: np.ndarray,
+    A: np.ndarray,
+    G_prime: np.ndarray,
+    Z_prime: np.ndarray,
+    dA_prime: np.ndarray,
+    G_prime_prime: np.ndarray,
+    dW: np.ndarray,
+    db: np.ndarray,
+    dA_prev: np.ndarray,
+    dA_prime_prev: np.ndarray,
+    code: int,
+    coefficient: float,
+) -> None:
+    """Add gradient enhancement to backprop for one layer (in place).
+
+    :param W: weights of current layer, array of shape (n, p)
+    :param A_prev: activations of previous layer, array of shape (p, m)
+    :param A_prime_prev: partials of previous layer, array of shape
+        (p, n_p, m)
+    :param Z: linear part of current layer, array of shape (n, m)
+    :param A: activations of current layer, array of shape (n, m)
+    :param G_prime: activation 1st derivative, array of shape (n, m)
+    :param Z_prime: partials of linear part, array of shape (n, n_p, m)
+    :param dA_prime: cost partials w.r.t. partials of current layer,
+        array of shape (n, n_p, m)
+    :param G_prime_prime: output array for activation 2nd derivative,
+        array of shape (n, m)
+    :param dW: cost partials w.r.t. weights (updated), array of shape
+        (n, p)
+    :param db: cost partials w.r.t. biases (updated), array of shape
+        (n, 1)
+    :param dA_prev: cost partials w.r.t. activations of previous layer
+        (updated), array of shape (p, m)
+    :param dA_prime_prev: output array for cost partials w.r.t. partials
+        of previous layer, array of shape (p, n_p, m)
+    :param code: activation code (see `CODES`)
+    :param coefficient: coefficient 1 / m applied to partials
+    """
+    n, p = W.shape
+    n_p = A_prime_prev.shape[1]
+    m = Z.shape[1]
+    for i in range(n):
+        for t in range(m):
+            G_prime_prime[i, t] = _second_derivative(
+                Z[i, t], A[i, t], G_prime[i, t], code
+            )
+    for k in range(p):
+        for j in range(n_p):
+            for t in range(m):
+                dA_prime_prev[k, j, t] = 0.0
+    for i in range(n):
+        for j in range(n_p):
+            total = 0.0
+            for t in range(m):
+                total += dA_prime[i, j, t] * G_prime_prime[i, t] * Z_prime[i, j, t]
+            db[i, 0] += coefficient * total
+            for k in range(p):
+                w = W[i, k]
+                total = 0.0
+                for t in range(m):
+                    first = dA_prime[i, j, t] * G_prime_prime[i, t] * Z_prime[i, j, t]
+                    second = dA_prime[i, j, t] * G_prime[i, t]
+                    total += first * A_prev[k, t] + second * A_prime_prev[k, j, t]
+                    dA_prev[k, t] += w * first
+                    dA_prime_prev[k, j, t] += w * second
+                dW[i, k] += coefficient * total
@@ -7,9 +7,13 @@ recomputed again during backward propgation. See
 `paper`_ for details and notation.
 """  # noqa: W291
 
-from typing import List
+from types import ModuleType
+from typing import List, Union
 
 import numpy as np
+from numpy.typing import DTypeLike
+
+from . import _array_api
 
 
 class Cache:
@@ -36,17 +40,27 @@ class Cache:
 
     :param layer_sizes: number of nodes in each layer (including input/output layers)
     :param m: number of examples (used to preallocate arrays)
+    :param n_p: number of partials propagated forward, i.e. number of
+        seed directions along which to differentiate [defaulted to n_x]
+        (optional)
+    :param n_q: number of directions along which to differentiate the
+        partials a second time [defaulted to zero, i.e. no second-order
+        partials are allocated] (optional)
+    :param dtype: floating point precision of the arrays [defaulted to
+        double precision] (optional)
+    :param array_namespace: name of the array API compatible module in
+        which to allocate the arrays [defaulted to "numpy"] (optional)
 
     :ivar Z:  :math:`Z^{[l]} \in \mathbb{R}^{n^{[l]}\times m}~\forall~ l = 1 \dots L`
     :vartype Z: List[numpy.ndarray]
 
-    :ivar Z_prime:  :math:`{Z^\prime}^{[l]} \in \mathbb{R}^{n^{[l]}\times n_x \times m}~\forall~ l = 1 \dots L`
+    :ivar Z_prime:  :math:`{Z^\prime}^{[l]} \in \mathbb{R}^{n^{[l]}\times n_p \times m}~\forall~ l = 1 \dots L`
     :vartype Z_prime: List[numpy.ndarray]
 
     :ivar A:  :math:`A^{[l]} = g(Z^{[l]}) \in \mathbb{R}^{n^{[l]} \times m}~\forall~ l = 1 \dots L`
     :vartype A: List[numpy.ndarray]
 
-    :ivar A_prime:  :math:`{A^\prime}^{[l]} = g^\prime(Z^{[l]})Z^{\prime[l]} \in \mathbb{R}^{n^{[l]}\times n_x \times m}`
+    :ivar A_prime:  :math:`{A^\prime}^{[l]} = g^\prime(Z^{[l]})Z^{\prime[l]} \in \mathbb{R}^{n^{[l]}\times n_p \times m}`
     :vartype A_prime: List[numpy.ndarray]
 
     :ivar G_prime:  :math:`G^{\prime} = g^{\prime}(Z^{[l]}) \in \mathbb{R}^{n^{[l]} \times m}~\forall~ l = 1 \dots L`
@@ -55,11 +69,22 @@ class Cache:
     :ivar G_prime_prime:  :math:`G^{\prime\prime} = g^{\prime\prime}(Z^{[l]}) \in \mathbb{R}^{n^{[l]} \times m}`
     :vartype G_prime_prime: List[numpy.ndarray]
 
+    :ivar Z_prime_prime:  :math:`{Z^{\prime\prime}}^{[l]} \in \mathbb{R}^{n^{[l]}\times n_p \times n_q \times m}~\forall~ l = 1 \dots L`
+    :vartype Z_prime_prime: List[numpy.ndarray]
+
+    :ivar A_prime_prime:  :math:`{A^{\prime\prime}}^{[l]} = g^{\prime\prime}(Z^{[l]}){Z^\prime}^{[l]}{Z^\prime}^{[l]} + g^\prime(Z^{[l]}){Z^{\prime\prime}}^{[l]} \in \mathbb{R}^{n^{[l]}\times n_p \times n_q \times m}`
+    :vartype A_prime_prime: List[numpy.ndarray]
+
     :ivar dA: :math:`{\partial \mathcal{J}}/{dA^{[l]}}  \in \mathbb{R}^{n^{[l]} \times m}~\forall~ l = 1 \dots L`
     :vartype dA: List[numpy.ndarray]
 
-    :ivar dA_prime: :math:`{\partial \mathcal{J}}/{dA^{\prime[l]}}  \in \mathbb{R}^{n^{[l]} \times n_x \times m}~\forall~ l = 1 \dots L`
+    :ivar dA_prime: :math:`{\partial \mathcal{J}}/{dA^{\prime[l]}}  \in \mathbb{R}^{n^{[l]} \times n_p \times m}~\forall~ l = 1 \dots L`
     :vartype dA: List[numpy.ndarray]
+
+    :ivar order: highest order of activation derivatives (`G_prime`,
+        `G_prime_prime`) computed by the last forward propagation, or -1
+        if none was performed
+    :vartype order: int
     """
 
     @property
@@ -77,22 +102,60 @@ class Cache:
         """Return number of outputs."""
         return int(self.layer_sizes[-1])
 
-    def __init__(self, layer_sizes: List[int], m: int = 1):  # noqa: D107
+    @property
+    def dtype(self) -> np.dtype:
+        """Return floating point precision of the arrays."""
+        return self.A[0].dtype
+
+    @property
+    def xp(self) -> ModuleType:
+        """Return array namespace of the arrays."""
+        return _array_api.get_namespace(self.array_namespace)
+
+    @property
+    def n_p(self) -> int:
+        """Return number of partials propagated forward."""
+        return int(self.A_prime[0].shape[1])
+
+    @property
+    def n_q(self) -> int:
+        """Return number of directions for second-order partials."""
+        return int(self.A_prime_prime[0].shape[2])
+
+    def __init__(
+        self,
+        layer_sizes: List[int],
+        m: int = 1,
+        n_p: Union[int, None] = None,
+        n_q: int = 0,
+        dtype: DTypeLike = np.float64,
+        array_namespace: str = "numpy",
+    ):  # noqa: D107
         self.layer_sizes = layer_sizes
+        self.array_namespace = array_namespace
+        xp = self.xp
+        dtype = _array_api.as_dtype(xp, dtype)
+        if n_p is None:
+            n_p = self.n_x
         self.Z: List[np.ndarray] = []  #  z = w a_prev + b
-        self.Z_prime: List[np.ndarray] = []  #  z' = dz/dx[j] for all j = 1, .., n_x
+        self.Z_prime: List[np.ndarray] = []  #  z' = dz/dx[j] for all j = 1, .., n_p
         self.A: List[np.ndarray] = []  #  a = g(z)
-        self.A_prime: List[np.ndarray] = []  #  a' = da/dx[j] for all j = 1, .., n_x
+        self.A_prime: List[np.ndarray] = []  #  a' = da/dx[j] for all j = 1, .., n_p
         self.G_prime: List[np.ndarray] = []  #  g' = da/dz
         self.G_prime_prime: List[np.ndarray] = []  #  g'' = d/dz( da/dz )
+        self.Z_prime_prime: List[np.ndarray] = []  #  z'' = d/dv( dz/dx[j] )
+        self.A_prime_prime: List[np.ndarray] = []  #  a'' = d/dv( da/dx[j] )
         self.dA: List[np.ndarray] = []
         self.dA_prime: List[np.ndarray] = []
+        self.order = -1  # highest order of activation derivatives up to date
         for n in self.layer_sizes:
-            self.Z.append(np.zeros((n, m)))
-            self.Z_prime.append(np.zeros((n, self.n_x, m)))
-            self.G_prime.append(np.zeros((n, m)))
-            self.G_prime_prime.append(np.zeros((n, m)))
-            self.A.append(np.zeros((n, m)))
-            self.A_prime.append(np.zeros((n, self.n_x, m)))
-            self.dA.append(np.zeros((n, m)))
-            self.dA_prime.append(np.zeros((n, self.n_x, m)))
+            self.Z.append(xp.zeros((n, m), dtype=dtype))
+            self.Z_prime.append(xp.zeros((n, n_p, m), dtype=dtype))
+            self.G_prime.append(xp.zeros((n, m), dtype=dtype))
+            self.G_prime_prime.append(xp.zeros((n, m), dtype=dtype))
+            self.A.append(xp.zeros((n, m), dtype=dtype))
+            self.A_prime.append(xp.zeros((n, n_p, m), dtype=dtype))
+            self.Z_prime_prime.append(xp.zeros((n, n_p, n_q, m), dtype=dtype))
+            self.A_prime_prime.append(xp.zeros((n, n_p, n_q, m), dtype=dtype))
+            self.dA.append(xp.zeros((n, m), dtype=dtype))
+            self.dA_prime.append(xp.zeros((n, n_p, m), dtype=dtype))
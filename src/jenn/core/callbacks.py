@@ -0,0 +1,495 @@
+"""Callbacks.
+============
+
+This module implements hooks that are called during training, e.g. to
+monitor progress or request early termination. A callback subclasses
+`Callback` and overrides any of its methods. Returning `True` from a
+method requests that training stop (the current batch ends at the
+current iteration and no other batches or epochs are run).
+
+.. code-block:: python
+
+    class StopBelow(Callback):
+
+        def on_iteration(self, epoch, batch, iteration, cost, params):
+            return cost < 1e-3
+
+    model.fit(x, y, callbacks=[ConsoleLogger(interval=5.0), StopBelow()])
+
+Early stopping on validation data (`EarlyStopping`) is also implemented
+as a callback, which `fit` adds when given validation data.
+"""  # noqa: W291
+
+import copy
+import json
+import sys
+import time
+from pathlib import Path
+from typing import IO, List, Union
+
+import numpy as np
+
+from . import profiling
+from .cache import Cache
+from .cost import Cost
+from .data import Dataset
+from .parameters import Parameters
+from .propagation import model_forward, model_partials_forward
+
+
+class Callback:
+    """Training callback base class (all methods do nothing by default)."""
+
+    def on_iteration(
+        self,
+        epoch: Union[int, None],
+        batch: Union[int, None],
+        iteration: int,
+        cost: float,
+        params: np.ndarray,
+    ) -> Union[bool, None]:
+        """Call at each optimizer iteration, once the cost is evaluated.
+
+        :param epoch: current epoch (None if not training)
+        :param batch: current batch (None if not training)
+        :param iteration: current optimizer iteration
+        :param cost: cost function at current parameters
+        :param params: current parameters, array of shape (n, 1), which
+            must be copied to be kept
+        :return: True to request early termination
+        """
+        return None
+
+    def on_converged(
+        self,
+        epoch: Union[int, None],
+        batch: Union[int, None],
+        iteration: int,
+        reason: str,
+    ) -> None:
+        """Call when optimizer stops before maximum number of iterations.
+
+        :param epoch: current epoch (None if not training)
+        :param batch: current batch (None if not training)
+        :param iteration: optimizer iteration at which it stopped
+        :param reason: stopping criterion satisfied, e.g. "absolute",
+            "relative", "line search", "damping" or "callback"
+        """
+        return None
+
+    def on_batch_end(
+        self,
+        epoch: int,
+        batch: int,
+        cost: np.ndarray,
+    ) -> Union[bool, None]:
+        """Call after training on each batch.
+
+        :param epoch: current epoch
+        :param batch: current batch
+        :param cost: cost function history recorded for the batch
+        :return: True to request early termination
+        """
+        return None
+
+    def on_epoch_end(
+        self,
+        epoch: int,
+        history: dict,
+    ) -> Union[bool, None]:
+        """Call after each pass through the data.
+
+        :param epoch: current epoch
+        :param history: training history so far, accessed as `cost =
+            history[epoch][batch][iter]`
+        :return: True to request early termination
+        """
+        return None
+
+
+class CallbackList(Callback):
+    """Call several callbacks in turn and remember stop requests.
+
+    :param callbacks: callbacks to be called in the order given
+    """
+
+    def __init__(self, callbacks: Union[List[Callback], None] = None):  # noqa D107
+        self.callbacks = list(callbacks or [])
+        self.is_stopped = False
+
+    def _any(self, method: str, *args: object) -> bool:
+        """Call method of all callbacks, returning True if any requests
+        termination (all callbacks are called regardless)."""
+        is_stopped = False
+        for callback in self.callbacks:
+            is_stopped |= bool(getattr(callback, method)(*args))
+        self.is_stopped |= is_stopped
+        return is_stopped
+
+    def on_iteration(  # noqa: D102
+        self,
+        epoch: Union[int, None],
+        batch: Union[int, None],
+        iteration: int,
+        cost: float,
+        params: np.ndarray,
+    ) -> bool:
+        return self._any("on_iteration", epoch, batch, iteration, cost, params)
+
+    def on_converged(  # noqa: D102
+        self,
+        epoch: Union[int, None],
+        batch: Union[int, None],
+        iteration: int,
+        reason: str,
+    ) -> None:
+        for callback in self.callbacks:
+            callback.on_converged(epoch, batch, iteration, reason)
+
+    def on_batch_end(  # noqa: D102
+        self,
+        epoch: int,
+        batch: int,
+        cost: np.ndarray,
+    ) -> bool:
+        return self._any("on_batch_end", epoch, batch, cost)
+
+    def on_epoch_end(  # noqa: D102
+        self,
+        epoch: int,
+        history: dict,
+    ) -> bool:
+        return self._any("on_epoch_end", epoch, history)
+
+
+class ConsoleLogger(Callback):
+    """Print training progress, at most once per time interval.
+
+    Iterations are only printed if at least `interval` seconds elapsed
+    since the last printed line, such that many small batches or fast
+    iterations do not flood the output. Convergence and the end of each
+    epoch are always printed.
+
+    :param interval: minimum time between two progress lines, in seconds
+        (zero prints every iteration) [defaulted to 1 second] (optional)
+    :param stream: text stream to print to [defaulted to standard out]
+        (optional)
+    """
+
+    def __init__(
+        self,
+        interval: float = 1.0,
+        stream: Union[IO[str], None] = None,
+    ):  # noqa D107
+        self.interval = interval
+        self.stream = stream
+        self._last = -np.inf  # time of last printed line
+
+    def _print(self, message: str) -> None:
+        print(message, file=self.stream or sys.stdout)
+        self._last = time.monotonic()
+
+    def on_iteration(  # noqa: D102
+        self,
+        epoch: Union[int, None],
+        batch: Union[int, None],
+        iteration: int,
+        cost: float,
+        params: np.ndarray,
+    ) -> None:
+        if time.monotonic() - self._last >= self.interval:
+            self._print(_progress(epoch, batch, f"iter = {iteration:d}", cost))
+
+    def on_converged(  # noqa: D102
+        self,
+        epoch: Union[int, None],
+        batch: Union[int, None],
+        iteration: int,
+        reason: str,
+    ) -> None:
+        self._print(
+            _progress(epoch, batch, f"iter = {iteration:d}")
+            + f", {reason} stopping criterion satisfied"
+        )
+
+    def on_epoch_end(  # noqa: D102
+        self,
+        epoch: int,
+        history: dict,
+    ) -> None:
+        costs = [cost[-1] for cost in history[f"epoch_{epoch}"].values() if len(cost)]
+        if costs:
+            self._print(_progress(epoch, None, "end", float(np.mean(costs))))
+
+
+class JSONLWriter(Callback):
+    """Write training progress to file, as one JSON object per line.
+
+    Each line holds the `event` ("iteration", "converged", "batch_end" or
+    "epoch_end"), the `epoch`, `batch`, `iteration` and `cost` (when
+    applicable) and the wall `time` in seconds since the first event.
+    Lines are buffered in memory and appended to the file at the end of
+    each batch, such that the file can be followed while training.
+
+    :param path: file to which lines are appended
+    :param every: write every `every` iterations [defaulted to every
+        iteration] (optional)
+    """
+
+    def __init__(self, path: Union[str, Path], every: int = 1):  # noqa D107
+        self.path = Path(path)
+        self.every = every
+        self._lines: List[str] = []
+        self._start: Union[float, None] = None
+
+    def _write(self, event: str, **fields: object) -> None:
+        if self._start is None:
+            self._start = time.monotonic()
+        fields["time"] = time.monotonic() - self._start
+        self._lines.append(json.dumps(dict(event=event, **fields)))
+
+    def flush(self) -> None:
+        """Append buffered lines to file."""
+        if self._lines:
+            with self.path.open("a", encoding="utf-8") as file:
+                file.write("\n".join(self._lines) + "\n")
+            self._lines.clear()
+
+    def on_iteration(  # noqa: D102
+        self,
+        epoch: Union[int, None],
+        batch: Union[int, None],
+        iteration: int,
+        cost: float,
+        params: np.ndarray,
+    ) -> None:
+        if self.every > 0 and iteration % self.every == 0:
+            self._write(
+                "iteration", epoch=epoch, batch=batch, iteration=iteration, cost=cost
+            )
+
+    def on_converged(  # noqa: D102
+        self,
+        epoch: Union[int, None],
+        batch: Union[int, None],
+        iteration: int,
+        reason: str,
+    ) -> None:
+        self._write(
+            "converged", epoch=epoch, batch=batch, iteration=iteration, reason=reason
+        )
+
+    def on_batch_end(  # noqa: D102
+        self,
+        epoch: int,
+        batch: int,
+        cost: np.ndarray,
+    ) -> None:
+        last = float(cost[-1]) if len(cost) else None
+        self._write("batch_end", epoch=epoch, batch=batch, cost=last)
+        self.flush()
+
+    def on_epoch_end(  # noqa: D102
+        self,
+        epoch: int,
+        history: dict,
+    ) -> None:
+        self._write("epoch_end", epoch=epoch)
+        self.flush()
+
+
+class EarlyStopping(Callback):
+    """Stop training when the cost on validation data stops improving.
+
+    The validation cost is the least squares cost function (without
+    regularization) of the response, as well as the partials if the
+    validation data provides them. It only requires forward propagation,
+    into a cache allocated once, and is evaluated every `every`
+    iterations (counted across batches and epochs). The parameters that
+    achieved the lowest validation cost are kept, to be restored when
+    training ends (which `train_model` does).
+
+    :param data: validation data, normalized the same way as the
+        training data
+    :param parameters: neural net parameters being trained (a copy is
+        used for validation, such that training is not affected)
+    :param every: evaluate validation cost every `every` iterations
+        [defaulted to 10] (optional)
+    :param patience: number of validation evaluations without
+        improvement after which training stops [defaulted to 10]
+        (optional)
+    """
+
+    def __init__(
+        self,
+        data: Dataset,
+        parameters: Parameters,
+        every: int = 10,
+        patience: int = 10,
+    ):  # noqa D107
+        self.data = data
+        self.every = every
+        self.patience = patience
+        self.parameters = copy.deepcopy(parameters)
+        self.cost = Cost(data, self.parameters, lambd=0.0)
+        self.cache = Cache(
+            parameters.layer_sizes,
+            data.m,
+            data.n_p,
+            dtype=parameters.dtype,
+            array_namespace=parameters.array_namespace,
+        )
+        self.iterations: List[int] = []  # iterations at which evaluated
+        self.costs: List[float] = []  # validation cost of each evaluation
+        self.best_cost = np.inf
+        self.best_params: Union[np.ndarray, None] = None  # stacked
+        self.wait = 0  # evaluations since last improvement
+        self._count = 0  # iterations so far
+
+    def evaluate(self, params: np.ndarray) -> float:
+        """Return validation cost at given parameters.
+
+        :param params: parameters, as returned by `Parameters.stack`
+        """
+        data = self.data
+        self.parameters.unstack(params)
+        if data.J is None:
+            Y_pred = model_forward(data.X, self.parameters, self.cache)
+            return float(self.cost.evaluate(Y_pred))
+        Y_pred, J_pred = model_partials_forward(
+            data.X, self.parameters, self.cache, data.wrt
+        )
+        return float(self.cost.evaluate(Y_pred, J_pred))
+
+    def on_iteration(  # noqa: D102
+        self,
+        epoch: Union[int, None],
+        batch: Union[int, None],
+        iteration: int,
+        cost: float,
+        params: np.ndarray,
+    ) -> bool:
+        count = self._count
+        self._count += 1
+        if count % self.every:
+            return False
+        with profiling.phase("validation"):
+            validation_cost = self.evaluate(params)
+        self.iterations.append(count)
+        self.costs.append(validation_cost)
+        if validation_cost < self.best_cost:
+            self.best_cost = validation_cost
+            if self.best_params is None:
+                self.best_params = np.array(params, copy=True)
+            else:
+                np.copyto(self.best_params, params)
+            self.wait = 0
+        else:
+            self.wait += 1
+        return self.wait >= self.patience
+
+
+class TimeBudget(Callback):
+    """Stop training when the wall-clock time budget is used up.
+
+    Elapsed time is checked at each iteration and at the end of each
+    batch, counting from the creation of the callback. The parameters
+    with the lowest training cost seen so far in the current batch are
+    kept, to be restored if the budget interrupts training (which
+    `train_model` does), such that the best result is available at any
+    time. Costs of different batches are not compared, since they are
+    evaluated on different examples.
+
+    .. note::
+        The budget is checked between iterations, hence it may be
+        exceeded by up to the duration of one iteration.
+
+    :param seconds: time budget, in seconds
+    """
+
+    def __init__(self, seconds: float):  # noqa D107
+        self.seconds = seconds
+        self.start = time.monotonic()
+        self.is_exhausted = False
+        self.best_cost = np.inf
+        self.best_params: Union[np.ndarray, None] = None  # stacked
+
+    @property
+    def elapsed(self) -> float:
+        """Time elapsed since creation, in seconds."""
+        return time.monotonic() - self.start
+
+    def _check(self) -> bool:
+        """Return True if budget is used up."""
+        self.is_exhausted = self.is_exhausted or self.elapsed >= self.seconds
+        return self.is_exhausted
+
+    def on_iteration(  # noqa: D102
+        self,
+        epoch: Union[int, None],
+        batch: Union[int, None],
+        iteration: int,
+        cost: float,
+        params: np.ndarray,
+    ) -> bool:
+        if cost < self.best_cost:
+            self.best_cost = cost
+            if self.best_params is None:
+                self.best_params = np.array(params, copy=True)
+            else:
+                np.copyto(self.best_params, params)
+        return self._check()
+
+    def on_batch_end(  # noqa: D102
+        self,
+        epoch: int,
+        batch: int,
+        cost: np.ndarray,
+    ) -> bool:
+        if self._check():
+            return True
+        self.best_cost = np.inf  # next batch starts over
+        return False
+
+    def report(self, summary: Union[dict, None] = None) -> dict:
+        """Return how much of the budget was used overall and by each
+        phase of training.
+
+        :param summary: profiler summary (see `Profiler.summary`), whose
+            self time of each phase is reported as a fraction of the
+            budget, along with the time not spent in any phase ("other")
+            (optional)
+        """
+        elapsed = self.elapsed
+        report: dict = dict(
+            budget=self.seconds,
+            elapsed=elapsed,
+            used=elapsed / self.seconds,
+            is_exhausted=self.is_exhausted,
+        )
+        if summary is not None:
+            phases = {
+                name: stats["self"] / self.seconds
+                for name, stats in summary["phases"].items()
+            }
+            phases["other"] = report["used"] - sum(phases.values())
+            report["phases"] = phases
+        return report
+
+
+def _progress(
+    epoch: Union[int, None],
+    batch: Union[int, None],
+    label: str,
+    cost: Union[float, None] = None,
+) -> str:
+    """Return progress message for printing."""
+    message = ""
+    if epoch is not None:
+        message += f"epoch = {epoch:d}, "
+    if batch is not None:
+        message += f"batch = {batch:d}, "
+    message += label
+    if cost is not None:
+        message += f", cost = {cost:6.3f}"
+    return message
@@ -0,0 +1,214 @@
+"""Checkpoint.
+==============
+
+This module implements periodic checkpointing of training, such that a
+long run that is interrupted (e.g. preempted job) can be resumed from
+the last checkpoint and continue exactly as if it had not been:
+
+.. code-block:: python
+
+    model.fit(x, y, checkpoint="run.ckpt", checkpoint_every=100)
+    ...  # interrupted, then in a new process
+    model.fit(x, y, checkpoint="run.ckpt", resume_from="run.ckpt")
+
+A checkpoint holds the parameters, the optimizer state (e.g. ADAM
+moments and step counter, L-BFGS curvature pairs), the position in
+training (epoch, batch and iteration), the history recorded so far and
+the state of the random number generator used to shuffle mini-batches.
+It is saved as a NumPy `.npz` archive (raw binary arrays), written to a
+temporary file which then atomically replaces the previous checkpoint,
+such that an interruption while writing never leaves a corrupt file.
+
+.. note::
+    Only copying the state blocks the optimizer: files are written on a
+    background thread. If a checkpoint is requested while the previous
+    one is still being written, only the most recent is kept.
+"""  # noqa: W291
+
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Union
+
+import numpy as np
+
+from .callbacks import Callback
+
+_SEPARATOR = "/"
+
+
+def _flatten(state: Any, prefix: str = "") -> dict[str, np.ndarray]:  # noqa: ANN401
+    """Return nested dictionaries and lists as flat dictionary of arrays,
+    whose keys are paths such as "optimizer/update/v" (None is omitted)."""
+    if isinstance(state, dict):
+        items = state.items()
+    elif isinstance(state, list):
+        items = enumerate(state)
+    elif state is None:
+        return {}
+    else:
+        return {prefix: np.asarray(state)}
+    flat = {}
+    for key, value in items:
+        path = f"{prefix}{_SEPARATOR}{key}" if prefix else str(key)
+        flat.update(_flatten(value, path))
+    return flat
+
+
+def _unflatten(flat: dict[str, np.ndarray]) -> dict[str, Any]:
+    """Return nested dictionaries (and lists) from flat dictionary of
+    arrays returned by `_flatten`, where 0-d arrays become scalars."""
+    state: dict[str, Any] = {}
+    for path, value in flat.items():
+        *keys, last = path.split(_SEPARATOR)
+        node = state
+        for key in keys:
+            node = node.setdefault(key, {})
+        node[last] = value.item() if value.ndim == 0 else value
+    return _listify(state)
+
+
+def _listify(state: Any) -> Any:  # noqa: ANN401
+    """Convert dictionaries whose keys are all indices back to lists."""
+    if not isinstance(state, dict):
+        return state
+    state = {key: _listify(value) for key, value in state.items()}
+    if state and all(key.isdigit() for key in state):
+        return [state[str(i)] for i in range(len(state))]
+    return state
+
+
+def save(path: Union[str, Path], state: dict) -> None:
+    """Save training state to checkpoint file (atomically).
+
+    :param path: checkpoint file
+    :param state: nested dictionaries of arrays and scalars
+    """
+    path = Path(path)
+    temporary = path.with_name(path.name + ".tmp")
+    with temporary.open("wb") as file:
+        arrays: dict[str, Any] = _flatten(state)
+        np.savez(file, **arrays)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+def load(path: Union[str, Path]) -> dict:
+    """Load training state from checkpoint file.
+
+    :param path: checkpoint file
+    :return: nested dictionaries of arrays and scalars saved by `save`
+    """
+    with np.load(Path(path), allow_pickle=False) as archive:
+        return _unflatten({key: archive[key] for key in archive.files})
+
+
+class Checkpoint(Callback):
+    """Save training state every few iterations and after each batch.
+
+    The state is obtained from a function, such that this callback does
+    not depend on how training is implemented (see `train_model`). It is
+    used as a context manager, which waits for the last checkpoint to be
+    written on exit.
+
+    :param path: checkpoint file, replaced by each new checkpoint
+    :param state: function that returns a copy of the training state
+        given the epoch, batch, iteration and parameters, where the
+        iteration and parameters are None at the end of a batch
+    :param every: save every `every` iterations of each batch (other
+        than the first), as well as after each batch [defaulted to 100]
+        (optional)
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        state: Callable[..., dict],
+        every: int = 100,
+    ):  # noqa D107
+        self.path = Path(path)
+        self.state = state
+        self.every = every
+        self.count = 0  # number of checkpoints written
+        self._pending: Union[dict, None] = None
+        self._is_closed = False
+        self._error: Union[BaseException, None] = None
+        self._condition = threading.Condition()
+        self._thread: Union[threading.Thread, None] = None
+
+    def on_iteration(  # noqa: D102
+        self,
+        epoch: Union[int, None],
+        batch: Union[int, None],
+        iteration: int,
+        cost: float,
+        params: np.ndarray,
+    ) -> None:
+        if self.every > 0 and iteration > 0 and iteration % self.every == 0:
+            self.write(self.state(epoch, batch, iteration, params))
+
+    def on_batch_end(  # noqa: D102
+        self,
+        epoch: int,
+        batch: int,
+        cost: np.ndarray,
+    ) -> None:
+        self.write(self.state(epoch, batch, None, None))
+
+    def write(self, state: dict) -> None:
+        """Save state on background thread (replacing any state not yet
+        written).
+
+        :param state: training state, which must not be modified after
+        """
+        with self._condition:
+            self._raise()
+            self._pending = state
+            self._condition.notify()
+        if self._thread is None:
+            self._is_closed = False
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        """Write pending states until closed."""
+        while True:
+            with self._condition:
+                while self._pending is None and not self._is_closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                state, self._pending = self._pending, None
+            try:
+                save(self.path, state)
+                self.count += 1
+            except BaseException as error:  # noqa: BLE001
+                with self._condition:
+                    self._error = error
+
+    def _raise(self) -> None:
+        """Raise error that occurred on background thread (if any)."""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def __enter__(self) -> "Checkpoint":
+        """Return self (background thread is closed on exit)."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Wait until pending state is written (see `close`)."""
+        self.close()
+
+    def close(self) -> None:
+        """Wait until pending state is written and stop background thread."""
+        if self._thread is not None:
+            with self._condition:
+                self._is_closed = True
+                self._condition.notify()
+            self._thread.join()
+            self._thread = None
+        with self._condition:
+            self._raise()
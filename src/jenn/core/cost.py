@@ -13,6 +13,7 @@ from typing import List, Union
 
 import numpy as np
 
+from . import _array_api
 from .data import Dataset
 from .parameters import Parameters
 
@@ -29,9 +30,10 @@ class SquaredLoss:
     def __init__(
         self, Y_true: np.ndarray, Y_weights: Union[np.ndarray, float] = 1.0
     ) -> None:
+        xp = self.xp = _array_api.array_namespace(Y_true)
         self.Y_true = Y_true
-        self.Y_error = np.zeros(Y_true.shape)  # preallocate to save resources
-        self.Y_weights = np.ones(Y_true.shape) * Y_weights
+        self.Y_error = xp.zeros(Y_true.shape, dtype=xp.float64)  # preallocate
+        self.Y_weights = xp.ones(Y_true.shape, dtype=xp.float64) * Y_weights
         self.n_y, self.m = Y_true.shape
 
     def evaluate(self, Y_pred: np.ndarray) -> np.float64:
@@ -40,11 +42,11 @@ class SquaredLoss:
         :param Y_pred: predicted outputs :math:`A^{[L]} \in
             \mathbb{R}^{n_y \times m}`
         """
-        self.Y_error[:, :] = Y_pred - self.Y_true
-        self.Y_error *= np.sqrt(self.Y_weights)
-        cost = 0
+        self.Y_error[...] = Y_pred - self.Y_true
+        self.Y_error *= self.xp.sqrt(self.Y_weights)
+        cost = 0.0
         for j in range(0, self.n_y):
-            cost += np.dot(self.Y_error[j], self.Y_error[j].T)
+            cost += float(self.xp.matmul(self.Y_error[j, :], self.Y_error[j, :]))
         return np.float64(cost)
 
 
@@ -59,9 +61,10 @@ class GradientEnhancement:
     def __init__(
         self, J_true: np.ndarray, J_weights: Union[np.ndarray, float] = 1.0
     ) -> None:
+        xp = self.xp = _array_api.array_namespace(J_true)
         self.J_true = J_true
-        self.J_error = np.zeros(J_true.shape)
-        self.J_weights = np.ones(J_true.shape) * J_weights
+        self.J_error = xp.zeros(J_true.shape, dtype=xp.float64)
+        self.J_weights = xp.ones(J_true.shape, dtype=xp.float64) * J_weights
         self.n_y, self.n_x, self.m = J_true.shape
 
     def evaluate(self, J_pred: np.ndarray) -> np.float64:
@@ -70,13 +73,13 @@ class GradientEnhancement:
         :param J_pred: predicted Jacobian :math:`A^{\prime[L]} \in
             \mathbb{R}^{n_y \times n_x \times m}`
         """
-        self.J_error[:, :, :] = self.J_weights * (J_pred - self.J_true)
-        self.J_error *= np.sqrt(self.J_weights)
+        self.J_error[...] = J_pred - self.J_true
+        self.J_error *= self.xp.sqrt(self.J_weights)
         cost = 0.0
         for k in range(0, self.n_y):
             for j in range(0, self.n_x):
-                dot_product = np.dot(self.J_error[k, j], self.J_error[k, j].T)
-                cost += np.squeeze(dot_product)
+                J_error = self.J_error[k, j, :]
+                cost += float(self.xp.matmul(J_error, J_error))
         return np.float64(cost)
 
 
@@ -107,7 +110,8 @@ class Regularization:
         penalty = 0.0
         if self.lambd > 0.0:
             for W in self.weights:
-                penalty += np.sum(np.square(W)).squeeze()
+                xp = _array_api.array_namespace(W)
+                penalty += float(xp.sum(xp.square(W), dtype=xp.float64))
             return self.lambd * penalty
         return 0.0
 
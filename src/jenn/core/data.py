@@ -147,13 +147,84 @@ def denormalize_partials(
     return partials * sigma_y / _safe_divide(sigma_x)
 
 
+def normalize_directions(directions: np.ndarray, sigma_x: np.ndarray) -> np.ndarray:
+    r"""Normalize directions along which to compute directional derivatives.
+
+    :param directions: directions :math:`V\in\mathbb{R}^{n_x\times k
+        \times m}` expressed in the units of the (unnormalized) inputs
+    :param sigma_x: std dev of training data factors :math:`\sigma_x`,
+        array of shape (-1, 1)
+    :return: normalized directions, array of shape (n_x, k, m)
+    """
+    n_x = directions.shape[0]
+    return directions / _safe_divide(sigma_x).reshape((n_x, 1, 1))
+
+
+def denormalize_directional_partials(
+    partials: np.ndarray, sigma_y: np.ndarray
+) -> np.ndarray:
+    r"""Undo normalization of directional derivatives.
+
+    :param partials: normalized directional derivatives, array of shape
+        (n_y, k, m), computed along normalized directions
+    :param sigma_y: std dev of training data responses :math:`\sigma_y`,
+        array of shape (-1, 1)
+    :return: denormalized directional derivatives, array of shape (n_y, k, m)
+    """
+    n_y = partials.shape[0]
+    return partials * sigma_y.reshape((n_y, 1, 1))
+
+
+def denormalize_hessian(
+    hessian: np.ndarray, sigma_x: np.ndarray, sigma_y: np.ndarray
+) -> np.ndarray:
+    r"""Undo normalization of second-order partials.
+
+    :param hessian: normalized Hessian, array of shape (n_y, n_x, n_x, m)
+    :param sigma_x: std dev of training data factors :math:`\sigma_x`,
+        array of shape (-1, 1)
+    :param sigma_y: std dev of training data responses :math:`\sigma_y`,
+        array of shape (-1, 1)
+    :return: denormalized Hessian, array of shape (n_y, n_x, n_x, m)
+    """
+    n_y, n_x, _, _ = hessian.shape
+    sigma_x = _safe_divide(sigma_x)
+    sigma_x_j = sigma_x.reshape((1, n_x, 1, 1))
+    sigma_x_k = sigma_x.reshape((1, 1, n_x, 1))
+    sigma_y = sigma_y.reshape((n_y, 1, 1, 1))
+    return hessian * sigma_y / sigma_x_j / sigma_x_k
+
+
+def denormalize_hvp(
+    hvp: np.ndarray, sigma_x: np.ndarray, sigma_y: np.ndarray
+) -> np.ndarray:
+    r"""Undo normalization of Hessian-vector products.
+
+    :param hvp: Hessian-vector products computed along normalized
+        directions, array of shape (n_y, n_x, k, m)
+    :param sigma_x: std dev of training data factors :math:`\sigma_x`,
+        array of shape (-1, 1)
+    :param sigma_y: std dev of training data responses :math:`\sigma_y`,
+        array of shape (-1, 1)
+    :return: denormalized Hessian-vector products, array of shape
+        (n_y, n_x, k, m)
+    """
+    n_y, n_x, _, _ = hvp.shape
+    sigma_x = _safe_divide(sigma_x).reshape((1, n_x, 1, 1))
+    sigma_y = sigma_y.reshape((n_y, 1, 1, 1))
+    return hvp * sigma_y / sigma_x
+
+
 @dataclass
 class Dataset:
     """Store training data and associated metadata for easy access.
 
     :param X: training data outputs, array of shape (n_x, m)
     :param Y: training data outputs, array of shape (n_y, m)
-    :param J: training data Jacobians, array of shape (n_y, n_x, m)
+    :param J: training data Jacobians, array of shape (n_y, n_p, m)
+    :param wrt: indices of the inputs w.r.t. which the Jacobian is
+        provided, such that n_p = len(wrt) [defaulted to all inputs,
+        i.e. n_p = n_x] (optional)
     """
 
     X: np.ndarray
@@ -163,19 +234,30 @@ class Dataset:
     Y_weights: Union[np.ndarray, float] = 1.0
     J_weights: Union[np.ndarray, float] = 1.0
 
+    wrt: Union[List[int], None] = None
+
     def __post_init__(self) -> None:  # noqa: D105
         if self.X.shape[1] != self.Y.shape[1]:
             msg = "X and Y must have the same number of examples"
             raise ValueError(msg)
 
-        n_y, n_x, m = self.n_y, self.n_x, self.m
+        if self.wrt is not None:
+            self.wrt = [int(j) for j in self.wrt]
+            if len(set(self.wrt)) != len(self.wrt):
+                msg = "wrt must not contain duplicate indices"
+                raise ValueError(msg)
+            if any(j < 0 or j >= self.n_x for j in self.wrt):
+                msg = f"wrt indices must be between 0 and {self.n_x - 1}"
+                raise ValueError(msg)
+
+        n_y, n_p, m = self.n_y, self.n_p, self.m
 
         self.Y_weights = self.Y_weights * np.ones((n_y, m))
-        self.J_weights = self.J_weights * np.ones((n_y, n_x, m))
+        self.J_weights = self.J_weights * np.ones((n_y, n_p, m))
 
         if self.J is not None:
-            if self.J.shape != (n_y, n_x, m):
-                msg = f"J must be of shape ({n_y}, {n_x}, {m})"
+            if self.J.shape != (n_y, n_p, m):
+                msg = f"J must be of shape ({n_y}, {n_p}, {m})"
                 raise ValueError(msg)
 
     def set_weights(
@@ -191,7 +273,7 @@ class Dataset:
         :param beta: multiplier(s) on J
         """
         self.Y_weights = beta * np.ones((self.n_y, self.m))
-        self.J_weights = gamma * np.ones((self.n_y, self.n_x, self.m))
+        self.J_weights = gamma * np.ones((self.n_y, self.n_p, self.m))
 
     @property
     def m(self) -> int:
@@ -208,6 +290,13 @@ class Dataset:
         """Return number of outputs."""
         return int(self.Y.shape[0])
 
+    @property
+    def n_p(self) -> int:
+        """Return number of inputs w.r.t. which partials are provided."""
+        if self.wrt is None:
+            return self.n_x
+        return len(self.wrt)
+
     @cached_property
     def avg_x(self) -> np.ndarray:
         """Return mean of input data as array of shape (n_x, 1)."""
@@ -246,21 +335,116 @@ class Dataset:
         X = self.X
         Y = self.Y
         J = self.J
+        wrt = self.wrt
         Y_weights = np.ones(Y.shape) * self.Y_weights
         batches = mini_batches(X, batch_size, shuffle, random_state)
         if J is None:
             return [
-                Dataset(X[:, b], Y[:, b], Y_weights=Y_weights[:, b]) for b in batches
+                Dataset(X[:, b], Y[:, b], Y_weights=Y_weights[:, b], wrt=wrt)
+                for b in batches
             ]
         J_weights = np.ones(J.shape) * self.J_weights
         return [
-            Dataset(X[:, b], Y[:, b], J[:, :, b], Y_weights[:, b], J_weights[:, :, b])
+            Dataset(
+                X[:, b],
+                Y[:, b],
+                J[:, :, b],
+                Y_weights[:, b],
+                J_weights[:, :, b],
+                wrt,
+            )
             for b in batches
         ]
 
-    def normalize(self) -> "Dataset":
-        """Return normalized Dataset."""
-        X_norm = normalize(self.X, self.avg_x, self.std_x)
-        Y_norm = normalize(self.Y, self.avg_y, self.std_y)
-        J_norm = normalize_partials(self.J, self.std_x, self.std_y)
-        return Dataset(X_norm, Y_norm, J_norm)
+    def split(
+        self,
+        fraction: float,
+        random_state: Union[int, None] = None,
+    ) -> Tuple["Dataset", "Dataset"]:
+        """Split data into two Datasets, e.g. for training and validation.
+
+        :param fraction: fraction of examples randomly allocated to the
+            second Dataset, between 0 and 1 (exclusive)
+        :param random_state: random seed (useful to make runs
+            repeatable)
+        :return: Datasets with the remaining and the allocated examples
+        """
+        m = self.m
+        k = int(round(fraction * m))
+        if not 0 < k < m:
+            msg = f"fraction must leave examples in both datasets (m = {m})"
+            raise ValueError(msg)
+        indices = np.random.default_rng(random_state).permutation(m)
+        return self._subset(np.sort(indices[k:])), self._subset(np.sort(indices[:k]))
+
+    def folds(
+        self,
+        k: int,
+        shuffle: bool = True,
+        random_state: Union[int, None] = None,
+    ) -> List[Tuple["Dataset", "Dataset"]]:
+        """Split data into k folds for cross-validation.
+
+        .. note::
+            Every fold is a copy of the data, whereas `cross_validate`
+            only extracts each fold from the data when it is trained.
+
+        :param k: number of folds, between 2 and m
+        :param shuffle: shuffle examples before allocating them to folds
+        :param random_state: random seed (useful to make runs repeatable)
+        :return: training and validation Datasets of each fold, where each
+            example is used for validation exactly once
+        """
+        return [
+            (self._subset(training), self._subset(validation))
+            for training, validation in self._fold_indices(k, shuffle, random_state)
+        ]
+
+    def _fold_indices(
+        self,
+        k: int,
+        shuffle: bool = True,
+        random_state: Union[int, None] = None,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Return indices of training and validation examples of each
+        fold (see `folds`)."""
+        m = self.m
+        if not 1 < k <= m:
+            msg = f"number of folds must be between 2 and {m}"
+            raise ValueError(msg)
+        indices = np.arange(m)
+        if shuffle:
+            indices = np.random.default_rng(random_state).permutation(m)
+        bounds = [i * m // k for i in range(k + 1)]
+        return [
+            (np.concatenate([indices[stop:], indices[:start]]), indices[start:stop])
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+
+    def _subset(self, indices: np.ndarray) -> "Dataset":
+        """Return Dataset made up of given examples (and their weights)."""
+        Y_weights = np.broadcast_to(self.Y_weights, self.Y.shape)
+        J_weights = np.broadcast_to(self.J_weights, (self.n_y, self.n_p, self.m))
+        J = None if self.J is None else self.J[:, :, indices]
+        return Dataset(
+            self.X[:, indices],
+            self.Y[:, indices],
+            J,
+            Y_weights[:, indices],
+            J_weights[:, :, indices],
+            self.wrt,
+        )
+
+    def normalize(self, reference: Union["Dataset", None] = None) -> "Dataset":
+        """Return normalized Dataset.
+
+        :param reference: Dataset whose mean and standard deviation are
+            used for normalization, e.g. training data when normalizing
+            validation data [defaulted to self] (optional)
+        """
+        ref = self if reference is None else reference
+        X_norm = normalize(self.X, ref.avg_x, ref.std_x)
+        Y_norm = normalize(self.Y, ref.avg_y, ref.std_y)
+        std_x = ref.std_x if self.wrt is None else ref.std_x[self.wrt]
+        J_norm = normalize_partials(self.J, std_x, ref.std_y)
+        return Dataset(X_norm, Y_norm, J_norm, wrt=self.wrt)
@@ -0,0 +1,467 @@
+"""Ensemble.
+============
+
+This module implements batched training and prediction for an ensemble
+of K neural nets with the same architecture. Instead of training the
+members one by one, each made up of small matrices that leave BLAS
+underutilized, the weights of all members are stored as tensors of
+shape (K, n^[l], n^[l-1]), such that forward propagation, partials and
+backprop are carried out for all members at once with one batched
+matrix multiplication per layer:
+
+.. code-block:: python
+
+    parameters = EnsembleParameters([2, 12, 12, 1], members=8)
+    parameters.initialize(random_state=0)
+    history = train_ensemble(data, parameters, max_iter=1000)
+    y_pred = ensemble_forward(x, parameters, EnsembleCache(...))  # (K, n_y, m)
+
+Members are nonetheless independent: each has its own initialization,
+cost function, ADAM moments and convergence criteria, such that member k
+follows the same path as a single net trained alone by `ADAM` steps of
+constant learning rate (i.e. without line search).
+
+.. note::
+    The weights and biases of all members are views of a single array of
+    shape (K, N), where N is the number of trainable parameters per member
+    (the input layer is excluded), and so are their partials. Parameters
+    are therefore stacked for the optimizer at no cost, unlike
+    `Parameters.stack`, which concatenates lists of arrays.
+"""  # noqa: W291
+
+from collections import defaultdict
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from .activation import ACTIVATIONS
+from .data import Dataset
+from .optimization import ADAM
+from .parameters import Parameters
+from .propagation import eye
+
+
+class EnsembleParameters:
+    r"""Parameters of K neural nets with the same architecture.
+
+    .. warning::
+        The attributes `W`, `b`, `dW` and `db` are views of `theta` and
+        `grads`. Update them in place (e.g. `W[1][:] = ...`) rather than
+        overwriting them.
+
+    :param layer_sizes: number of nodes in each layer (including
+        input/output layers)
+    :param members: number of members K in the ensemble
+    :param hidden_activation: activation function used in hidden layers
+    :param output_activation: activation function used in output layer
+
+    :ivar theta: trainable parameters of each member :math:`\in
+        \mathbb{R}^{K \times N}`, ordered as `[W1, b1, W2, b2, ...]`
+    :vartype theta: np.ndarray
+
+    :ivar grads: partials of the cost of each member w.r.t. `theta`
+    :vartype grads: np.ndarray
+
+    :ivar W: weights :math:`\in \mathbb{R}^{K \times n^{[l]} \times
+        n^{[l-1]}}` for each layer (identity for input layer)
+    :vartype W: List[np.ndarray]
+
+    :ivar b: biases :math:`\in \mathbb{R}^{K \times n^{[l]} \times 1}`
+        for each layer
+    :vartype b: List[np.ndarray]
+
+    :ivar random_states: random seed used to initialize each member
+    :vartype random_states: List[int]
+    """
+
+    def __init__(
+        self,
+        layer_sizes: List[int],
+        members: int = 8,
+        hidden_activation: str = "tanh",
+        output_activation: str = "linear",
+    ):  # noqa D107
+        self.layer_sizes = layer_sizes
+        self.K = members
+        self.hidden_activation = hidden_activation
+        self.output_activation = output_activation
+        self.a = ["linear"] + [hidden_activation] * (self.L - 2) + [output_activation]
+        self.random_states: List[int] = []
+        self.mu_x = np.zeros((self.n_x, 1))
+        self.mu_y = np.zeros((self.n_y, 1))
+        self.sigma_x = np.ones((self.n_x, 1))
+        self.sigma_y = np.ones((self.n_y, 1))
+        sizes = [n * p + n for p, n in zip(layer_sizes[:-1], layer_sizes[1:])]
+        self.theta = np.zeros((members, sum(sizes)))
+        self.grads = np.zeros((members, sum(sizes)))
+        identity = np.broadcast_to(np.eye(self.n_x), (members, self.n_x, self.n_x))
+        self.W = [identity]
+        self.b = [np.zeros((members, self.n_x, 1))]
+        self.dW = [np.zeros((members, self.n_x, self.n_x))]
+        self.db = [np.zeros((members, self.n_x, 1))]
+        start = 0
+        for p, n in zip(layer_sizes[:-1], layer_sizes[1:]):
+            middle = start + n * p
+            stop = middle + n
+            self.W.append(self.theta[:, start:middle].reshape((members, n, p)))
+            self.b.append(self.theta[:, middle:stop].reshape((members, n, 1)))
+            self.dW.append(self.grads[:, start:middle].reshape((members, n, p)))
+            self.db.append(self.grads[:, middle:stop].reshape((members, n, 1)))
+            start = stop
+
+    @property
+    def n_x(self) -> int:
+        """Return number of inputs."""
+        return self.layer_sizes[0]
+
+    @property
+    def n_y(self) -> int:
+        """Return number of outputs."""
+        return self.layer_sizes[-1]
+
+    @property
+    def L(self) -> int:
+        """Return number of layers."""
+        return len(self.layer_sizes)
+
+    def initialize(self, random_state: Union[int, None] = None) -> None:
+        """Initialize each member independently (He initialization), such
+        that member k is the same as a single net initialized with
+        `Parameters.initialize(random_states[k])`.
+
+        :param random_state: optional random seed from which the seeds of
+            the members are drawn (for repeatability)
+        """
+        rng = np.random.default_rng(random_state)
+        seeds = rng.integers(2**31, size=self.K)
+        self.random_states = [int(seed) for seed in seeds]
+        for k, seed in enumerate(self.random_states):
+            member = Parameters(
+                self.layer_sizes, self.hidden_activation, self.output_activation
+            )
+            member.initialize(seed)
+            self.set_member(k, member)
+
+    def set_member(self, k: int, member: Parameters) -> None:
+        """Copy weights and biases of a single net into member k.
+
+        :param k: index of the member
+        :param member: parameters of a single net with the same layer sizes
+        """
+        for layer in range(1, self.L):
+            self.W[layer][k] = member.W[layer]
+            self.b[layer][k] = member.b[layer]
+
+    def member(self, k: int) -> Parameters:
+        """Return parameters of member k as those of a single net (copy).
+
+        :param k: index of the member
+        """
+        member = Parameters(
+            self.layer_sizes, self.hidden_activation, self.output_activation
+        )
+        member.initialize()
+        for layer in range(1, self.L):
+            member.W[layer][:] = self.W[layer][k]
+            member.b[layer][:] = self.b[layer][k]
+        member.mu_x[:] = self.mu_x
+        member.mu_y[:] = self.mu_y
+        member.sigma_x[:] = self.sigma_x
+        member.sigma_y[:] = self.sigma_y
+        return member
+
+
+class EnsembleCache:
+    r"""Quantities computed during forward prop of all members, so they
+    don't have to be recomputed again during backprop (see `Cache`).
+
+    The activations of the input layer are the same for all members, so
+    they are stored once and broadcast, e.g. `A[0]` is of shape (n_x, m)
+    whereas `A[l]` is of shape (K, n^[l], m) for l > 0.
+
+    :param layer_sizes: number of nodes in each layer (including
+        input/output layers)
+    :param members: number of members K in the ensemble
+    :param m: number of examples (used to preallocate arrays)
+    :param n_p: number of partials propagated forward [defaulted to n_x]
+        (optional)
+    """
+
+    def __init__(
+        self,
+        layer_sizes: List[int],
+        members: int,
+        m: int,
+        n_p: Union[int, None] = None,
+    ):  # noqa D107
+        n_x = layer_sizes[0]
+        n_p = n_x if n_p is None else n_p
+        self.m = m
+        self.n_p = n_p
+        self.A: List[np.ndarray] = [np.zeros((n_x, m))]
+        self.A_prime: List[np.ndarray] = [np.zeros((n_x, n_p, m))]
+        self.Z: List[np.ndarray] = [np.zeros((0,))]
+        self.Z_prime: List[np.ndarray] = [np.zeros((0,))]
+        self.G_prime: List[np.ndarray] = [np.zeros((0,))]
+        self.G_prime_prime: List[np.ndarray] = [np.zeros((0,))]
+        self.dA: List[np.ndarray] = [np.zeros((0,))]
+        self.dA_prime: List[np.ndarray] = [np.zeros((0,))]
+        for n in layer_sizes[1:]:
+            self.Z.append(np.zeros((members, n, m)))
+            self.A.append(np.zeros((members, n, m)))
+            self.G_prime.append(np.zeros((members, n, m)))
+            self.G_prime_prime.append(np.zeros((members, n, m)))
+            self.dA.append(np.zeros((members, n, m)))
+            self.Z_prime.append(np.zeros((members, n, n_p, m)))
+            self.A_prime.append(np.zeros((members, n, n_p, m)))
+            self.dA_prime.append(np.zeros((members, n, n_p, m)))
+
+
+def _transpose(array: np.ndarray) -> np.ndarray:
+    """Transpose last two axes (batched matrix transpose)."""
+    return np.swapaxes(array, -1, -2)
+
+
+def _collapse(array: np.ndarray) -> np.ndarray:
+    """Merge partials and examples axes, i.e. (..., n_p, m) -> (..., n_p * m)."""
+    return array.reshape((*array.shape[:-2], -1))
+
+
+def ensemble_forward(
+    X: np.ndarray,
+    parameters: EnsembleParameters,
+    cache: EnsembleCache,
+    order: int = 0,
+) -> np.ndarray:
+    """Propagate forward through all members (in place).
+
+    :param X: inputs, array of shape (n_x, m)
+    :param parameters: parameters of all members
+    :param cache: ensemble cache
+    :param order: highest order of activation derivatives to compute along
+        with the activations, i.e. 0 (none), 1 (G_prime) or 2 (G_prime and
+        G_prime_prime) [defaulted to 0] (optional)
+    :return: predicted response of each member, array of shape (K, n_y, m)
+    """
+    cache.A[0][...] = X
+    for s in range(1, parameters.L):
+        r = s - 1
+        Z = cache.Z[s]
+        np.matmul(parameters.W[s], cache.A[r], out=Z)
+        Z += parameters.b[s]
+        ACTIVATIONS[parameters.a[s]].evaluate_all(
+            Z,
+            cache.A[s],
+            cache.G_prime[s] if order >= 1 else None,
+            cache.G_prime_prime[s] if order >= 2 else None,  # noqa: PLR2004
+        )
+    return cache.A[-1]
+
+
+def ensemble_partials_forward(
+    X: np.ndarray,
+    parameters: EnsembleParameters,
+    cache: EnsembleCache,
+    wrt: Union[List[int], None] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Propagate response and partials forward through all members (in place).
+
+    :param X: inputs, array of shape (n_x, m)
+    :param parameters: parameters of all members
+    :param cache: ensemble cache
+    :param wrt: indices of inputs w.r.t. which to compute partials
+        [defaulted to all inputs] (optional)
+    :return: predicted response and partials of each member, arrays of
+        shape (K, n_y, m) and (K, n_y, n_p, m)
+    """
+    ensemble_forward(X, parameters, cache, order=1)
+    cache.A_prime[0][...] = eye(parameters.n_x, cache.m, wrt)
+    for s in range(1, parameters.L):
+        r = s - 1
+        W = parameters.W[s]
+        A_prime_prev = _collapse(cache.A_prime[r])
+        if parameters.a[s] == "linear":  # g' = 1
+            np.matmul(W, A_prime_prev, out=_collapse(cache.A_prime[s]))
+            continue
+        np.matmul(W, A_prime_prev, out=_collapse(cache.Z_prime[s]))
+        np.multiply(
+            cache.G_prime[s][:, :, None, :], cache.Z_prime[s], out=cache.A_prime[s]
+        )
+    return cache.A[-1], cache.A_prime[-1]
+
+
+def ensemble_backward(
+    data: Dataset,
+    parameters: EnsembleParameters,
+    cache: EnsembleCache,
+    lambd: float = 0.0,
+) -> np.ndarray:
+    """Propagate backward through all members (in place).
+
+    .. note::
+        Assumes forward propagation of the partials, i.e.
+        `ensemble_partials_forward`, was performed with the same parameters
+        (or only `ensemble_forward` with `order=1` if `data.J` is None).
+
+    :param data: object containing training data and associated metadata
+    :param parameters: parameters of all members
+    :param cache: ensemble cache
+    :param lambd: regularization coefficient to avoid overfitting
+        [defaulted to zero] (optional)
+    :return: partials of the cost of each member w.r.t. its parameters,
+        i.e. `parameters.grads` of shape (K, N)
+    """
+    coefficient = 1 / data.m
+    is_enhanced = data.J is not None and not np.all(data.J_weights == 0.0)
+    cache.dA[-1][...] = data.Y_weights * (cache.A[-1] - data.Y)
+    if is_enhanced:
+        cache.dA_prime[-1][...] = data.J_weights * (cache.A_prime[-1] - data.J)
+    for s in reversed(range(1, parameters.L)):
+        r = s - 1
+        W = parameters.W[s]
+        dW = parameters.dW[s]
+        db = parameters.db[s]
+        is_linear = parameters.a[s] == "linear"
+        dZ = cache.dA[s] if is_linear else cache.G_prime[s] * cache.dA[s]
+        np.matmul(dZ, _transpose(cache.A[r]), out=dW)
+        dW *= coefficient
+        dW += lambd * coefficient * W
+        np.sum(dZ, axis=-1, keepdims=True, out=db)
+        db *= coefficient
+        if r > 0:  # no need to propagate into input layer
+            np.matmul(_transpose(W), dZ, out=cache.dA[r])
+        if not is_enhanced:
+            continue
+        dZ_prime = cache.dA_prime[s]
+        if not is_linear:
+            dZ_prime = dZ_prime * cache.G_prime[s][:, :, None, :]
+        dZ_prime = _collapse(dZ_prime)
+        dW += coefficient * np.matmul(dZ_prime, _transpose(_collapse(cache.A_prime[r])))
+        if r > 0:
+            np.matmul(_transpose(W), dZ_prime, out=_collapse(cache.dA_prime[r]))
+        if parameters.a[s] in ["linear", "relu"]:  # g'' = 0
+            continue
+        G_prime_prime = ACTIVATIONS[parameters.a[s]].second_derivative(
+            cache.Z[s], cache.A[s], cache.G_prime[s], cache.G_prime_prime[s]
+        )
+        dZ = G_prime_prime * np.sum(cache.dA_prime[s] * cache.Z_prime[s], axis=2)
+        dW += coefficient * np.matmul(dZ, _transpose(cache.A[r]))
+        db += coefficient * np.sum(dZ, axis=-1, keepdims=True)
+        if r > 0:
+            cache.dA[r] += np.matmul(_transpose(W), dZ)
+    return parameters.grads
+
+
+def ensemble_cost(
+    data: Dataset,
+    parameters: EnsembleParameters,
+    Y_pred: np.ndarray,
+    J_pred: Union[np.ndarray, None] = None,
+    lambd: float = 0.0,
+) -> np.ndarray:
+    """Evaluate cost function of each member.
+
+    :param data: object containing training data and associated metadata
+    :param parameters: parameters of all members
+    :param Y_pred: predicted response of each member, array of shape (K,
+        n_y, m)
+    :param J_pred: predicted partials of each member, array of shape (K,
+        n_y, n_p, m) (optional)
+    :param lambd: regularization coefficient to avoid overfitting
+        [defaulted to zero] (optional)
+    :return: cost of each member, array of shape (K,)
+    """
+    cost = np.sum(data.Y_weights * np.square(Y_pred - data.Y), axis=(1, 2))
+    if J_pred is not None and data.J is not None:
+        cost += np.sum(data.J_weights * np.square(J_pred - data.J), axis=(1, 2, 3))
+    if lambd > 0.0:
+        for W in parameters.W[1:]:
+            cost += lambd * np.sum(np.square(W), axis=(1, 2))
+    cost *= 0.5 / data.m
+    return cost
+
+
+def train_ensemble(
+    data: Dataset,
+    parameters: EnsembleParameters,
+    alpha: float = 0.05,
+    beta: Union[np.ndarray, float] = 1.0,
+    gamma: Union[np.ndarray, float] = 1.0,
+    lambd: float = 0.0,
+    beta1: float = 0.9,
+    beta2: float = 0.99,
+    epsilon_absolute: float = 1e-12,
+    epsilon_relative: float = 1e-12,
+    epochs: int = 1,
+    max_iter: int = 200,
+    batch_size: Union[int, None] = None,
+    shuffle: bool = True,
+    random_state: Union[int, None] = None,
+) -> dict:
+    r"""Train all members of an ensemble at once using ADAM.
+
+    Each member has its own moments (ADAM updates are elementwise), cost
+    and convergence criteria, which are the same as for a single net (see
+    `Optimizer.minimize`). A batch ends once all members have converged
+    (members that converged earlier keep taking steps) or after `max_iter`
+    iterations.
+
+    :param data: object containing training data and associated metadata
+    :param parameters: parameters of all members (updated in place)
+    :param alpha: learning rate :math:`\alpha`
+    :param beta: regularization coefficient :math:`\beta` (multiplier
+        on response error)
+    :param gamma: gradient-enhancement coefficient :math:`\gamma`
+        (multiplier on partials error)
+    :param lambd: regularization coefficient :math:`\lambda`
+    :param beta1: `ADAM <https://arxiv.org/abs/1412.6980>`_ optimizer
+        hyperparameter to control momentum
+    :param beta2: ADAM optimizer hyperparameter to control momentum
+    :param epsilon_absolute: absolute convergence criterion
+    :param epsilon_relative: relative convergence criterion
+    :param epochs: number of passes through data
+    :param max_iter: max number of optimizer iterations per batch
+    :param batch_size: mini-batch size (if None, single batch)
+    :param shuffle: shuffle data points before breaking them into batches
+    :param random_state: random seed used to shuffle data points
+    :return: cost history of each member, i.e. arrays of shape
+        (n_iterations, K) indexed by epoch and batch, e.g.
+        `history["epoch_0"]["batch_0"]`
+    """
+    history: dict = defaultdict(dict)
+    data.set_weights(beta, gamma)
+    update = ADAM(beta1, beta2)
+    K = parameters.K
+    for e in range(epochs):
+        batches = data.mini_batches(batch_size, shuffle, random_state)
+        for b, batch in enumerate(batches):
+            cache = EnsembleCache(parameters.layer_sizes, K, batch.m, batch.n_p)
+            costs = np.zeros((max_iter, K))
+            N1 = np.zeros(K, dtype=int)
+            N2 = np.zeros(K, dtype=int)
+            y_first = y_previous = costs[0]
+            for i in range(max_iter):
+                if batch.J is None:
+                    Y_pred = ensemble_forward(batch.X, parameters, cache, order=1)
+                    J_pred = None
+                else:
+                    Y_pred, J_pred = ensemble_partials_forward(
+                        batch.X, parameters, cache, batch.wrt
+                    )
+                y = costs[i] = ensemble_cost(batch, parameters, Y_pred, J_pred, lambd)
+                grads = ensemble_backward(batch, parameters, cache, lambd)
+                update.step()
+                parameters.theta[...] = update(parameters.theta, grads, alpha)
+                if i == 0:
+                    y_first = y
+                if i > 1:  # same criteria as Optimizer.minimize, per member
+                    dF = np.abs(y - y_previous)
+                    dF2 = dF / np.maximum(np.abs(y), 1e-6)
+                    N1 = np.where(dF < epsilon_absolute * y_first, N1 + 1, 0)
+                    N2 = np.where(dF2 < epsilon_relative, N2 + 1, 0)
+                    if np.all((N1 > 100) | (N2 > 100)):  # noqa: PLR2004
+                        costs = costs[: i + 1]
+                        break
+                y_previous = y
+            history[f"epoch_{e}"][f"batch_{b}"] = costs
+    return history
@@ -2,16 +2,23 @@
 ================
 
 .. ADAM: https://doi.org/10.48550/arXiv.1412.6980
+.. L-BFGS: https://doi.org/10.1007/978-0-387-40065-5
+.. LM: https://www2.imm.dtu.dk/pubdb/pubs/3215-full.html
 
-This module implements gradient-based optimization using `ADAM`_. 
+This module implements gradient-based optimization using `ADAM`_ or
+`L-BFGS`_ (Nocedal and Wright, "Numerical Optimization," ch. 3 and 7),
+as well as `Levenberg-Marquardt <LM_>`_ for least squares problems.
 """  # noqa W291
 
 from abc import ABC, abstractmethod
 from collections.abc import Callable
-from typing import Union
+from typing import Any, Union
 
 import numpy as np
 
+from . import profiling
+from .callbacks import Callback
+
 
 class Update(ABC):
     r"""Base class for line search.
@@ -49,6 +56,24 @@ class Update(ABC):
         """
         return self._update(params, grads, alpha)
 
+    def step(self) -> None:
+        """Start new step, i.e. the next calls are given a new gradient
+        (as opposed to trying other step sizes along the same direction)."""
+
+    def reset(self) -> None:
+        """Forget state accumulated over previous steps (if any)."""
+
+    def state(self) -> dict:
+        """Return copy of state accumulated over previous steps (if any),
+        e.g. to save a checkpoint."""
+        return {}
+
+    def restore(self, state: dict) -> None:
+        """Restore state returned by `state`.
+
+        :param state: state accumulated over previous steps
+        """
+
 
 class GD(Update):
     r"""Take single step along the search direction using gradient descent.
@@ -76,6 +101,12 @@ class ADAM(Update):
     improve efficiency. This is accomplished making use of previous
     information (see paper).
 
+    .. note::
+        Steps are counted (for bias correction) by calls to `step`, which
+        line searches make once per search direction, such that the same
+        gradient array can be updated in place between steps. A first
+        call without `step` counts as the first step.
+
     :param beta_1: exponential decay rate of 1st moment vector
         :math:`\beta_1\in[0, 1)`
     :param beta_2: exponential decay rate of 2nd moment vector
@@ -90,10 +121,13 @@ class ADAM(Update):
         self.beta_1 = beta_1
         self.beta_2 = beta_2
 
-        self._v: Union[np.ndarray, None] = None
-        self._s: Union[np.ndarray, None] = None
-        self._t = 0
-        self._grads: Union[np.ndarray, None] = None
+        self._v = np.zeros(0)  # 1st moment vector
+        self._s = np.zeros(0)  # 2nd moment vector
+        self._work = np.zeros(0)  # scratch buffer
+        self._t = 0  # step counter (number of search directions so far)
+
+    def step(self) -> None:  # noqa: D102
+        self._t += 1
 
     def _update(
         self,
@@ -104,37 +138,145 @@ class ADAM(Update):
         beta_1 = self.beta_1
         beta_2 = self.beta_2
 
+        shape = np.broadcast_shapes(params.shape, grads.shape)
+        if self._v.shape != shape:
+            self._v = np.zeros(shape)
+            self._s = np.zeros(shape)
+            self._work = np.zeros(shape)
+
         v = self._v
         s = self._s
+        work = self._work
+
+        self._t = max(self._t, 1)  # first step, if `step` was not called
         t = self._t
 
-        if v is None:
-            v = np.zeros(params.shape)
-        if s is None:
-            s = np.zeros(params.shape)
+        epsilon = np.finfo(float).eps  # small number to avoid division by zero
 
-        a: list[int] = [id(x) for x in grads]
-        b: list[int] = []
-        if self._grads is not None:
-            b = [id(x) for x in self._grads]
+        # Moments (in place): v := beta_1 v + (1 - beta_1) g, same for s with g^2
+        np.multiply(grads, 1.0 - beta_1, out=work)
+        v *= beta_1
+        v += work
+        np.square(grads, out=work)
+        work *= 1.0 - beta_2
+        s *= beta_2
+        s += work
+
+        # Bias corrected step: x = params - alpha * v_hat / sqrt(s_hat + eps)
+        np.divide(s, 1.0 - beta_2**t, out=work)
+        work += epsilon
+        np.sqrt(work, out=work)
+        x = np.divide(v, 1.0 - beta_1**t)  # only allocation (returned)
+        x *= alpha
+        x /= work
+        np.subtract(params, x, out=x)
 
-        if a != b:
-            self._grads = grads
-            t += 1  # only update for new search directions
+        return x.reshape(params.shape)
 
-        epsilon = np.finfo(float).eps  # small number to avoid division by zero
-        v = beta_1 * v + (1.0 - beta_1) * grads
-        s = beta_2 * s + (1.0 - beta_2) * np.square(grads)
-        v_corrected = v / (1.0 - beta_1**t)
-        s_corrected = s / (1.0 - beta_2**t) + epsilon
+    def state(self) -> dict:  # noqa: D102
+        if not self._v.size:
+            return dict(t=self._t)
+        return dict(v=self._v.copy(), s=self._s.copy(), t=self._t)
 
-        x = params - alpha * v_corrected / np.sqrt(s_corrected)
+    def restore(self, state: dict) -> None:  # noqa: D102
+        self._t = int(state["t"])
+        self._v = np.array(state.get("v", np.zeros(0)), dtype=float)
+        self._s = np.array(state.get("s", np.zeros(0)), dtype=float)
+        self._work = np.zeros(self._v.shape)
 
-        self._v = v
-        self._s = s
-        self._t = t
 
-        return x.reshape(params.shape)
+class LBFGS(Update):
+    r"""Take single step along the search direction as determined by `L-BFGS`_.
+
+    Parameters :math:`\boldsymbol{x}` are updated according to
+    :math:`\boldsymbol{x} := \boldsymbol{x} + \alpha \boldsymbol{s}`
+    where :math:`\boldsymbol{s} = -H \nabla_x f` and :math:`H` is a
+    limited-memory approximation of the inverse Hessian, built from the
+    last few changes of parameters and gradients using the two-loop
+    recursion. On the first iteration (or after `reset`), the search
+    direction is the normalized steepest descent direction.
+
+    .. note::
+        The approximation is only positive definite if the curvature
+        condition :math:`\Delta \boldsymbol{x} \cdot \Delta \nabla_x f > 0`
+        holds, which a strong-Wolfe line search guarantees. Pairs that
+        violate it are skipped.
+
+    :param memory: number of most recent (parameter, gradient) changes
+        used to approximate the inverse Hessian
+    """
+
+    def __init__(
+        self,
+        memory: int = 10,
+    ):  # noqa D107
+        self.memory = memory
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget curvature information (restart from steepest descent)."""
+        self._s: list[np.ndarray] = []  # changes of parameters
+        self._y: list[np.ndarray] = []  # changes of gradients
+        self._x: Union[np.ndarray, None] = None
+        self._g: Union[np.ndarray, None] = None
+        self._grads: Union[np.ndarray, None] = None
+        self._direction: Union[np.ndarray, None] = None
+
+    def state(self) -> dict:  # noqa: D102
+        # Pairs are new arrays at each step (never modified in place)
+        return dict(s=list(self._s), y=list(self._y), x=self._x, g=self._g)
+
+    def restore(self, state: dict) -> None:  # noqa: D102
+        self.reset()
+        self._s = list(state.get("s", []))
+        self._y = list(state.get("y", []))
+        self._x = state.get("x")
+        self._g = state.get("g")
+
+    def _direction_of(self, g: np.ndarray) -> np.ndarray:
+        """Return search direction using two-loop recursion."""
+        if not self._s:
+            return -g / max(float(np.linalg.norm(g)), np.finfo(float).eps)
+        q = g.copy()
+        rhos = [1.0 / float(np.dot(y, s)) for s, y in zip(self._s, self._y)]
+        alphas = []
+        for s, y, rho in zip(self._s[::-1], self._y[::-1], rhos[::-1]):
+            a = rho * float(np.dot(s, q))
+            q -= a * y
+            alphas.append(a)
+        s, y = self._s[-1], self._y[-1]
+        q *= float(np.dot(s, y)) / float(np.dot(y, y))  # initial H = gamma I
+        for s, y, rho, a in zip(self._s, self._y, rhos, alphas[::-1]):
+            b = rho * float(np.dot(y, q))
+            q += (a - b) * s
+        q *= -1.0
+        return q
+
+    def _update(
+        self,
+        params: np.ndarray,
+        grads: np.ndarray,
+        alpha: float,
+    ) -> np.ndarray:
+        if grads is not self._grads:  # only update for new search directions
+            x = params.astype(np.float64).ravel()
+            g = grads.astype(np.float64).ravel()
+            if self._x is not None and self._g is not None:
+                s = x - self._x
+                y = g - self._g
+                if np.dot(s, y) > np.finfo(float).eps * np.dot(y, y):
+                    self._s.append(s)
+                    self._y.append(y)
+                    if len(self._s) > self.memory:
+                        self._s.pop(0)
+                        self._y.pop(0)
+            self._x = x
+            self._g = g
+            self._grads = grads
+            self._direction = self._direction_of(g)
+        assert self._direction is not None  # set on first call
+        step = alpha * self._direction.reshape(params.shape)
+        return params + step
 
 
 class LineSearch(ABC):
@@ -161,6 +303,8 @@ class LineSearch(ABC):
         grads: np.ndarray,
         cost: Callable,
         learning_rate: float,
+        gradient: Union[Callable, None] = None,
+        f0: Union[float, None] = None,
     ) -> np.ndarray:
         r"""Take multiple steps along the search direction.
 
@@ -169,6 +313,10 @@ class LineSearch(ABC):
             shape (n,)
         :param cost: cost function, array of shape (1,)
         :param learning_rate: initial step size :math:`\alpha`
+        :param gradient: cost function gradient, for line searches that
+            check curvature at trial points (optional)
+        :param f0: cost function already evaluated at `params`, so that
+            it is not evaluated again (optional)
         :return: new_params: updated parameters, array of shape (n,)
         """
         raise NotImplementedError
@@ -203,6 +351,8 @@ class Backtracking(LineSearch):
         grads: np.ndarray,
         cost: Callable,
         learning_rate: float = 0.05,
+        gradient: Union[Callable, None] = None,
+        f0: Union[float, None] = None,
     ) -> np.ndarray:
         r"""Take multiple "update" steps along search direction.
 
@@ -214,12 +364,17 @@ class Backtracking(LineSearch):
         :param cost: objective function :math:`f`
         :param learning_rate: maximum allowed step size :math:`\alpha
             \le \alpha_{max}`
+        :param gradient: not used (only the cost is checked)
+        :param f0: objective function already evaluated at `params`
+            (optional)
         :return: updated parameters :math:`x`, array of shape (n,)
         """
         tau = self.tau
         tol = self.tol
-        x0 = self.update(params, grads, alpha=0)
-        f0 = cost(x0)
+        self.update.step()
+        x0 = self.update(params, grads, alpha=0)  # advances state (e.g. ADAM)
+        if f0 is None:
+            f0 = cost(x0)
         tau = max(0.0, min(1.0, tau))
         alpha = learning_rate
         x = self.update(params, grads, alpha)
@@ -236,6 +391,473 @@ class Backtracking(LineSearch):
         return x
 
 
+class Armijo(LineSearch):
+    r"""Search for step size satisfying the sufficient decrease condition.
+
+    Given the search direction :math:`\boldsymbol{s}` of the update and
+    :math:`\phi(\alpha) = f(\boldsymbol{x} + \alpha \boldsymbol{s})`, the
+    accepted step size satisfies the Armijo condition:
+
+    .. math::
+        \phi(\alpha) \le \phi(0) + c_1 \alpha \phi'(0)
+
+    where :math:`\phi(0)` is the cost already known at the current point
+    and :math:`\phi'(0) = \nabla_x f \cdot \boldsymbol{s}` is computed
+    from the gradient already known, so that each trial step costs one
+    cost function evaluation only. Rejected step sizes are reduced by
+    minimizing a quadratic (then cubic) interpolation of :math:`\phi`,
+    safeguarded to :math:`[0.1 \alpha, 0.5 \alpha]` (Nocedal and Wright,
+    "Numerical Optimization," section 3.5).
+
+    .. note::
+        If :math:`\boldsymbol{s}` is not a descent direction (which can
+        happen with `ADAM`), simple decrease :math:`\phi(\alpha) <
+        \phi(0)` is required instead. If no step size is accepted within
+        `max_count` evaluations, the last (smallest) step is taken, as
+        in `Backtracking`.
+
+    :param update: object that updates parameters according to
+        :math:`\boldsymbol{x} := \boldsymbol{x} + \alpha \boldsymbol{s}`
+    :param c1: sufficient decrease parameter :math:`c_1 \in (0, 1)`
+    :param tol: stop when step size becomes smaller than this tolerance
+    :param max_count: maximum number of cost function evaluations
+
+    .. automethod:: __call__
+    """
+
+    def __init__(
+        self,
+        update: Update,
+        c1: float = 1e-4,
+        tol: float = 1e-12,
+        max_count: int = 20,
+    ):  # noqa D107
+        super().__init__(update)
+        self.c1 = c1
+        self.tol = tol
+        self.max_count = max_count
+
+    def __call__(
+        self,
+        params: np.ndarray,
+        grads: np.ndarray,
+        cost: Callable,
+        learning_rate: float = 0.05,
+        gradient: Union[Callable, None] = None,
+        f0: Union[float, None] = None,
+    ) -> np.ndarray:
+        r"""Take multiple steps along search direction.
+
+        :param params: parameters :math:`x` to be updated, array of
+            shape (n,)
+        :param grads: gradient :math:`\nabla_x f` of objective function
+            :math:`f` w.r.t. each parameter, array of shape (n,)
+        :param cost: objective function :math:`f`
+        :param learning_rate: initial trial step size :math:`\alpha`
+        :param gradient: not used (the known gradient `grads` suffices)
+        :param f0: objective function already evaluated at `params`
+            (evaluated if not provided)
+        :return: updated parameters :math:`x`, array of shape (n,)
+        """
+        if f0 is None:
+            f0 = cost(params)
+        f0 = _scalar(f0)
+        self.update.step()
+        s = self.update(params, grads, alpha=1.0) - params  # search direction
+        df0 = float(np.dot(np.ravel(grads), np.ravel(s)))
+        c1 = self.c1 if df0 < 0.0 else 0.0  # simple decrease otherwise
+        alpha = learning_rate
+        alpha_prev = f_prev = None
+        x = params
+        for _ in range(max(1, self.max_count)):
+            x = params + alpha * s
+            f = _scalar(cost(x))
+            if f <= f0 + c1 * alpha * df0 and (c1 > 0.0 or f < f0):
+                return x
+            alpha_new = _backtracking_interpolation(
+                f0, min(df0, 0.0), alpha, f, alpha_prev, f_prev
+            )
+            if alpha_new < self.tol:
+                return x
+            alpha_prev, f_prev = alpha, f
+            alpha = alpha_new
+        return x
+
+
+def _backtracking_interpolation(
+    f0: float,
+    df0: float,
+    alpha: float,
+    f: float,
+    alpha_prev: Union[float, None] = None,
+    f_prev: Union[float, None] = None,
+) -> float:
+    """Return next step size of backtracking line search, which minimizes
+    the quadratic interpolating phi(0), phi'(0), phi(alpha) or, if a
+    previous step was rejected, the cubic also interpolating phi(alpha_prev),
+    safeguarded to [0.1 alpha, 0.5 alpha]."""
+    lower, upper = 0.1 * alpha, 0.5 * alpha
+    if not np.isfinite(f) or df0 == 0.0:
+        return upper
+    if alpha_prev is None or f_prev is None or not np.isfinite(f_prev):
+        denominator = 2.0 * (f - f0 - df0 * alpha)
+        alpha_new = -df0 * alpha**2 / denominator if denominator > 0.0 else upper
+    else:
+        r1 = f - f0 - df0 * alpha
+        r0 = f_prev - f0 - df0 * alpha_prev
+        scale = 1.0 / (alpha**2 * alpha_prev**2 * (alpha - alpha_prev))
+        a = scale * (alpha_prev**2 * r1 - alpha**2 * r0)
+        b = scale * (-(alpha_prev**3) * r1 + alpha**3 * r0)
+        if a == 0.0:
+            alpha_new = -df0 / (2.0 * b) if b > 0.0 else upper
+        else:
+            discriminant = b**2 - 3.0 * a * df0
+            if discriminant < 0.0:
+                alpha_new = upper
+            else:
+                alpha_new = (-b + np.sqrt(discriminant)) / (3.0 * a)
+    return float(min(max(alpha_new, lower), upper))
+
+
+class StrongWolfe(LineSearch):
+    r"""Search for step size satisfying the strong Wolfe conditions.
+
+    Given the search direction :math:`\boldsymbol{s}` of the update and
+    :math:`\phi(\alpha) = f(\boldsymbol{x} + \alpha \boldsymbol{s})`, the
+    accepted step size satisfies the sufficient decrease and curvature
+    conditions:
+
+    .. math::
+        \phi(\alpha) \le \phi(0) + c_1 \alpha \phi'(0)
+        \quad \text{and} \quad
+        |\phi'(\alpha)| \le c_2 |\phi'(0)|
+
+    The step size is increased until the minimum is bracketed, then the
+    bracket is narrowed using quadratic interpolation (Nocedal and Wright,
+    "Numerical Optimization," algorithms 3.5 and 3.6). If no acceptable
+    step size is found within `max_count` evaluations, the best point
+    found is returned. If none decreased the cost, the state of the
+    update is reset (e.g. L-BFGS restarts from steepest descent) and the
+    search is repeated once, after which the initial point is returned
+    (as the same object, to signal that no progress can be made).
+
+    .. note::
+        The update must be linear in :math:`\alpha` (e.g. `GD` or
+        `LBFGS`, but not `ADAM`). The cost and gradient are always
+        evaluated in that order at each trial point, such that the
+        gradient can reuse quantities computed by the cost function
+        (e.g. forward propagation).
+
+    :param update: object that updates parameters according to
+        :math:`\boldsymbol{x} := \boldsymbol{x} + \alpha \boldsymbol{s}`
+    :param c1: sufficient decrease parameter :math:`c_1 \in (0, 1)`
+    :param c2: curvature parameter :math:`c_2 \in (c_1, 1)`
+    :param max_count: maximum number of cost function evaluations
+    :param max_alpha: maximum step size allowed
+
+    .. automethod:: __call__
+    """
+
+    def __init__(
+        self,
+        update: Update,
+        c1: float = 1e-4,
+        c2: float = 0.9,
+        max_count: int = 20,
+        max_alpha: float = 1e3,
+    ):  # noqa D107
+        super().__init__(update)
+        self.c1 = c1
+        self.c2 = c2
+        self.max_count = max_count
+        self.max_alpha = max_alpha
+        self._count = 0
+        self._best: tuple[float, np.ndarray] = (np.inf, np.zeros(0))
+
+    def __call__(
+        self,
+        params: np.ndarray,
+        grads: np.ndarray,
+        cost: Callable,
+        learning_rate: float = 1.0,
+        gradient: Union[Callable, None] = None,
+        f0: Union[float, None] = None,
+    ) -> np.ndarray:
+        r"""Take multiple steps along search direction.
+
+        :param params: parameters :math:`x` to be updated, array of
+            shape (n,)
+        :param grads: gradient :math:`\nabla_x f` of objective function
+            :math:`f` w.r.t. each parameter, array of shape (n,)
+        :param cost: objective function :math:`f`
+        :param learning_rate: initial trial step size :math:`\alpha`
+        :param gradient: gradient :math:`\nabla_x f` of objective
+            function, evaluated at trial points to check curvature
+        :param f0: objective function already evaluated at `params`
+            (optional)
+        :return: updated parameters :math:`x`, array of shape (n,)
+        """
+        if gradient is None:
+            msg = "gradient is required to check the curvature condition"
+            raise ValueError(msg)
+        if f0 is None:
+            f0 = cost(params)
+        f0 = _scalar(f0)
+        self.update.step()
+        x = self._search(params, grads, cost, learning_rate, gradient, f0)
+        if x is params:  # no decrease: retry after resetting update state
+            self.update.reset()
+            x = self._search(params, grads, cost, learning_rate, gradient, f0)
+        return x
+
+    def _search(
+        self,
+        params: np.ndarray,
+        grads: np.ndarray,
+        cost: Callable,
+        learning_rate: float,
+        gradient: Callable,
+        f0: float,
+    ) -> np.ndarray:
+        """Search along direction of update for strong Wolfe step size."""
+        s = self.update(params, grads, alpha=1.0) - params  # search direction
+        df0 = float(np.dot(np.ravel(grads), np.ravel(s)))
+        if not df0 < 0.0:  # not a descent direction
+            return params
+        self._count = 1
+        self._best = (f0, params)
+
+        def phi(alpha: float) -> tuple[float, np.ndarray]:
+            x = params + alpha * s
+            f = _scalar(cost(x))
+            self._count += 1
+            if f < self._best[0]:
+                self._best = (f, x)
+            return f, x
+
+        def dphi(x: np.ndarray) -> float:
+            return float(np.dot(np.ravel(gradient(x)), np.ravel(s)))
+
+        alpha_lo, f_lo, df_lo = 0.0, f0, df0
+        alpha = min(learning_rate, self.max_alpha)
+        while self._count < self.max_count:
+            f, x = phi(alpha)
+            if f > f0 + self.c1 * alpha * df0 or (alpha_lo > 0.0 and f >= f_lo):
+                return self._zoom(phi, dphi, f0, df0, alpha_lo, f_lo, df_lo, alpha, f)
+            df = dphi(x)
+            if abs(df) <= -self.c2 * df0:
+                return x
+            if df >= 0.0:
+                return self._zoom(phi, dphi, f0, df0, alpha, f, df, alpha_lo, f_lo)
+            if alpha >= self.max_alpha:
+                return x
+            alpha_lo, f_lo, df_lo = alpha, f, df
+            alpha = min(2.0 * alpha, self.max_alpha)
+        return self._best[1]
+
+    def _zoom(
+        self,
+        phi: Callable,
+        dphi: Callable,
+        f0: float,
+        df0: float,
+        alpha_lo: float,
+        f_lo: float,
+        df_lo: float,
+        alpha_hi: float,
+        f_hi: float,
+    ) -> np.ndarray:  # noqa: PLR0913
+        """Narrow down bracket [alpha_lo, alpha_hi] until step is found."""
+        while self._count < self.max_count:
+            alpha = _quadratic_minimizer(alpha_lo, f_lo, df_lo, alpha_hi, f_hi)
+            f, x = phi(alpha)
+            if f > f0 + self.c1 * alpha * df0 or f >= f_lo:
+                alpha_hi, f_hi = alpha, f
+                continue
+            df = dphi(x)
+            if abs(df) <= -self.c2 * df0:
+                return x
+            if df * (alpha_hi - alpha_lo) >= 0.0:
+                alpha_hi, f_hi = alpha_lo, f_lo
+            alpha_lo, f_lo, df_lo = alpha, f, df
+        return self._best[1]
+
+
+def _scalar(value: Union[np.ndarray, float]) -> float:
+    """Convert cost function value of size one to float."""
+    return float(np.asarray(value).item())
+
+
+def _quadratic_minimizer(
+    a: float,
+    f_a: float,
+    df_a: float,
+    b: float,
+    f_b: float,
+) -> float:
+    """Return minimizer of quadratic interpolating f(a), f'(a), f(b),
+    safeguarded to stay within the interval [a, b] (bisection otherwise).
+
+    .. note::
+        Only one derivative is available at the end points of the bracket
+        (the other end point failed sufficient decrease), hence a quadratic
+        rather than a cubic is fitted.
+    """
+    width = b - a
+    curvature = f_b - f_a - df_a * width
+    lower = min(a, b) + 0.1 * abs(width)
+    upper = max(a, b) - 0.1 * abs(width)
+    if curvature > 0.0:
+        alpha = a - df_a * width**2 / (2.0 * curvature)
+        if lower <= alpha <= upper:
+            return alpha
+    return a + 0.5 * width
+
+
+class History:
+    r"""Record cost function (and optionally parameters) over iterations.
+
+    Costs are written into preallocated arrays rather than appended to
+    lists, and parameters are only kept on request, such that long runs
+    of large models do not retain a copy of every iterate.
+
+    :param max_iter: maximum number of iterations to be recorded (used to
+        preallocate arrays, which grow if more are recorded)
+    :param every: record every `every` iterations, or none if zero
+        [defaulted to every iteration] (optional)
+    :param size: keep only the last `size` recorded iterations in a ring
+        buffer [defaulted to all] (optional)
+    :param is_params: record parameters along with costs [defaulted to
+        False] (optional)
+    :param is_best: keep a copy of the parameters with the lowest cost,
+        whether or not the iteration is recorded [defaulted to False]
+        (optional)
+
+    .. note::
+        Recording the last recorded iteration again (e.g. when resuming
+        from a checkpoint) replaces it.
+    """
+
+    def __init__(
+        self,
+        max_iter: int,
+        every: int = 1,
+        size: Union[int, None] = None,
+        is_params: bool = False,
+        is_best: bool = False,
+    ):  # noqa D107
+        capacity = 0 if every <= 0 else -(-max(max_iter, 0) // every)
+        if size is not None:
+            capacity = min(capacity, size)
+        self.every = every
+        self.size = size
+        self.is_params = is_params
+        self.is_best = is_best
+        self._cost = np.zeros(capacity)
+        self._iteration = np.zeros(capacity, dtype=int)
+        self._params: Union[np.ndarray, None] = None
+        self._shape: tuple = ()
+        self._count = 0  # number of iterations recorded so far
+        self.best_cost = np.inf
+        self.best_iteration: Union[int, None] = None
+        self.best_params: Union[np.ndarray, None] = None
+
+    def record(self, i: int, y: Union[np.ndarray, float], x: np.ndarray) -> None:
+        """Record cost function value of iteration (if scheduled).
+
+        :param i: iteration number
+        :param y: cost function value at parameters `x`
+        :param x: parameters at iteration `i`
+        """
+        y = _scalar(y)
+        if self.is_best and y < self.best_cost:
+            if self.best_params is None or self.best_params.shape != x.shape:
+                self.best_params = np.array(x, copy=True)
+            else:
+                np.copyto(self.best_params, x)
+            self.best_cost = y
+            self.best_iteration = i
+        if self.every <= 0 or i % self.every:
+            return
+        capacity = self._cost.size
+        if self._count and self._iteration[(self._count - 1) % capacity] == i:
+            self._count -= 1  # same iteration recorded again
+        if self._count >= capacity and (self.size is None or capacity == 0):
+            self._grow(max(2 * capacity, 1))
+            capacity = self._cost.size
+        k = self._count % capacity  # wraps around when used as ring buffer
+        self._cost[k] = y
+        self._iteration[k] = i
+        if self.is_params:
+            if self._params is None:
+                self._shape = x.shape
+                self._params = np.zeros((capacity, x.size), dtype=x.dtype)
+            self._params[k] = np.ravel(x)
+        self._count += 1
+
+    def state(self) -> dict:
+        """Return copy of recorded values (e.g. to save a checkpoint)."""
+        return dict(
+            cost=self._cost.copy(),
+            iteration=self._iteration.copy(),
+            params=None if self._params is None else self._params.copy(),
+            shape=self._shape,
+            count=self._count,
+            best_cost=self.best_cost,
+            best_iteration=self.best_iteration,
+            best_params=None if self.best_params is None else self.best_params.copy(),
+        )
+
+    def restore(self, state: dict) -> None:
+        """Restore recorded values returned by `state`.
+
+        :param state: recorded values
+        """
+        self._cost = np.array(state["cost"], dtype=float)
+        self._iteration = np.array(state["iteration"], dtype=int)
+        self._params = state.get("params")
+        self._shape = tuple(int(n) for n in np.ravel(state.get("shape", ())))
+        self._count = int(state["count"])
+        self.best_cost = float(state["best_cost"])
+        self.best_iteration = state.get("best_iteration")
+        self.best_params = state.get("best_params")
+
+    def _grow(self, capacity: int) -> None:
+        """Enlarge arrays to new capacity, keeping recorded values."""
+        n = self._cost.size
+        self._cost = np.concatenate([self._cost, np.zeros(capacity - n)])
+        self._iteration = np.concatenate(
+            [self._iteration, np.zeros(capacity - n, dtype=int)]
+        )
+        if self._params is not None:
+            extra = np.zeros((capacity - n, self._params.shape[1]), self._params.dtype)
+            self._params = np.concatenate([self._params, extra])
+
+    def _order(self) -> np.ndarray:
+        """Return indices of recorded entries in chronological order."""
+        capacity = self._cost.size
+        if self._count <= capacity:
+            return np.arange(self._count)
+        return (np.arange(capacity) + self._count) % capacity
+
+    @property
+    def cost(self) -> np.ndarray:
+        """Recorded cost function values, array of shape (n,)."""
+        return self._cost[self._order()]
+
+    @property
+    def iteration(self) -> np.ndarray:
+        """Iteration number of each recorded value, array of shape (n,)."""
+        return self._iteration[self._order()]
+
+    @property
+    def params(self) -> Union[list[np.ndarray], None]:
+        """Recorded parameters (if `is_params`)."""
+        if self._params is None:
+            return [] if self.is_params else None
+        return [self._params[k].reshape(self._shape) for k in self._order()]
+
+
 class Optimizer:
     r"""Find optimum using gradient-based optimization.
 
@@ -252,8 +874,37 @@ class Optimizer:
         line_search: LineSearch,
     ):  # noqa D107
         self.line_search = line_search
-        self.vars_history: Union[list[np.ndarray], None] = None
-        self.cost_history: Union[list[np.ndarray], None] = None
+        self.history: Union[History, None] = None
+        self._loop: dict[str, Any] = {}  # iteration last seen by callback
+
+    def state(self) -> dict:
+        """Return copy of state needed to continue `minimize` from the
+        iteration at which the callback was last notified (e.g. to save a
+        checkpoint), including that of the update (e.g. ADAM moments)."""
+        return dict(update=self.line_search.update.state(), loop=dict(self._loop))
+
+    def restore(self, state: dict) -> None:
+        """Restore state of the update returned by `state`, e.g. ADAM
+        moments (the iteration itself is continued by passing `state` to
+        `minimize`).
+
+        :param state: optimizer state
+        """
+        self.line_search.update.restore(state.get("update", {}))
+
+    @property
+    def cost_history(self) -> Union[np.ndarray, None]:
+        """Cost function values recorded during last call to `minimize`."""
+        if self.history is None:
+            return None
+        return self.history.cost
+
+    @property
+    def vars_history(self) -> Union[list[np.ndarray], None]:
+        """Parameters recorded during last call to `minimize` (if any)."""
+        if self.history is None:
+            return None
+        return self.history.params
 
     def minimize(
         self,
@@ -267,6 +918,9 @@ class Optimizer:
         batch: Union[int, None] = None,
         epsilon_absolute: float = 1e-12,
         epsilon_relative: float = 1e-12,
+        history: Union[History, None] = None,
+        callback: Union[Callback, None] = None,
+        state: Union[dict, None] = None,
     ) -> np.ndarray:
         r"""Minimize single objective function.
 
@@ -283,57 +937,98 @@ class Optimizer:
             (for printing)
         :param epsilon_absolute: absolute error stopping criterion
         :param epsilon_relative: relative error stopping criterion
+        :param history: object in which to record cost function values
+            [defaulted to recording costs and parameters at every
+            iteration] (optional)
+        :param callback: object notified at each iteration and upon
+            convergence, which may request early termination (optional)
+        :param state: state returned by `state` during an interrupted call
+            with the same arguments and history (e.g. loaded from a
+            checkpoint), from which to continue (optional)
         """
         # Stopping criteria (Vanderplaats, "Multidiscipline Design Optimization," ch. 3, p. 121)
-        converged = False
+        converged = ""  # name of criterion satisfied (empty if none)
         N1 = 0
         N1_max = 100
         N2 = 0
         N2_max = 100
 
-        cost_history: list[np.ndarray] = []
-        vars_history: list[np.ndarray] = []
+        if history is None:
+            history = History(max_iter, is_params=True)
+        self.history = history
+
+        y_first = y_previous = np.nan
+
+        start = 0
+        if state is not None:
+            self.restore(state)
+            loop = state["loop"]
+            start = int(loop["iteration"])
+            N1, N2 = int(loop["N1"]), int(loop["N2"])
+            y_first, y_previous = loop["y_first"], loop["y_previous"]
 
         # Iterative update
-        for i in range(0, max_iter):
+        for i in range(start, max_iter):
             y = f(x)
 
-            cost_history.append(y)
-            vars_history.append(x)
+            history.record(i, y, x)
+            y_current = _scalar(y)
+            if i == 0:
+                y_first = y_current
+
+            if callback is not None:
+                self._loop = dict(
+                    iteration=i,
+                    N1=N1,
+                    N2=N2,
+                    y_first=y_first,
+                    y_previous=y_previous,
+                )
+                if callback.on_iteration(epoch, batch, i, y_current, x):
+                    callback.on_converged(epoch, batch, i, "callback")
+                    if verbose:
+                        print("Callback stopping criterion satisfied")
+                    break
 
-            x = self.line_search(params=x, cost=f, grads=dfdx(x), learning_rate=alpha)
+            profiling.count("iterations")
+            x_previous = x
+            grads = dfdx(x)
+            with profiling.phase("line_search"):
+                x = self.line_search(
+                    params=x,
+                    cost=f,
+                    grads=grads,
+                    learning_rate=alpha,
+                    gradient=dfdx,
+                    f0=y,  # reuse cost already evaluated at x
+                )
 
             if verbose:
-                if epoch is not None and batch is not None:
-                    e = epoch
-                    b = batch
-                    print(
-                        f"epoch = {e:d}, batch = {b:d}, iter = {i:d}, cost = {y:6.3f}"
-                    )
-                elif epoch is not None:
-                    e = epoch
-                    print(f"epoch = {e:d}, iter = {i:d}, cost = {y:6.3f}")
-                elif batch is not None:
-                    b = batch
-                    print(f"batch = {b:d}, iter = {i:d}, cost = {y:6.3f}")
-                else:
-                    print(f"iter = {i:d}, cost = {y:6.3f}")
+                print(_progress(i, y, epoch, batch))
+
+            # Line search convergence criterion (no progress possible)
+            if x is x_previous:
+                if verbose:
+                    print("Line search stopping criterion satisfied")
+                if callback is not None:
+                    callback.on_converged(epoch, batch, i, "line search")
+                break
 
             # Absolute convergence criterion
             if i > 1:
-                dF1 = abs(cost_history[-1] - cost_history[-2])
-                if dF1 < epsilon_absolute * cost_history[0]:
+                dF1 = abs(y_current - y_previous)
+                if dF1 < epsilon_absolute * y_first:
                     N1 += 1
                 else:
                     N1 = 0
                 if N1 > N1_max:
-                    converged = True
+                    converged = "absolute"
                     if verbose:
                         print("Absolute stopping criterion satisfied")
 
                 # Relative convergence criterion
-                numerator = abs(cost_history[-1] - cost_history[-2])
-                denominator = max(abs(float(cost_history[-1])), 1e-6)
+                numerator = abs(y_current - y_previous)
+                denominator = max(abs(y_current), 1e-6)
                 dF2 = numerator / denominator
 
                 if dF2 < epsilon_relative:
@@ -341,21 +1036,22 @@ class Optimizer:
                 else:
                     N2 = 0
                 if N2 > N2_max:
-                    converged = True
+                    converged = converged or "relative"
                     if verbose:
                         print("Relative stopping criterion satisfied")
 
                 if converged:
+                    if callback is not None:
+                        callback.on_converged(epoch, batch, i, converged)
                     break
 
+            y_previous = y_current
+
             # Maximum iteration convergence criterion
             if i == max_iter:
                 if verbose:
                     print("Maximum optimizer iterations reached")
 
-        self.cost_history = cost_history
-        self.vars_history = vars_history
-
         return x
 
 
@@ -399,6 +1095,10 @@ class ADAMOptimizer(Optimizer):
         specified tolerance
     :param max_count: stop when line search iterations exceed maximum
         count specified
+    :param is_armijo: use `Armijo` line search (sufficient decrease with
+        interpolated step sizes, where `max_count` caps cost function
+        evaluations) instead of `Backtracking` [defaulted to False]
+        (optional)
     """
 
     def __init__(
@@ -408,11 +1108,327 @@ class ADAMOptimizer(Optimizer):
         tau: float = 0.5,
         tol: float = 1e-12,
         max_count: int = 1_000,
+        is_armijo: bool = False,
     ):  # noqa D107
-        line_search = Backtracking(
-            update=ADAM(beta_1, beta_2),
-            tau=tau,
-            tol=tol,
+        line_search: LineSearch
+        if is_armijo:
+            line_search = Armijo(
+                update=ADAM(beta_1, beta_2),
+                tol=tol,
+                max_count=max_count,
+            )
+        else:
+            line_search = Backtracking(
+                update=ADAM(beta_1, beta_2),
+                tau=tau,
+                tol=tol,
+                max_count=max_count,
+            )
+        super().__init__(line_search)
+
+
+class LBFGSOptimizer(Optimizer):
+    r"""Search for optimum using `L-BFGS`_ algorithm.
+
+    Intended for full-batch training, where the gradient is exact and
+    quasi-Newton steps converge in far fewer cost evaluations than ADAM.
+
+    .. note::
+        The cost and gradient are memoized for the last point at which
+        they were evaluated, such that the point accepted by the line
+        search is not evaluated again at the start of the next iteration.
+
+    :param memory: number of most recent (parameter, gradient) changes
+        used to approximate the inverse Hessian
+    :param c1: sufficient decrease parameter of the line search
+    :param c2: curvature parameter of the line search
+    :param max_count: maximum number of cost function evaluations per
+        line search
+    """
+
+    def __init__(
+        self,
+        memory: int = 10,
+        c1: float = 1e-4,
+        c2: float = 0.9,
+        max_count: int = 20,
+    ):  # noqa D107
+        line_search = StrongWolfe(
+            update=LBFGS(memory),
+            c1=c1,
+            c2=c2,
             max_count=max_count,
         )
         super().__init__(line_search)
+
+    def minimize(
+        self,
+        x: np.ndarray,
+        f: Callable,
+        dfdx: Callable,
+        alpha: float = 1.0,
+        max_iter: int = 100,
+        verbose: bool = False,
+        epoch: Union[int, None] = None,
+        batch: Union[int, None] = None,
+        epsilon_absolute: float = 1e-12,
+        epsilon_relative: float = 1e-12,
+        history: Union[History, None] = None,
+        callback: Union[Callback, None] = None,
+        state: Union[dict, None] = None,
+    ) -> np.ndarray:
+        r"""Minimize single objective function.
+
+        :param x: parameters to be updated, array of shape (n,)
+        :param f: cost function :math:`y = f(\boldsymbol{x})`
+        :param dfdx: cost function gradient
+        :param alpha: initial trial step size of each line search (the
+            quasi-Newton step is already scaled, so one is recommended)
+        :param max_iter: maximum number of optimizer iterations allowed
+        :param verbose: whether or not to send progress output to
+            standard out
+        :param epoch: the epoch in which this optimization is being run
+            (for printing)
+        :param batch: the batch in which this optimization is being run
+            (for printing)
+        :param epsilon_absolute: absolute error stopping criterion
+        :param epsilon_relative: relative error stopping criterion
+        :param history: object in which to record cost function values
+            [defaulted to recording costs and parameters at every
+            iteration] (optional)
+        :param callback: object notified at each iteration and upon
+            convergence, which may request early termination (optional)
+        :param state: state returned by `state` during an interrupted call
+            with the same arguments and history (e.g. loaded from a
+            checkpoint), from which to continue (optional)
+        """
+        if state is None:
+            self.line_search.update.reset()
+        return super().minimize(
+            x,
+            _Memoized(f),
+            _Memoized(dfdx),
+            alpha=alpha,
+            max_iter=max_iter,
+            verbose=verbose,
+            epoch=epoch,
+            batch=batch,
+            epsilon_absolute=epsilon_absolute,
+            epsilon_relative=epsilon_relative,
+            history=history,
+            callback=callback,
+            state=state,
+        )
+
+
+class _Memoized:
+    """Wrap function to return cached value when called again at last point.
+
+    .. warning::
+        Only the last point is remembered, so that functions with side
+        effects (e.g. the gradient of the training cost, which reuses the
+        forward propagation of the last cost evaluation) are still called
+        in the same order as without memoization.
+    """
+
+    def __init__(self, func: Callable):  # noqa D107
+        self.func = func
+        self._x: Union[np.ndarray, None] = None
+        self._value: Any = None
+
+    def __call__(self, x: np.ndarray) -> Any:  # noqa: D102, ANN401
+        if self._x is None or not np.array_equal(x, self._x):
+            self._value = self.func(x)
+            self._x = np.array(x)
+        return self._value
+
+
+class LMOptimizer(Optimizer):
+    r"""Search for optimum of least squares problem using `Levenberg-Marquardt <LM_>`_.
+
+    The objective function is :math:`f(\boldsymbol{x}) = \frac{1}{2}
+    \boldsymbol{r}^T \boldsymbol{r}` where :math:`\boldsymbol{r}(\boldsymbol{x})`
+    are residuals with Jacobian :math:`J = \partial \boldsymbol{r} /
+    \partial \boldsymbol{x}`. Each iteration solves the damped normal
+    equations for the step :math:`\boldsymbol{h}`:
+
+    .. math::
+        (J^T J + \mu I) \boldsymbol{h} = -J^T \boldsymbol{r}
+
+    where the damping :math:`\mu` is updated from the ratio of actual to
+    predicted decrease (Madsen, Nielsen and Tingleff, "Methods for
+    Non-linear Least Squares Problems," algorithm 3.16): small damping
+    yields Gauss-Newton steps, large damping yields short gradient
+    descent steps.
+
+    .. note::
+        The normal equations are solved using an eigendecomposition of the
+        smaller of :math:`J^T J` and :math:`J J^T`, computed once per
+        Jacobian, such that rejected steps (larger damping) only cost one
+        evaluation of the residuals. When there are fewer residuals than
+        parameters, the step is :math:`\boldsymbol{h} = -J^T (J J^T + \mu
+        I)^{-1} \boldsymbol{r}`.
+
+    :param tau: initial damping relative to largest diagonal element of
+        :math:`J^T J`
+    :param max_count: maximum number of rejected steps per iteration,
+        after which the optimizer is considered converged
+    """
+
+    def __init__(
+        self,
+        tau: float = 1e-3,
+        max_count: int = 20,
+    ):  # noqa D107
+        super().__init__(line_search=None)  # type: ignore[arg-type]
+        self.tau = tau
+        self.max_count = max_count
+
+    def state(self) -> dict:  # noqa: D102
+        return dict(update={}, loop=dict(self._loop))
+
+    def restore(self, state: dict) -> None:  # noqa: D102
+        pass  # damping is part of the iteration state
+
+    def minimize(
+        self,
+        x: np.ndarray,
+        f: Callable,
+        dfdx: Callable,
+        alpha: float = 1.0,
+        max_iter: int = 100,
+        verbose: bool = False,
+        epoch: Union[int, None] = None,
+        batch: Union[int, None] = None,
+        epsilon_absolute: float = 1e-12,
+        epsilon_relative: float = 1e-12,
+        history: Union[History, None] = None,
+        callback: Union[Callback, None] = None,
+        state: Union[dict, None] = None,
+    ) -> np.ndarray:
+        r"""Minimize least squares objective function.
+
+        :param x: parameters to be updated, array of shape (n, 1)
+        :param f: residual function :math:`\boldsymbol{r} =
+            \boldsymbol{r}(\boldsymbol{x})`, returning array of shape (k,)
+        :param dfdx: residual Jacobian :math:`J(\boldsymbol{x})`,
+            returning array of shape (k, n), which is always evaluated
+            right after the residuals at the same point
+        :param alpha: not used (step size is controlled by damping)
+        :param max_iter: maximum number of optimizer iterations allowed
+        :param verbose: whether or not to send progress output to
+            standard out
+        :param epoch: the epoch in which this optimization is being run
+            (for printing)
+        :param batch: the batch in which this optimization is being run
+            (for printing)
+        :param epsilon_absolute: stop when the cost decreases by less than
+            this fraction of the initial cost
+        :param epsilon_relative: stop when the cost decreases by less than
+            this fraction of the current cost
+        :param history: object in which to record cost function values
+            [defaulted to recording costs and parameters at every
+            iteration] (optional)
+        :param callback: object notified at each iteration and upon
+            convergence, which may request early termination (optional)
+        :param state: state returned by `state` during an interrupted call
+            with the same arguments and history (e.g. loaded from a
+            checkpoint), from which to continue (optional)
+        """
+        if history is None:
+            history = History(max_iter + 1, is_params=True)
+        self.history = history
+        r = np.ravel(f(x))
+        y = 0.5 * float(np.dot(r, r))
+        J = dfdx(x)
+        y_first = y
+        mu = None
+        nu = 2.0
+        i = 0
+        if state is not None:
+            loop = state["loop"]
+            i = int(loop["iteration"])
+            y_first, mu, nu = loop["y_first"], loop.get("mu"), loop["nu"]
+        for i in range(i, max_iter):
+            history.record(i, y, x)
+            if verbose:
+                print(_progress(i, y, epoch, batch))
+            if callback is not None:
+                self._loop = dict(iteration=i, y_first=y_first, mu=mu, nu=nu)
+                if callback.on_iteration(epoch, batch, i, y, x):
+                    callback.on_converged(epoch, batch, i, "callback")
+                    if verbose:
+                        print("Callback stopping criterion satisfied")
+                    return x
+            profiling.count("iterations")
+            g = J.T @ r
+            with profiling.phase("eigendecomposition"):
+                solve = _damped_solver(J, r)
+            if mu is None:
+                mu = self.tau * float(np.max(np.sum(J * J, axis=0)))
+                mu = max(mu, np.finfo(float).eps)
+            for _ in range(self.max_count):
+                with profiling.phase("solve"):
+                    h = solve(mu)
+                x_new = x + h.reshape(x.shape)
+                r_new = np.ravel(f(x_new))
+                y_new = 0.5 * float(np.dot(r_new, r_new))
+                predicted = 0.5 * float(np.dot(h, mu * h - g))
+                rho = (y - y_new) / predicted if predicted > 0.0 else -1.0
+                if rho > 0.0:
+                    mu *= max(1.0 / 3.0, 1.0 - (2.0 * rho - 1.0) ** 3)
+                    nu = 2.0
+                    break
+                mu *= nu
+                nu *= 2.0
+            else:
+                if verbose:
+                    print("Damping stopping criterion satisfied")
+                if callback is not None:
+                    callback.on_converged(epoch, batch, i, "damping")
+                break
+            decrease = y - y_new
+            x, r, y = x_new, r_new, y_new
+            J = dfdx(x)
+            if decrease < epsilon_absolute * y_first:
+                if verbose:
+                    print("Absolute stopping criterion satisfied")
+                if callback is not None:
+                    callback.on_converged(epoch, batch, i, "absolute")
+                break
+            if decrease < epsilon_relative * max(y, 1e-6):
+                if verbose:
+                    print("Relative stopping criterion satisfied")
+                if callback is not None:
+                    callback.on_converged(epoch, batch, i, "relative")
+                break
+        history.record(i + 1, y, x)
+        return x
+
+
+def _damped_solver(J: np.ndarray, r: np.ndarray) -> Callable:
+    """Return function that solves (J.T J + mu I) h = -J.T r for any mu,
+    using one eigendecomposition of the smaller Gram matrix."""
+    k, n = J.shape
+    if k < n:  # h = -J.T (J J.T + mu I)^-1 r
+        eigenvalues, Q = np.linalg.eigh(J @ J.T)
+        eigenvalues = np.maximum(eigenvalues, 0.0)  # round-off
+        Qr = Q.T @ r
+        return lambda mu: -J.T @ (Q @ (Qr / (eigenvalues + mu)))
+    eigenvalues, Q = np.linalg.eigh(J.T @ J)
+    eigenvalues = np.maximum(eigenvalues, 0.0)  # round-off
+    Qg = Q.T @ (J.T @ r)
+    return lambda mu: -Q @ (Qg / (eigenvalues + mu))
+
+
+def _progress(
+    i: int, y: float, epoch: Union[int, None], batch: Union[int, None]
+) -> str:
+    """Return progress message for printing."""
+    if epoch is not None and batch is not None:
+        return f"epoch = {epoch:d}, batch = {batch:d}, iter = {i:d}, cost = {y:6.3f}"
+    if epoch is not None:
+        return f"epoch = {epoch:d}, iter = {i:d}, cost = {y:6.3f}"
+    if batch is not None:
+        return f"batch = {batch:d}, iter = {i:d}, cost = {y:6.3f}"
+    return f"iter = {i:d}, cost = {y:6.3f}"
@@ -5,20 +5,35 @@ This module defines a utility class to store and manage neural net parameters an
 
 import json
 import os
+import warnings
 from dataclasses import dataclass
 from pathlib import Path
+from types import ModuleType
 from typing import Iterable, List, Union
 
 import jsonpointer
 import jsonschema
 import numpy as np
 import orjson
+from numpy.typing import DTypeLike
 
-from .activation import ACTIVATIONS
+from . import _array_api
+from ._numba import NUMBA_INSTALLED
+from .activation import ACTIVATIONS, APPROXIMATIONS
 
 _here = Path(os.path.dirname(os.path.abspath(__file__)))
 SCHEMA = json.loads((_here / "schema.json").read_text())
 
+BACKENDS = ["numpy", "numba"]
+
+
+def _approximate(activation: str, is_approximate: bool = True) -> str:
+    """Return name of fast approximation of activation (or exact one)."""
+    if is_approximate:
+        return APPROXIMATIONS.get(activation, activation)
+    exact = {value: key for key, value in APPROXIMATIONS.items()}
+    return exact.get(activation, activation)
+
 
 @dataclass
 class Parameters:
@@ -44,6 +59,17 @@ class Parameters:
         input/output layers)
     :param hidden_activation: activation function used in hidden layers
     :param output_activation: activation function used in output layer
+    :param dtype: floating point precision of the parameters [defaulted
+        to double precision] (optional)
+    :param backend: kernels used for propagation, either "numpy" or
+        "numba" (which falls back to "numpy" if Numba is not installed)
+        [defaulted to "numpy"] (optional)
+    :param array_namespace: name of the array API compatible module in
+        which weights and biases are stored and propagation is computed,
+        e.g. "array_api_strict" [defaulted to "numpy"] (optional)
+    :param is_approximate: use fast approximations of activation
+        functions with bounded error (e.g. `FastTanh` instead of `Tanh`),
+        intended for inference [defaulted to False] (optional)
 
     :ivar W: weights :math:`\boldsymbol{W} \in \mathbb{R}^{n^{[l]} \times n^{[l-1]}}` for each layer
     :vartype W: List[np.ndarray]
@@ -76,6 +102,24 @@ class Parameters:
     layer_sizes: List[int]
     hidden_activation: str = "tanh"
     output_activation: str = "linear"
+    dtype: DTypeLike = np.float64
+    backend: str = "numpy"
+    array_namespace: str = "numpy"
+    is_approximate: bool = False
+
+    def __post_init__(self) -> None:  # noqa: D105
+        if self.backend not in BACKENDS:
+            msg = f"backend must be one of {BACKENDS}"
+            raise ValueError(msg)
+        _array_api.get_namespace(self.array_namespace)  # fail early if invalid
+        if self.backend == "numba" and not NUMBA_INSTALLED:
+            msg = "Numba is not installed: falling back to NumPy backend"
+            warnings.warn(msg, stacklevel=2)
+
+    @property
+    def xp(self) -> ModuleType:
+        """Return array namespace of weights and biases."""
+        return _array_api.get_namespace(self.array_namespace)
 
     @property
     def layers(self) -> Iterable[int]:
@@ -109,15 +153,16 @@ class Parameters:
         :param random_state: optional random seed (for repeatability)
         """
         rng = np.random.default_rng(random_state)
+        xp = self.xp
         self.W = []
         self.b = []
         self.a = []
         self.dW = []
         self.db = []
-        self.mu_x = np.zeros((self.n_x, 1))
-        self.mu_y = np.zeros((self.n_y, 1))
-        self.sigma_x = np.ones((self.n_x, 1))
-        self.sigma_y = np.ones((self.n_y, 1))
+        self.mu_x = np.zeros((self.n_x, 1), self.dtype)
+        self.mu_y = np.zeros((self.n_y, 1), self.dtype)
+        self.sigma_x = np.ones((self.n_x, 1), self.dtype)
+        self.sigma_y = np.ones((self.n_y, 1), self.dtype)
         previous_layer_size = -1  # Not used on first loop.
         for i, layer_size in enumerate(self.layer_sizes):
             if i == 0:  # input layer
@@ -136,14 +181,50 @@ class Parameters:
                 )
                 b = np.zeros((layer_size, 1))
                 a = self.hidden_activation
-            dW = np.zeros(W.shape)
-            db = np.zeros(b.shape)
-            self.dW.append(dW)
-            self.db.append(db)
-            self.W.append(W)
-            self.b.append(b)
+            dW = np.zeros(W.shape, self.dtype)
+            db = np.zeros(b.shape, self.dtype)
+            self.dW.append(_array_api.asarray(dW, xp))
+            self.db.append(_array_api.asarray(db, xp))
+            self.W.append(_array_api.asarray(W, xp, self.dtype))
+            self.b.append(_array_api.asarray(b, xp, self.dtype))
             self.a.append(a)
             previous_layer_size = layer_size
+        self.approximate(self.is_approximate)
+
+    def approximate(self, is_approximate: bool = True) -> None:
+        """Switch activations to their fast approximations (or back).
+
+        .. note::
+            Serialized parameters always refer to the exact activations,
+            such that saved files do not depend on this setting.
+
+        :param is_approximate: use fast approximations of activation
+            functions (e.g. "fast_tanh" instead of "tanh") if True, exact
+            activations otherwise
+        """
+        self.is_approximate = is_approximate
+        if not hasattr(self, "a"):  # not initialized yet
+            return
+        self.a[:] = [_approximate(a, is_approximate) for a in self.a]
+
+    def astype(self, dtype: DTypeLike) -> None:
+        """Cast parameters to specified floating point precision (in place).
+
+        .. note::
+            The lists `W`, `b`, `dW`, `db` are updated in place (not
+            replaced), so references to them held elsewhere remain valid.
+
+        :param dtype: floating point precision, e.g. `np.float32`
+        """
+        self.dtype = dtype
+        if not hasattr(self, "W"):  # not initialized yet
+            return
+        for arrays in [self.W, self.b, self.dW, self.db]:
+            arrays[:] = [_array_api.astype(array, dtype) for array in arrays]
+        self.mu_x = self.mu_x.astype(dtype, copy=False)
+        self.mu_y = self.mu_y.astype(dtype, copy=False)
+        self.sigma_x = self.sigma_x.astype(dtype, copy=False)
+        self.sigma_y = self.sigma_y.astype(dtype, copy=False)
 
     def stack(self) -> np.ndarray:
         """Stack W, b into a single array.
@@ -171,9 +252,9 @@ class Parameters:
         """
         stacks = []
         for i in range(self.L):
-            stack = np.concatenate([self.W[i].ravel(), self.b[i].ravel()]).reshape(
-                (-1, 1)
-            )
+            W = _array_api.to_numpy(self.W[i])
+            b = _array_api.to_numpy(self.b[i])
+            stack = np.concatenate([W.ravel(), b.ravel()]).reshape((-1, 1))
             stacks.append(stack)
         return stacks
 
@@ -204,8 +285,8 @@ class Parameters:
         for i in range(self.L):
             stack = np.concatenate(
                 [
-                    self.dW[i].ravel(),
-                    self.db[i].ravel(),
+                    _array_api.to_numpy(self.dW[i]).ravel(),
+                    _array_api.to_numpy(self.db[i]).ravel(),
                 ]
             ).reshape((-1, 1))
             stacks.append(stack)
@@ -267,10 +348,13 @@ class Parameters:
         """
         if isinstance(parameters, np.ndarray):  # single column
             parameters = self._column_to_stacks(parameters)
+        xp = self.xp
         for i, array in enumerate(parameters):  # stacks to params for each layer
             n, p = self.W[i].shape
-            self.W[i][:] = array[: n * p].reshape(n, p)
-            self.b[i][:] = array[n * p :].reshape(n, 1)
+            W = _array_api.asarray(array[: n * p].reshape(n, p), xp)
+            b = _array_api.asarray(array[n * p :].reshape(n, 1), xp)
+            _array_api.assign(self.W[i], W)
+            _array_api.assign(self.b[i], b)
 
     def unstack_partials(self, partials: Union[np.ndarray, List[np.ndarray]]) -> None:
         """Unstack backprop partials dW, db back into list of arrays.
@@ -298,33 +382,41 @@ class Parameters:
         """
         if isinstance(partials, np.ndarray):  # single column
             partials = self._column_to_stacks(partials)
+        xp = self.xp
         for i, array in enumerate(partials):
             n, p = self.dW[i].shape
-            self.dW[i][:] = array[: n * p].reshape(n, p)
-            self.db[i][:] = array[n * p :].reshape(n, 1)
+            dW = _array_api.asarray(array[: n * p].reshape(n, p), xp)
+            db = _array_api.asarray(array[n * p :].reshape(n, 1), xp)
+            _array_api.assign(self.dW[i], dW)
+            _array_api.assign(self.db[i], db)
 
     def _serialize(self) -> bytes:
         """Serialize parameters into byte stream for json."""
         keys = jsonpointer.JsonPointer("/properties").get(SCHEMA)
         data = {key: getattr(self, key) for key in keys}
+        data["a"] = [_approximate(a, False) for a in self.a]
+        data["W"] = [_array_api.to_numpy(W) for W in self.W]
+        data["b"] = [_array_api.to_numpy(b) for b in self.b]
         return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
 
     def _deserialize(self, saved_parameters: bytes) -> None:
         """Deserialize and apply saved parameters."""
         params = orjson.loads(saved_parameters)
         jsonschema.validate(params, SCHEMA)
-        self.W = [np.array(value) for value in params["W"]]
-        self.b = [np.array(value) for value in params["b"]]
-        self.a = params["a"]
-        self.mu_x = np.array(params["mu_x"])
-        self.mu_y = np.array(params["mu_y"])
-        self.sigma_x = np.array(params["sigma_x"])
-        self.sigma_y = np.array(params["sigma_y"])
+        xp = self.xp
+        self.W = [_array_api.asarray(W, xp, self.dtype) for W in params["W"]]
+        self.b = [_array_api.asarray(b, xp, self.dtype) for b in params["b"]]
+        self.a = [_approximate(a, False) for a in params["a"]]
+        self.mu_x = np.array(params["mu_x"], self.dtype)
+        self.mu_y = np.array(params["mu_y"], self.dtype)
+        self.sigma_x = np.array(params["sigma_x"], self.dtype)
+        self.sigma_y = np.array(params["sigma_y"], self.dtype)
         self.layer_sizes = [W.shape[0] for W in self.W]
         self.output_activation = self.a[-1]
         self.hidden_activation = self.a[-2]
-        self.dW = [np.zeros(array.shape) for array in self.W]
-        self.db = [np.zeros(array.shape) for array in self.b]
+        dtype = _array_api.as_dtype(xp, self.dtype)
+        self.dW = [xp.zeros(array.shape, dtype=dtype) for array in self.W]
+        self.db = [xp.zeros(array.shape, dtype=dtype) for array in self.b]
         assert (
             self.mu_x.size == self.layer_sizes[0]
         ), "mu_x size is different input layer size"
@@ -357,6 +449,7 @@ class Parameters:
                 m,
             ), f"W[{i}] has the wrong shape (expected {(n, m)})"
             m = n
+        self.approximate(self.is_approximate)
 
     def save(self, binary_file: Union[str, Path] = "parameters.json") -> None:
         """Save parameters to specified json file."""
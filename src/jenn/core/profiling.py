@@ -0,0 +1,214 @@
+"""Profiling.
+=============
+
+This module implements an opt-in profiler that times the phases of
+training (e.g. forward, partials and backward propagation, cost function,
+line search, parameter stacking and batch construction) and counts
+function and gradient evaluations. Phases are timed wherever they occur
+in :mod:`jenn.core.propagation`, :mod:`jenn.core.training` and
+:mod:`jenn.core.optimization` while a profiler is active:
+
+.. code-block:: python
+
+    profiler = Profiler()
+    model.fit(x, y, profiler=profiler)
+    print(model.history["profile"])  # same as profiler.summary()
+    profiler.save_chrome_trace("trace.json")  # open in chrome://tracing
+
+.. note::
+    When no profiler is active, `phase` returns a shared context manager
+    that does nothing and `count` returns immediately, such that the cost
+    of instrumentation is one global lookup per call.
+"""  # noqa: W291
+
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, ContextManager, List, Tuple, Union
+
+_ACTIVE: Union["Profiler", None] = None  # profiler currently recording
+_DISABLED = contextlib.nullcontext()
+
+
+def phase(name: str) -> ContextManager:
+    """Return context manager that times named phase (if profiling).
+
+    :param name: name of the phase, e.g. "forward"
+    """
+    if _ACTIVE is None or _ACTIVE._thread != threading.get_ident():
+        return _DISABLED
+    return _Phase(_ACTIVE, name)
+
+
+def count(name: str, n: int = 1) -> None:
+    """Increment named counter (if profiling).
+
+    :param name: name of the counter, e.g. "cost_evaluations"
+    :param n: increment [defaulted to one] (optional)
+    """
+    if _ACTIVE is not None:
+        _ACTIVE.counters[name] += n
+
+
+class _Phase:
+    """Context manager that records the duration of a phase."""
+
+    __slots__ = ("children", "name", "profiler", "start")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+        self.children = 0.0  # time spent in nested phases
+
+    def __enter__(self) -> None:
+        self.profiler._stack().append(self)
+        self.start = time.perf_counter()
+
+    def __exit__(self, *args: object) -> None:
+        duration = time.perf_counter() - self.start
+        stack = self.profiler._stack()
+        stack.pop()
+        if stack:
+            stack[-1].children += duration
+        stats = self.profiler._phases.get(self.name)
+        if stats is None:
+            stats = self.profiler._phases[self.name] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += duration
+        stats[2] += duration - self.children
+        if self.profiler.is_trace:
+            self.profiler.events.append(
+                (
+                    self.name,
+                    self.start,
+                    duration,
+                    threading.get_ident(),
+                    duration - self.children,
+                )
+            )
+
+
+class Profiler:
+    """Record duration of training phases and count evaluations.
+
+    The profiler records while it is used as a context manager (which
+    `train_model` does when given one). Phases may be nested, in which
+    case the time of inner phases is included in the total time of outer
+    phases (e.g. "forward" is included in "line_search"), but not in
+    their self time.
+
+    Only phases of the thread that started recording are recorded, such
+    that work split among threads (e.g. `n_threads` in `train_model`) is
+    timed once, by the phase that encloses it in the calling thread,
+    rather than once per thread (which would add up to more than the
+    elapsed time).
+
+    :param is_trace: record every phase in `events` (e.g. for
+        `save_chrome_trace`), whose memory grows with the number of
+        iterations, rather than only the totals of each phase, which is
+        all `summary` needs [defaulted to True] (optional)
+
+    :ivar events: name, start time, duration, thread and self time (i.e.
+        excluding nested phases) of each recorded phase, in seconds
+        (empty unless `is_trace`)
+    :vartype events: List[Tuple[str, float, float, int, float]]
+
+    :ivar counters: number of occurrences of counted events, e.g.
+        "iterations", "cost_evaluations" or "gradient_evaluations"
+    :vartype counters: Dict[str, int]
+    """
+
+    def __init__(self, is_trace: bool = True) -> None:  # noqa D107
+        self.is_trace = is_trace
+        self.events: List[Tuple[str, float, float, int, float]] = []
+        self._phases: dict[str, List[Any]] = {}  # calls, total and self time
+        self.counters: defaultdict[str, int] = defaultdict(int)
+        self.wall = 0.0  # total time spent active (in seconds)
+        self._origin: Union[float, None] = None
+        self._start = 0.0
+        self._previous: Union[Profiler, None] = None
+        self._thread: Union[int, None] = None  # thread that is recorded
+        self._local = threading.local()  # stack of open phases per thread
+
+    def _stack(self) -> List[_Phase]:
+        """Return phases currently open in calling thread."""
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    def __enter__(self) -> "Profiler":
+        """Start recording (until exit)."""
+        global _ACTIVE  # noqa: PLW0603
+        self._previous = _ACTIVE
+        _ACTIVE = self
+        self._thread = threading.get_ident()
+        self._start = time.perf_counter()
+        if self._origin is None:
+            self._origin = self._start
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Stop recording."""
+        global _ACTIVE  # noqa: PLW0603
+        self.wall += time.perf_counter() - self._start
+        _ACTIVE = self._previous
+        self._previous = None
+
+    def summary(self) -> dict[str, Any]:
+        """Return total time, self time (excluding nested phases), number
+        of calls and mean time of each phase (in seconds), as well as
+        counters and their ratio to the number of optimizer iterations
+        (if any)."""
+        phases = {
+            name: dict(calls=calls, total=total, self=self_time, mean=total / calls)
+            for name, (calls, total, self_time) in self._phases.items()
+        }
+        summary: dict[str, Any] = dict(
+            wall=self.wall,
+            phases=phases,
+            counters=dict(self.counters),
+        )
+        iterations = self.counters.get("iterations", 0)
+        if iterations:
+            summary["per_iteration"] = {
+                name: value / iterations
+                for name, value in self.counters.items()
+                if name != "iterations"
+            }
+        return summary
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """Return recorded phases in Chrome trace event format."""
+        origin = self._origin or 0.0
+        pid = os.getpid()
+        return dict(
+            traceEvents=[
+                dict(
+                    name=name,
+                    cat="jenn",
+                    ph="X",
+                    ts=(start - origin) * 1e6,
+                    dur=duration * 1e6,
+                    pid=pid,
+                    tid=tid,
+                )
+                for name, start, duration, tid, _ in self.events
+            ],
+            displayTimeUnit="ms",
+        )
+
+    def save_chrome_trace(self, path: Union[str, Path]) -> None:
+        """Save timeline of recorded phases as Chrome trace JSON file,
+        which can be opened with chrome://tracing or Perfetto.
+
+        :param path: file to which the trace is saved
+        """
+        with Path(path).open("w", encoding="utf-8") as file:
+            json.dump(self.chrome_trace(), file)
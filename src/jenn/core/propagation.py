@@ -3,20 +3,57 @@
 
 This module contains the critical functionality to propagate information forward and backward through the neural net."""
 
-from typing import Tuple, Union
+from types import ModuleType
+from typing import List, Tuple, Union
 
 import numpy as np
 
+from . import _array_api, _numba, profiling
 from .activation import ACTIVATIONS
 from .cache import Cache
 from .data import Dataset
 from .parameters import Parameters
 
 
-def eye(n: int, m: int) -> np.ndarray:
-    """Copy identify matrix of shape (n, n) m times."""
-    eye = np.eye(n, dtype=float)
-    return np.repeat(eye.reshape((n, n, 1)), m, axis=2)
+def _is_numba(parameters: Parameters, layer: int) -> bool:
+    """Return True if Numba kernels are to be used for this layer."""
+    return (
+        parameters.backend == "numba"
+        and parameters.array_namespace == _array_api.NUMPY
+        and _numba.NUMBA_INSTALLED
+        and parameters.a[layer] in _numba.CODES
+    )
+
+
+def _is_linear(parameters: Parameters, layer: int) -> bool:
+    """Return True if activation of this layer is linear, i.e. g' = 1
+    and g'' = 0, so that multiplications by g' and g'' can be skipped."""
+    return parameters.a[layer] == "linear"
+
+
+def _is_piecewise_linear(parameters: Parameters, layer: int) -> bool:
+    """Return True if activation of this layer has g'' = 0 (e.g. linear,
+    relu), so that second-order terms can be skipped."""
+    return parameters.a[layer] in ["linear", "relu"]
+
+
+def eye(
+    n: int, m: int, wrt: Union[List[int], None] = None, xp: ModuleType = np
+) -> np.ndarray:
+    """Copy identify matrix of shape (n, n) m times.
+
+    :param n: number of rows
+    :param m: number of copies
+    :param wrt: only keep these columns, i.e. return array of shape
+        (n, len(wrt), m) [defaulted to all columns] (optional)
+    :param xp: array namespace in which to create the array [defaulted to
+        NumPy] (optional)
+    """
+    eye = xp.eye(n, dtype=xp.float64)
+    if wrt is not None:
+        eye = xp.take(eye, xp.asarray(wrt), axis=1)
+    k = eye.shape[1]
+    return xp.broadcast_to(xp.reshape(eye, (n, k, 1)), (n, k, m))
 
 
 def first_layer_forward(X: np.ndarray, cache: Union[Cache, None] = None) -> None:
@@ -27,28 +64,39 @@ def first_layer_forward(X: np.ndarray, cache: Union[Cache, None] = None) -> None
         computed during forward prop for each layer, so they can be
         accessed during backprop to avoid re-computing them
     """
-    X = X.astype(float, copy=False)
     if cache is not None:
-        cache.A[0][:] = X
+        _array_api.assign(cache.A[0], X)  # cast to cache precision (no upcast)
 
 
-def first_layer_partials(X: np.ndarray, cache: Union[Cache, None]) -> None:
+def first_layer_partials(
+    X: np.ndarray, cache: Union[Cache, None], V: Union[np.ndarray, None] = None
+) -> None:
     """Compute input layer partial (in place).
 
     :param X: training data inputs, array of shape (n_x, m)
     :param cache: neural net cache that stores neural net quantities
         computed during forward prop for each layer, so they can be
         accessed during backprop to avoid re-computing them
+    :param V: directions along which to differentiate, array of shape
+        (n_x, n_p, m) [defaulted to identity, i.e. all partials] (optional)
     """
-    X = X.astype(float, copy=False)
     if cache is not None:
         n_x, m = X.shape
-        cache.A_prime[0][:] = eye(n_x, m)
+        if V is None:
+            _array_api.assign(cache.A_prime[0], eye(n_x, m, xp=cache.xp))
+        else:
+            _array_api.assign(cache.A_prime[0], V)
 
 
 def next_layer_partials(layer: int, parameters: Parameters, cache: Cache) -> np.ndarray:
     """Compute j^th partial in place for one layer (in place).
 
+    .. note::
+        Assumes the activation 1st derivative was already computed for this
+        layer during forward propagation, i.e. `next_layer_forward` with
+        `order >= 1`. For linear layers, the partials of the linear part
+        `Z_prime` are not stored, since they are equal to `A_prime`.
+
     :param layer: index of current layer.
     :param parameters: object that stores neural net parameters for each
         layer
@@ -59,17 +107,91 @@ def next_layer_partials(layer: int, parameters: Parameters, cache: Cache) -> np.
     s = layer
     r = layer - 1
     W = parameters.W[layer]
-    g = ACTIVATIONS[parameters.a[layer]]
-    cache.G_prime[s][:] = g.first_derivative(cache.Z[s], cache.A[s])
-    for j in range(parameters.n_x):
-        cache.Z_prime[s][:, j, :] = np.dot(W, cache.A_prime[r][:, j, :])
-        cache.A_prime[s][:, j, :] = cache.G_prime[s] * np.dot(
-            W, cache.A_prime[r][:, j, :]
+    if _is_numba(parameters, layer):
+        _numba.partials(
+            W,
+            cache.A_prime[r],
+            cache.G_prime[s],
+            cache.Z_prime[s],
+            cache.A_prime[s],
         )
+        return cache.A_prime[s]
+    xp = parameters.xp
+    p = W.shape[1]
+    A_prime_prev = xp.reshape(cache.A_prime[r], (p, -1))
+    if _is_linear(parameters, layer):  # g' = 1
+        _array_api.matmul(W, A_prime_prev, out=cache.A_prime[s])
+        return cache.A_prime[s]
+    # All partials at once: (n, p) x (p, n_p * m) instead of one dot per partial
+    _array_api.matmul(W, A_prime_prev, out=cache.Z_prime[s])
+    _array_api.multiply(
+        cache.G_prime[s][:, None, :], cache.Z_prime[s], out=cache.A_prime[s]
+    )
     return cache.A_prime[s]
 
 
-def next_layer_forward(layer: int, parameters: Parameters, cache: Cache) -> None:
+def next_layer_second_partials(
+    layer: int,
+    parameters: Parameters,
+    cache: Cache,
+    V: Union[np.ndarray, None] = None,
+) -> np.ndarray:
+    """Compute second-order partials for one layer (in place).
+
+    .. note::
+        Assumes forward propagation of the response and first-order
+        partials (w.r.t. all inputs) was already performed for this layer,
+        including activation derivatives up to 2nd order, i.e.
+        `next_layer_forward` with `order=2`.
+
+    :param layer: index of current layer.
+    :param parameters: object that stores neural net parameters for each
+        layer
+    :param cache: neural net cache that stores neural net quantities
+        computed during forward prop for each layer, so they can be
+        accessed during backprop to avoid re-computing them
+    :param V: directions along which to differentiate the partials, array
+        of shape (n_x, n_q, m) [defaulted to identity, i.e. full Hessian]
+        (optional)
+    """
+    s = layer
+    r = layer - 1
+    xp = parameters.xp
+    W = parameters.W[s]
+    G_prime = cache.G_prime[s]
+    G_prime_prime = cache.G_prime_prime[s]
+    p = W.shape[1]
+    A_prime_prime_prev = xp.reshape(cache.A_prime_prime[r], (p, -1))
+    A_prime_prime = cache.A_prime_prime[s]
+    if _is_linear(parameters, layer):  # g' = 1 and g'' = 0
+        return _array_api.matmul(W, A_prime_prime_prev, out=A_prime_prime)
+    _array_api.matmul(W, A_prime_prime_prev, out=cache.Z_prime_prime[s])
+    _array_api.multiply(
+        G_prime[:, None, None, :], cache.Z_prime_prime[s], out=A_prime_prime
+    )
+    if _is_piecewise_linear(parameters, layer):  # g'' = 0
+        return A_prime_prime
+    Z_prime = cache.Z_prime[s]
+    if V is None:
+        Z_prime_V = Z_prime
+    elif xp is np:  # partials are linear in the seed, so project them onto V
+        Z_prime_V = np.einsum("njm,jqm->nqm", Z_prime, V)
+    else:  # same as einsum, batched over examples: (m, n, j) x (m, j, q)
+        Z_prime_V = xp.permute_dims(
+            xp.matmul(
+                xp.permute_dims(Z_prime, (2, 0, 1)), xp.permute_dims(V, (2, 0, 1))
+            ),
+            (1, 2, 0),
+        )
+    A_prime_prime += (G_prime_prime[:, None, :] * Z_prime)[:, :, None, :] * (
+        Z_prime_V[:, None, :, :]
+    )
+    return A_prime_prime
+
+
+def next_layer_forward(
+    layer: int, parameters: Parameters, cache: Cache, order: int = 0
+) -> None:
     """Propagate forward through one layer (in place).
 
     :param layer: index of current layer.
@@ -78,21 +200,57 @@ def next_layer_forward(layer: int, parameters: Parameters, cache: Cache) -> None
     :param cache: neural net cache that stores neural net quantities
         computed during forward prop for each layer, so they can be
         accessed during backprop to avoid re-computing them
+    :param order: highest order of activation derivatives to compute along
+        with the activations in the same sweep, i.e. 0 (none), 1 (G_prime)
+        or 2 (G_prime and G_prime_prime) [defaulted to 0] (optional)
     """
     s = layer
     r = layer - 1
     W = parameters.W[s]
     b = parameters.b[s]
-    g = ACTIVATIONS[parameters.a[s]]
     Z = cache.Z[s]
     A = cache.A[s]
-    np.dot(W, cache.A[r], out=Z)
+    G_prime = cache.G_prime[s]
+    G_prime_prime = cache.G_prime_prime[s]
+    cache.order = order
+    if _is_numba(parameters, layer):
+        code = _numba.CODES[parameters.a[s]]
+        _numba.forward(W, b, cache.A[r], Z, A, G_prime, G_prime_prime, code, order)
+        return
+    g = ACTIVATIONS[parameters.a[s]]
+    _array_api.matmul(W, cache.A[r], out=Z)
     Z += b
-    g.evaluate(Z, A)
+    g.evaluate_all(
+        Z,
+        A,
+        G_prime if order >= 1 else None,
+        G_prime_prime if order >= 2 else None,  # noqa: PLR2004
+    )
+
+
+def _first_derivatives(parameters: Parameters, cache: Cache) -> None:
+    """Compute activation 1st derivatives of all layers from the cached
+    activations (in place), unless the last forward propagation already
+    did (e.g. `model_forward` does not), which backprop relies on.
+
+    :param parameters: object that stores neural net parameters for each
+        layer
+    :param cache: neural net cache that stores neural net quantities
+        computed during forward prop for each layer
+    """
+    if cache.order >= 1:
+        return
+    for layer in parameters.layers[1:]:  # type: ignore[index]
+        g = ACTIVATIONS[parameters.a[layer]]
+        g.first_derivative(cache.Z[layer], cache.A[layer], cache.G_prime[layer])
+    cache.order = 1
 
 
 def model_partials_forward(
-    X: np.ndarray, parameters: Parameters, cache: Cache
+    X: np.ndarray,
+    parameters: Parameters,
+    cache: Cache,
+    wrt: Union[List[int], None] = None,
 ) -> Tuple[np.ndarray, np.ndarray]:
     """Propagate forward in order to predict reponse(r) and partial(r).
 
@@ -102,15 +260,102 @@ def model_partials_forward(
     :param cache: neural net cache that stores neural net quantities
         computed during forward prop for each layer, so they can be
         accessed during backprop to avoid re-computing them
+    :param wrt: indices of inputs w.r.t. which to compute partials,
+        where cache must be preallocated for n_p = len(wrt) partials
+        [defaulted to all inputs] (optional)
     """
+    if wrt is not None:
+        V = eye(parameters.n_x, X.shape[1], wrt, parameters.xp)
+        return model_jvp_forward(X, V, parameters, cache)
     first_layer_forward(X, cache)
     first_layer_partials(X, cache)
     for layer in parameters.layers[1:]:  # type: ignore[index]
-        next_layer_forward(layer, parameters, cache)
-        next_layer_partials(layer, parameters, cache)
+        with profiling.phase("forward"):
+            next_layer_forward(layer, parameters, cache, order=1)
+        with profiling.phase("partials"):
+            next_layer_partials(layer, parameters, cache)
+    return cache.A[-1], cache.A_prime[-1]
+
+
+def model_jvp_forward(
+    X: np.ndarray, V: np.ndarray, parameters: Parameters, cache: Cache
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Propagate forward in order to predict reponse(r) and its directional
+    derivative(s), i.e. the Jacobian-vector product dy/dx * v.
+
+    Only one tangent per direction is propagated through the layers, so
+    the cost scales with the number of directions rather than n_x.
+
+    :param X: training data inputs, array of shape (n_x, m)
+    :param V: directions along which to differentiate, array of shape
+        (n_x, n_p, m), where cache must be preallocated for n_p partials
+    :param parameters: object that stores neural net parameters for each
+        layer
+    :param cache: neural net cache that stores neural net quantities
+        computed during forward prop for each layer, so they can be
+        accessed during backprop to avoid re-computing them
+    :return: response, array of shape (n_y, m), and directional
+        derivatives, array of shape (n_y, n_p, m)
+    """
+    first_layer_forward(X, cache)
+    first_layer_partials(X, cache, V)
+    for layer in parameters.layers[1:]:  # type: ignore[index]
+        with profiling.phase("forward"):
+            next_layer_forward(layer, parameters, cache, order=1)
+        with profiling.phase("partials"):
+            next_layer_partials(layer, parameters, cache)
     return cache.A[-1], cache.A_prime[-1]
 
 
+def jvp_forward(
+    X: np.ndarray, V: np.ndarray, parameters: Parameters, cache: Cache
+) -> np.ndarray:
+    """Propagate forward in order to predict directional derivative(s).
+
+    :param X: training data inputs, array of shape (n_x, m)
+    :param V: directions along which to differentiate, array of shape
+        (n_x, n_p, m)
+    :param parameters: object that stores neural net parameters for each
+        layer
+    :param cache: neural net cache that stores neural net quantities
+        computed during forward prop for each layer, so they can be
+        accessed during backprop to avoid re-computing them
+    """
+    return model_jvp_forward(X, V, parameters, cache)[-1]
+
+
+def model_hessian_forward(
+    X: np.ndarray,
+    parameters: Parameters,
+    cache: Cache,
+    V: Union[np.ndarray, None] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Propagate forward in order to predict reponse(r), partial(r) and
+    second-order partial(r).
+
+    :param X: training data inputs, array of shape (n_x, m)
+    :param parameters: object that stores neural net parameters for each
+        layer
+    :param cache: neural net cache that stores neural net quantities
+        computed during forward prop for each layer, so they can be
+        accessed during backprop to avoid re-computing them
+    :param V: directions along which to differentiate the partials, array
+        of shape (n_x, n_q, m), where cache must be preallocated for n_q
+        directions [defaulted to identity, i.e. full Hessian] (optional)
+    :return: response, array of shape (n_y, m), partials, array of shape
+        (n_y, n_x, m), and Hessian (or Hessian-vector products), array of
+        shape (n_y, n_x, n_q, m)
+    """
+    first_layer_forward(X, cache)
+    first_layer_partials(X, cache)
+    cache.A_prime_prime[0][...] = 0.0  # input layer is linear
+    for layer in parameters.layers[1:]:  # type: ignore[index]
+        next_layer_forward(layer, parameters, cache, order=2)
+        next_layer_partials(layer, parameters, cache)
+        next_layer_second_partials(layer, parameters, cache, V)
+    return cache.A[-1], cache.A_prime[-1], cache.A_prime_prime[-1]
+
+
 def model_forward(X: np.ndarray, parameters: Parameters, cache: Cache) -> np.ndarray:
     """Propagate forward in order to predict reponse(r).
 
@@ -122,12 +367,18 @@ def model_forward(X: np.ndarray, parameters: Parameters, cache: Cache) -> np.nda
         accessed during backprop to avoid re-computing them
     """
     first_layer_forward(X, cache)
-    for layer in parameters.layers[1:]:  # type: ignore[index]
-        next_layer_forward(layer, parameters, cache)
+    with profiling.phase("forward"):
+        for layer in parameters.layers[1:]:  # type: ignore[index]
+            next_layer_forward(layer, parameters, cache)
     return cache.A[-1]
 
 
-def partials_forward(X: np.ndarray, parameters: Parameters, cache: Cache) -> np.ndarray:
+def partials_forward(
+    X: np.ndarray,
+    parameters: Parameters,
+    cache: Cache,
+    wrt: Union[List[int], None] = None,
+) -> np.ndarray:
     """Propagate forward in order to predict partial(r).
 
     :param X: training data inputs, array of shape (n_x, m)
@@ -136,8 +387,10 @@ def partials_forward(X: np.ndarray, parameters: Parameters, cache: Cache) -> np.
     :param cache: neural net cache that stores neural net quantities
         computed during forward prop for each layer, so they can be
         accessed during backprop to avoid re-computing them
+    :param wrt: indices of inputs w.r.t. which to compute partials
+        [defaulted to all inputs] (optional)
     """
-    return model_partials_forward(X, parameters, cache)[-1]
+    return model_partials_forward(X, parameters, cache, wrt)[-1]
 
 
 def last_layer_backward(cache: Cache, data: Dataset) -> None:
@@ -148,9 +401,11 @@ def last_layer_backward(cache: Cache, data: Dataset) -> None:
         accessed during backprop to avoid re-computing them
     :param data: object containing training and associated metadata
     """
-    cache.dA[-1][:] = data.Y_weights * (cache.A[-1] - data.Y)
+    _array_api.assign(cache.dA[-1], data.Y_weights * (cache.A[-1] - data.Y))
     if data.J is not None:
-        cache.dA_prime[-1][:] = data.J_weights * (cache.A_prime[-1] - data.J)
+        _array_api.assign(
+            cache.dA_prime[-1], data.J_weights * (cache.A_prime[-1] - data.J)
+        )
 
 
 def next_layer_backward(
@@ -158,6 +413,11 @@ def next_layer_backward(
 ) -> None:
     """Propagate backward through next layer (in place).
 
+    .. note::
+        The activation 1st derivative is not recomputed: it is read from
+        the cache, where it was stored during forward propagation (see
+        `model_backward`).
+
     :param layer: index of current layer.
     :param parameters: object that stores neural net parameters for each
         layer
@@ -170,14 +430,29 @@ def next_layer_backward(
     """
     s = layer
     r = layer - 1
-    g = ACTIVATIONS[parameters.a[s]]
-    g.first_derivative(cache.Z[s], cache.A[s], cache.G_prime[s])
-    np.dot(cache.G_prime[s] * cache.dA[s], cache.A[r].T, out=parameters.dW[s])
+    if _is_numba(parameters, layer):
+        _numba.backward(
+            parameters.W[s],
+            cache.A[r],
+            cache.dA[s],
+            cache.G_prime[s],
+            parameters.dW[s],
+            parameters.db[s],
+            cache.dA[r],
+            1 / data.m,
+            lambd,
+        )
+        return
+    if _is_linear(parameters, layer):  # g' = 1
+        dZ = cache.dA[s]
+    else:
+        dZ = cache.G_prime[s] * cache.dA[s]
+    _array_api.matmul(dZ, cache.A[r].T, out=parameters.dW[s])
     parameters.dW[s] /= data.m
     parameters.dW[s] += lambd / data.m * parameters.W[s]
-    np.sum(cache.G_prime[s] * cache.dA[s], axis=1, keepdims=True, out=parameters.db[s])
+    _array_api.sum_rows(dZ, out=parameters.db[s])
     parameters.db[s] /= data.m
-    np.dot(parameters.W[s].T, cache.G_prime[s] * cache.dA[s], out=cache.dA[r])
+    _array_api.matmul(parameters.W[s].T, dZ, out=cache.dA[r])
 
 
 def gradient_enhancement(
@@ -198,44 +473,53 @@ def gradient_enhancement(
     """
     if data.J is None:
         return
-    if np.all(data.J_weights == 0.0):
+    xp = parameters.xp
+    if bool(xp.all(data.J_weights == 0.0)):
         return
     s = layer
     r = layer - 1
-    g = ACTIVATIONS[parameters.a[s]]
-    cache.G_prime_prime[s][:] = g.second_derivative(
-        cache.Z[s], cache.A[s], cache.G_prime[s]
-    )
     coefficient = 1 / data.m
-    for j in range(parameters.n_x):
-        parameters.dW[s] += coefficient * (
-            np.dot(
-                cache.dA_prime[s][:, j, :]
-                * cache.G_prime_prime[s]
-                * cache.Z_prime[s][:, j, :],
-                cache.A[r].T,
-            )
-            + np.dot(
-                cache.dA_prime[s][:, j, :] * cache.G_prime[s],
-                cache.A_prime[r][:, j, :].T,
-            )
-        )
-        parameters.db[s] += coefficient * np.sum(
-            cache.dA_prime[s][:, j, :]
-            * cache.G_prime_prime[s]
-            * cache.Z_prime[s][:, j, :],
-            axis=1,
-            keepdims=True,
-        )
-        cache.dA[r] += np.dot(
-            parameters.W[s].T,
-            cache.dA_prime[s][:, j, :]
-            * cache.G_prime_prime[s]
-            * cache.Z_prime[s][:, j, :],
-        )
-        cache.dA_prime[r][:, j, :] = np.dot(
-            parameters.W[s].T, cache.dA_prime[s][:, j, :] * cache.G_prime[s]
+    if _is_numba(parameters, layer):
+        _numba.gradient_enhancement(
+            parameters.W[s],
+            cache.A[r],
+            cache.A_prime[r],
+            cache.Z[s],
+            cache.A[s],
+            cache.G_prime[s],
+            cache.Z_prime[s],
+            cache.dA_prime[s],
+            cache.G_prime_prime[s],
+            parameters.dW[s],
+            parameters.db[s],
+            cache.dA[r],
+            cache.dA_prime[r],
+            _numba.CODES[parameters.a[s]],
+            coefficient,
         )
+        return
+    W = parameters.W[s]
+    n, p = W.shape
+    # Sum over all partials at once: (n, n_p * m) x (n_p * m, p)
+    if _is_linear(parameters, layer):  # g' = 1
+        dZ_prime = cache.dA_prime[s]
+    else:
+        dZ_prime = cache.dA_prime[s] * cache.G_prime[s][:, None, :]
+    dZ_prime = xp.reshape(dZ_prime, (n, -1))
+    parameters.dW[s] += coefficient * _array_api.matmul(
+        dZ_prime, xp.reshape(cache.A_prime[r], (p, -1)).T
+    )
+    _array_api.matmul(W.T, dZ_prime, out=cache.dA_prime[r])
+    if _is_piecewise_linear(parameters, layer):  # g'' = 0
+        return
+    g = ACTIVATIONS[parameters.a[s]]
+    G_prime_prime = g.second_derivative(
+        cache.Z[s], cache.A[s], cache.G_prime[s], cache.G_prime_prime[s]
+    )
+    dZ = G_prime_prime * xp.sum(cache.dA_prime[s] * cache.Z_prime[s], axis=1)
+    parameters.dW[s] += coefficient * _array_api.matmul(dZ, cache.A[r].T)
+    parameters.db[s] += coefficient * _array_api.sum_rows(dZ)
+    cache.dA[r] += _array_api.matmul(W.T, dZ)
 
 
 def model_backward(
@@ -246,6 +530,12 @@ def model_backward(
 ) -> None:
     """Propagate backward through all layers (in place).
 
+    .. note::
+        Assumes forward propagation, i.e. `model_forward` or (if the cost
+        function is gradient-enhanced) `model_partials_forward`, was
+        performed with the same parameters. The activation derivatives
+        are computed from the cache if the former did not compute them.
+
     :param parameters: object that stores neural net parameters for each
         layer
     :param cache: neural net cache that stores neural net quantities
@@ -255,8 +545,119 @@ def model_backward(
     :param lambd: regularization coefficient to avoid overfitting
         [defaulted to zero] (optional)
     """
-    last_layer_backward(cache, data)
-    for layer in reversed(parameters.layers):  # type: ignore[call-overload]
-        if layer > 0:
-            next_layer_backward(layer, parameters, cache, data, lambd)
-            gradient_enhancement(layer, parameters, cache, data)
+    with profiling.phase("backward"):
+        _first_derivatives(parameters, cache)
+        last_layer_backward(cache, data)
+        for layer in reversed(parameters.layers):  # type: ignore[call-overload]
+            if layer > 0:
+                next_layer_backward(layer, parameters, cache, data, lambd)
+                gradient_enhancement(layer, parameters, cache, data)
+
+
+def _layer_jacobian_backward(
+    layer: int,
+    parameters: Parameters,
+    cache: Cache,
+    dA: np.ndarray,
+    dA_prime: Union[np.ndarray, None],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Union[np.ndarray, None]]:
+    """Propagate backward through one layer, per example (NumPy only).
+
+    Same as `next_layer_backward` followed by `gradient_enhancement`,
+    except that the partials w.r.t. weights and biases are not summed
+    over the examples.
+
+    :param layer: index of current layer.
+    :param parameters: object that stores neural net parameters for each
+        layer
+    :param cache: neural net cache that stores neural net quantities
+        computed during forward prop for each layer
+    :param dA: seed w.r.t. activations of current layer, array of shape
+        (n, m)
+    :param dA_prime: seed w.r.t. partials of current layer, array of
+        shape (n, n_p, m), or None if zero
+    :return: partials w.r.t. weights, array of shape (m, n, p), partials
+        w.r.t. biases, array of shape (m, n), and seeds w.r.t. activations
+        and partials of previous layer
+    """
+    to_numpy = _array_api.to_numpy
+    s = layer
+    r = layer - 1
+    W = to_numpy(parameters.W[s])
+    G_prime = to_numpy(cache.G_prime[s])
+    A_prev = to_numpy(cache.A[r])
+    dZ = dA if _is_linear(parameters, layer) else G_prime * dA
+    if dA_prime is not None and not _is_piecewise_linear(parameters, layer):
+        g = ACTIVATIONS[parameters.a[s]]
+        Z_prime = to_numpy(cache.Z_prime[s])
+        G_prime_prime = g.second_derivative(
+            to_numpy(cache.Z[s]), to_numpy(cache.A[s]), G_prime
+        )
+        dZ = dZ + G_prime_prime * np.sum(dA_prime * Z_prime, axis=1)
+    dW = np.einsum("it,kt->tik", dZ, A_prev)
+    db = dZ.T
+    dA_prev = np.dot(W.T, dZ)
+    if dA_prime is None:
+        return dW, db, dA_prev, None
+    dZ_prime = (
+        dA_prime if _is_linear(parameters, layer) else dA_prime * G_prime[:, None, :]
+    )
+    dW += np.einsum("ijt,kjt->tik", dZ_prime, to_numpy(cache.A_prime[r]))
+    dA_prime_prev = np.einsum("ip,ijt->pjt", W, dZ_prime)
+    return dW, db, dA_prev, dA_prime_prev
+
+
+def model_residual_jacobian(
+    parameters: Parameters, cache: Cache, is_partials: bool = True
+) -> np.ndarray:
+    """Compute Jacobian of predictions w.r.t. stacked parameters (NumPy only).
+
+    Each row is the gradient of one prediction, i.e. of one residual of
+    the least squares cost function, w.r.t. all parameters ordered as in
+    `Parameters.stack`. Rows are ordered as the flattened response, array
+    of shape (n_y, m), followed by the flattened partials, array of shape
+    (n_y, n_p, m). They are computed using one backward pass per output
+    (and per partial) that keeps the contribution of each example, rather
+    than one backward pass per row.
+
+    .. note::
+        Assumes forward propagation of the partials, i.e.
+        `model_partials_forward`, was performed with the same parameters.
+
+    :param parameters: object that stores neural net parameters for each
+        layer
+    :param cache: neural net cache that stores neural net quantities
+        computed during forward prop for each layer
+    :param is_partials: include rows for partials (gradient-enhancement
+        residuals) [defaulted to True] (optional)
+    :return: Jacobian, array of shape (n_y * (1 + n_p) * m, n) where n is
+        the number of parameters
+    """
+    _first_derivatives(parameters, cache)
+    n_y, m, n_p = cache.n_y, cache.m, cache.n_p
+    sizes = [
+        W.shape[0] * W.shape[1] + b.shape[0] for W, b in zip(parameters.W, parameters.b)
+    ]
+    offsets = np.cumsum([0] + sizes)
+    seeds: List[Tuple[int, Union[int, None]]] = [(k, None) for k in range(n_y)]
+    if is_partials:
+        seeds += [(k, j) for k in range(n_y) for j in range(n_p)]
+    jacobian = np.zeros((len(seeds) * m, offsets[-1]))
+    for row, (k, j) in enumerate(seeds):
+        dA = np.zeros((n_y, m))
+        dA_prime = None
+        if j is None:
+            dA[k] = 1.0
+        else:
+            dA_prime = np.zeros((n_y, n_p, m))
+            dA_prime[k, j] = 1.0
+        rows = slice(row * m, (row + 1) * m)
+        for layer in reversed(parameters.layers[1:]):  # type: ignore[index]
+            dW, db, dA, dA_prime = _layer_jacobian_backward(
+                layer, parameters, cache, dA, dA_prime
+            )
+            start = offsets[layer]
+            stop = start + dW.shape[1] * dW.shape[2]
+            jacobian[rows, start:stop] = dW.reshape((m, -1))
+            jacobian[rows, stop : offsets[layer + 1]] = db
+    return jacobian
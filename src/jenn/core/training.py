@@ -3,18 +3,49 @@
 
 This class implements the core algorithm responsible for training the neural networks."""
 
+import contextlib
+import copy
 import functools
+import json
 from collections import defaultdict
-from typing import Union
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import ModuleType
+from typing import Any, List, Tuple, Union
 
 import numpy as np
 
+from . import _array_api, profiling
 from .cache import Cache
-from .cost import Cost
+from .callbacks import (
+    Callback,
+    CallbackList,
+    ConsoleLogger,
+    EarlyStopping,
+    TimeBudget,
+)
+from .checkpoint import Checkpoint
+from .checkpoint import load as load_checkpoint
+from .cost import Cost, Regularization
 from .data import Dataset
-from .optimization import ADAMOptimizer
+from .optimization import (
+    ADAMOptimizer,
+    History,
+    LBFGSOptimizer,
+    LMOptimizer,
+    Optimizer,
+)
 from .parameters import Parameters
-from .propagation import model_backward, model_partials_forward
+from .profiling import Profiler
+from .propagation import (
+    model_backward,
+    model_partials_forward,
+    model_residual_jacobian,
+)
+
+OPTIMIZERS = ["adam", "lbfgs", "lm"]
+LINE_SEARCHES = ["backtracking", "armijo"]
 
 
 def objective_function(
@@ -23,6 +54,7 @@ def objective_function(
     parameters: Parameters,
     cache: Cache,
     stacked_params: np.ndarray,
+    wrt: Union[List[int], None] = None,
 ) -> np.float64:
     """Evaluate cost function for training.
 
@@ -35,10 +67,15 @@ def objective_function(
         accessed during backprop to avoid re-computing them
     stacked_params: neural network parameters returned by the optimizer,
         represented as single array of stacked parameters for all layers.
+    :param wrt: indices of inputs w.r.t. which training partials are
+        provided [defaulted to all inputs] (optional)
     """
-    parameters.unstack(stacked_params)
-    Y_pred, J_pred = model_partials_forward(X, parameters, cache)
-    return cost.evaluate(Y_pred, J_pred)
+    profiling.count("cost_evaluations")
+    with profiling.phase("unstack"):
+        parameters.unstack(stacked_params)
+    Y_pred, J_pred = model_partials_forward(X, parameters, cache, wrt)
+    with profiling.phase("cost"):
+        return cost.evaluate(Y_pred, J_pred)
 
 
 def objective_gradient(
@@ -64,12 +101,462 @@ def objective_gradient(
         optimizer, represented as single array of stacked parameters for
         all layers.
     """
-    parameters.unstack(stacked_params)
+    profiling.count("gradient_evaluations")
+    with profiling.phase("unstack"):
+        parameters.unstack(stacked_params)
     model_backward(data, parameters, cache, lambd)
-    return parameters.stack_partials()
+    with profiling.phase("stack"):
+        return parameters.stack_partials()
+
+
+def _residual_weights(data: Dataset, lambd: float) -> np.ndarray:
+    """Return weights of residuals such that half their sum of squares is
+    the cost function (see `residual_function`).
+
+    :param data: object containing training and associated metadata
+    :param lambd: coefficient that multiplies regularization term in
+        cost function
+    """
+    Y_weights, J_weights = _weights(data)
+    weights = [_array_api.to_numpy(Y_weights).ravel()]
+    if data.J is not None:
+        weights.append(_array_api.to_numpy(J_weights).ravel())
+    return np.sqrt(np.concatenate(weights) / data.m)
+
+
+def residual_function(
+    data: Dataset,
+    parameters: Parameters,
+    cache: Cache,
+    lambd: float,
+    stacked_params: np.ndarray,
+) -> np.ndarray:
+    """Evaluate residuals of least squares cost function for training.
+
+    Half the sum of squares of the residuals is the cost function, i.e.
+    the residuals are the weighted prediction errors of the response and
+    partials, followed by the weights (for regularization).
+
+    :param data: object containing training and associated metadata
+    :param parameters: object that stores neural net parameters for each
+        layer
+    :param cache: neural net cache that stores neural net quantities
+        computed during forward prop for each layer, so they can be
+        accessed to compute the residual Jacobian
+    :param lambd: coefficient that multiplies regularization term in
+        cost function
+    :param stacked_params: neural network parameters returned by the
+        optimizer, represented as single array of stacked parameters for
+        all layers.
+    """
+    profiling.count("cost_evaluations")
+    with profiling.phase("unstack"):
+        parameters.unstack(stacked_params)
+    Y_pred, J_pred = model_partials_forward(data.X, parameters, cache, data.wrt)
+    errors = [_array_api.to_numpy(Y_pred - data.Y).ravel()]
+    if data.J is not None:
+        errors.append(_array_api.to_numpy(J_pred - data.J).ravel())
+    residuals = _residual_weights(data, lambd) * np.concatenate(errors)
+    if lambd > 0.0:
+        W = [_array_api.to_numpy(W).ravel() for W in parameters.W]
+        residuals = np.concatenate(
+            [residuals, np.sqrt(lambd / data.m) * np.concatenate(W)]
+        )
+    return residuals
+
+
+def residual_jacobian(
+    data: Dataset,
+    parameters: Parameters,
+    cache: Cache,
+    lambd: float,
+    stacked_params: np.ndarray,
+) -> np.ndarray:
+    """Evaluate Jacobian of residuals w.r.t. parameters for training.
+
+    .. note::
+        Assumes `residual_function` was evaluated with the same
+        parameters, so that forward propagation is up to date.
+
+    :param data: object containing training and associated metadata
+    :param parameters: object that stores neural net parameters for each
+        layer
+    :param cache: neural net cache that stores neural net quantities
+        computed during forward prop for each layer
+    :param lambd: coefficient that multiplies regularization term in
+        cost function
+    :param stacked_params: neural network parameters returned by the
+        optimizer, represented as single array of stacked parameters for
+        all layers.
+    """
+    profiling.count("gradient_evaluations")
+    with profiling.phase("unstack"):
+        parameters.unstack(stacked_params)
+    with profiling.phase("jacobian"):
+        jacobian = model_residual_jacobian(parameters, cache, data.J is not None)
+    jacobian *= _residual_weights(data, lambd)[:, None]
+    if lambd > 0.0:
+        rows = []
+        for i in range(parameters.L):  # d(W)/d(stack) excluding biases
+            n, p = parameters.W[i].shape
+            block = np.zeros((n * p, n * p + n))
+            if i > 0:  # weights of input layer are not trained
+                block[:, : n * p] = np.sqrt(lambd / data.m) * np.eye(n * p)
+            rows.append(block)
+        regularization = np.zeros((sum(len(row) for row in rows), jacobian.shape[1]))
+        i = j = 0
+        for block in rows:
+            regularization[i : i + block.shape[0], j : j + block.shape[1]] = block
+            i += block.shape[0]
+            j += block.shape[1]
+        jacobian = np.concatenate([jacobian, regularization])
+    return jacobian
+
+
+def _mixed_precision_copy(parameters: Parameters) -> Parameters:
+    """Return working copy of parameters for mixed precision training.
+
+    The weights and biases are stored in single precision, so that
+    propagation runs in single precision, while the partials dW, db are
+    kept in double precision to accumulate the gradient.
+
+    :param parameters: object that stores neural net parameters for each
+        layer (in double precision)
+    """
+    xp = parameters.xp
+    working = copy.deepcopy(parameters)
+    working.astype(np.float32)
+    working.dW[:] = [xp.zeros(dW.shape, dtype=xp.float64) for dW in working.dW]
+    working.db[:] = [xp.zeros(db.shape, dtype=xp.float64) for db in working.db]
+    return working
+
+
+def _weights(data: Dataset) -> Tuple[np.ndarray, np.ndarray]:
+    """Return weights of response and partials as arrays, i.e. broadcast
+    to shapes (n_y, m) and (n_y, n_p, m) if they are scalars.
+
+    :param data: object containing training and associated metadata
+    """
+    Y_weights, J_weights = data.Y_weights, data.J_weights
+    if isinstance(Y_weights, (int, float)):
+        Y_weights = Y_weights * np.ones((data.n_y, data.m))
+    if isinstance(J_weights, (int, float)):
+        J_weights = J_weights * np.ones((data.n_y, data.n_p, data.m))
+    return Y_weights, J_weights
+
+
+def _to_namespace(data: Dataset, xp: ModuleType) -> Dataset:
+    """Return shallow copy of dataset with arrays converted to namespace.
+
+    :param data: object containing training and associated metadata
+    :param xp: array namespace in which propagation is computed
+    """
+    if xp is np:
+        return data
+    Y_weights, J_weights = _weights(data)
+    data = copy.copy(data)
+    data.X = _array_api.asarray(data.X, xp)
+    data.Y = _array_api.asarray(data.Y, xp)
+    data.Y_weights = _array_api.asarray(Y_weights, xp)
+    data.J_weights = _array_api.asarray(J_weights, xp)
+    if data.J is not None:
+        data.J = _array_api.asarray(data.J, xp)
+    return data
+
+
+class _DataParallel:
+    """Cost function and gradient evaluated data-parallel on threads.
+
+    The examples of the batch are split into contiguous shards (views,
+    not copies), each propagated forward and backward on its own thread,
+    with its own cache and partials dW, db, while the weights and biases
+    are shared. The partial results are then reduced in the order of the
+    shards, so that the result does not depend on thread scheduling.
+    Profiling phases are timed once around all shards, as "cost" and
+    "backward" (see :mod:`jenn.core.profiling`).
 
+    .. note::
+        Threads only run concurrently where the GIL is released, i.e.
+        inside the matrix products of the array library, which is worth
+        it for large batches. Limit the threads used by the BLAS library
+        itself (e.g. `OMP_NUM_THREADS`) to avoid oversubscribing cores.
 
-def train_model(
+    :param data: object containing training and associated metadata
+    :param parameters: object that stores neural net parameters for each
+        layer
+    :param lambd: coefficient that multiplies regularization term in
+        cost function
+    :param pool: threads on which the shards are evaluated
+    :param n_shards: number of shards into which the examples are split
+        (at most one per example)
+    """
+
+    def __init__(
+        self,
+        data: Dataset,
+        parameters: Parameters,
+        lambd: float,
+        pool: ThreadPoolExecutor,
+        n_shards: int,
+    ) -> None:
+        self.data = data
+        self.parameters = parameters
+        self.lambd = lambd
+        self.pool = pool
+        n = min(n_shards, data.m)
+        bounds = [i * data.m // n for i in range(n + 1)]
+        self.shards = []
+        self.caches = []
+        self.costs = []
+        self.workers = []  # parameters of each shard
+        xp = parameters.xp
+        Y_weights, J_weights = _weights(data)
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            shard = copy.copy(data)
+            shard.X = data.X[:, a:b]
+            shard.Y = data.Y[:, a:b]
+            shard.Y_weights = Y_weights[:, a:b]
+            shard.J_weights = J_weights[..., a:b]
+            if data.J is not None:
+                shard.J = data.J[..., a:b]
+            worker = copy.copy(parameters)  # shares W, b
+            worker.dW = [xp.zeros(dW.shape, dtype=dW.dtype) for dW in parameters.dW]
+            worker.db = [xp.zeros(db.shape, dtype=db.dtype) for db in parameters.db]
+            self.shards.append(shard)
+            self.workers.append(worker)
+            self.caches.append(
+                Cache(
+                    parameters.layer_sizes,
+                    shard.m,
+                    shard.n_p,
+                    dtype=parameters.dtype,
+                    array_namespace=parameters.array_namespace,
+                )
+            )
+            self.costs.append(Cost(shard, worker))  # regularization added once
+        self.regularization = Regularization(parameters.W, lambd)
+
+    def _forward(self, i: int) -> np.float64:
+        """Return cost function of shard i times its number of examples."""
+        shard = self.shards[i]
+        Y_pred, J_pred = model_partials_forward(
+            shard.X, self.workers[i], self.caches[i], shard.wrt
+        )
+        return self.costs[i].evaluate(Y_pred, J_pred) * shard.m
+
+    def _backward(self, i: int) -> None:
+        """Compute partials dW, db of shard i (without regularization)."""
+        model_backward(self.shards[i], self.workers[i], self.caches[i])
+
+    def function(self, stacked_params: np.ndarray) -> np.float64:
+        """Evaluate cost function for training (see `objective_function`).
+
+        :param stacked_params: neural network parameters returned by the
+            optimizer, represented as single array of stacked parameters
+            for all layers.
+        """
+        profiling.count("cost_evaluations")
+        with profiling.phase("unstack"):
+            self.parameters.unstack(stacked_params)
+        with profiling.phase("cost"):
+            costs = list(self.pool.map(self._forward, range(len(self.shards))))
+            cost = sum(costs) + 0.5 * self.regularization.evaluate()
+        return np.float64(cost / self.data.m)
+
+    def gradient(self, stacked_params: np.ndarray) -> np.ndarray:
+        """Evaluate cost function gradient (see `objective_gradient`).
+
+        :param stacked_params: neural network parameters returned by the
+            optimizer, represented as single array of stacked parameters
+            for all layers.
+        """
+        profiling.count("gradient_evaluations")
+        with profiling.phase("unstack"):
+            self.parameters.unstack(stacked_params)
+        m = self.data.m
+        xp = self.parameters.xp
+        with profiling.phase("backward"):
+            list(self.pool.map(self._backward, range(len(self.shards))))
+            for layer in range(1, self.parameters.L):  # input layer not trained
+                dW = self.lambd / m * self.parameters.W[layer]
+                db = xp.zeros_like(self.parameters.db[layer])
+                for shard, worker in zip(self.shards, self.workers):
+                    dW = dW + shard.m / m * worker.dW[layer]
+                    db = db + shard.m / m * worker.db[layer]
+                _array_api.assign(self.parameters.dW[layer], dW)
+                _array_api.assign(self.parameters.db[layer], db)
+        with profiling.phase("stack"):
+            return self.parameters.stack_partials()
+
+
+def _objective(
+    optimizer: str,
+    data: Dataset,
+    parameters: Parameters,
+    cache: Cache,
+    lambd: float,
+    pool: Union[ThreadPoolExecutor, None] = None,
+    n_threads: int = 1,
+) -> Tuple[Callable, Callable]:
+    """Return function to be minimized by optimizer and its derivative,
+    i.e. residuals and their Jacobian for least squares optimizers, or
+    cost function and its gradient otherwise.
+
+    :param optimizer: optimization algorithm (see `OPTIMIZERS`)
+    :param data: object containing training and associated metadata
+    :param parameters: object that stores neural net parameters for each
+        layer
+    :param cache: neural net cache that stores neural net quantities
+        computed during forward prop for each layer
+    :param lambd: coefficient that multiplies regularization term in
+        cost function
+    :param pool: threads on which to evaluate the cost function and its
+        gradient data-parallel (see `_DataParallel`) (optional)
+    :param n_threads: number of shards into which to split the examples
+        if `pool` is provided [defaulted to one] (optional)
+    """
+    if optimizer == "lm":  # least squares: residuals and Jacobian
+        func = functools.partial(residual_function, data, parameters, cache, lambd)
+        grad = functools.partial(residual_jacobian, data, parameters, cache, lambd)
+        return func, grad
+    if pool is not None:
+        objective = _DataParallel(data, parameters, lambd, pool, n_threads)
+        return objective.function, objective.gradient
+    cost = Cost(data, parameters, lambd)
+    func = functools.partial(
+        objective_function,
+        data.X,
+        cost,
+        parameters,
+        cache,
+        wrt=data.wrt,
+    )
+    grad = functools.partial(
+        objective_gradient,
+        data,
+        parameters,
+        cache,
+        lambd,
+    )
+    return func, grad
+
+
+def _optimizer(
+    optimizer: str,
+    beta1: float,
+    beta2: float,
+    tau: float,
+    tol: float,
+    max_count: int,
+    is_backtracking: bool,
+    line_search: str,
+) -> Optimizer:
+    """Return optimization algorithm (see `train_model`).
+
+    :param optimizer: optimization algorithm (see `OPTIMIZERS`)
+    :param beta1: exponential decay rate of 1st moment vector (ADAM)
+    :param beta2: exponential decay rate of 2nd moment vector (ADAM)
+    :param tau: amount by which to reduce the learning rate during
+        line search (ADAM)
+    :param tol: smallest step size of line search (ADAM)
+    :param max_count: maximum number of line search steps (ADAM)
+    :param is_backtracking: use line search (ADAM)
+    :param line_search: line search algorithm (see `LINE_SEARCHES`)
+    """
+    if optimizer not in OPTIMIZERS:
+        msg = f"optimizer must be one of {OPTIMIZERS}"
+        raise ValueError(msg)
+    if line_search not in LINE_SEARCHES:
+        msg = f"line_search must be one of {LINE_SEARCHES}"
+        raise ValueError(msg)
+    if optimizer == "lbfgs":
+        return LBFGSOptimizer()
+    if optimizer == "lm":
+        return LMOptimizer()
+    return ADAMOptimizer(
+        beta_1=beta1,
+        beta_2=beta2,
+        tau=tau,
+        tol=tol,
+        max_count=is_backtracking * max_count,
+        is_armijo=line_search == "armijo",
+    )
+
+
+def _callbacks(
+    parameters: Parameters,
+    callbacks: Union[List[Callback], None],
+    is_verbose: bool,
+    validation: Union[Dataset, None],
+    validation_every: int,
+    patience: int,
+    time_budget: Union[float, None],
+) -> Tuple[CallbackList, Union[EarlyStopping, None], Union[TimeBudget, None]]:
+    """Return callbacks notified during training (see `train_model`),
+    along with early stopping and time budget (if any), whose best
+    parameters are restored when training ends.
+
+    :param parameters: object that stores neural net parameters for each
+        layer
+    :param callbacks: callbacks provided by the user (optional)
+    :param is_verbose: print progress
+    :param validation: validation data for early stopping (optional)
+    :param validation_every: evaluate validation cost every
+        `validation_every` iterations
+    :param patience: stop after `patience` validation evaluations
+        without improvement
+    :param time_budget: wall-clock time after which training stops (in
+        seconds) (optional)
+    """
+    callback = CallbackList(callbacks)
+    if is_verbose:
+        callback.callbacks.append(ConsoleLogger())
+    early_stopping = None
+    if validation is not None:
+        early_stopping = EarlyStopping(
+            _to_namespace(validation, parameters.xp),
+            parameters,
+            every=validation_every,
+            patience=patience,
+        )
+        callback.callbacks.append(early_stopping)
+    budget = None
+    if time_budget is not None:
+        budget = TimeBudget(time_budget)
+        callback.callbacks.append(budget)
+    return callback, early_stopping, budget
+
+
+def _resume(
+    resume_from: Union[str, Path],
+    parameters: Parameters,
+    algorithm: Optimizer,
+    rng: np.random.Generator,
+    history: dict[str, Any],
+) -> dict[str, Any]:
+    """Restore training state from checkpoint (in place) and return it.
+
+    :param resume_from: checkpoint file (see `Checkpoint`)
+    :param parameters: object that stores neural net parameters for each
+        layer, set to those of the checkpoint
+    :param algorithm: optimizer, whose state is restored
+    :param rng: random number generator that shuffles epochs, whose
+        state is restored
+    :param history: training history, updated with that of checkpoint
+    """
+    resume = load_checkpoint(resume_from)
+    if resume["x"].shape != parameters.stack().shape:
+        msg = f"checkpoint {resume_from} does not match neural net parameters"
+        raise ValueError(msg)
+    parameters.unstack(resume["x"])
+    algorithm.restore(resume["optimizer"])
+    rng.bit_generator.state = json.loads(resume["rng"])
+    for key, value in resume.get("history", {}).items():
+        history[key].update(value)
+    return resume
+
+
+def train_model(  # noqa: PLR0912, PLR0915
     data: Dataset,
     parameters: Parameters,
     alpha: float = 0.05,
@@ -90,13 +577,30 @@ def train_model(
     random_state: Union[int, None] = None,
     is_backtracking: bool = False,
     is_verbose: bool = False,
+    is_mixed_precision: bool = False,
+    optimizer: str = "adam",
+    history_every: int = 1,
+    history_size: Union[int, None] = None,
+    is_best: bool = False,
+    callbacks: Union[List[Callback], None] = None,
+    profiler: Union[Profiler, None] = None,
+    validation: Union[Dataset, None] = None,
+    validation_every: int = 10,
+    patience: int = 10,
+    time_budget: Union[float, None] = None,
+    checkpoint: Union[str, Path, None] = None,
+    checkpoint_every: int = 100,
+    resume_from: Union[str, Path, None] = None,
+    n_threads: int = 1,
+    line_search: str = "backtracking",
 ) -> dict:  # noqa: PLR0913
     r"""Train neural net.
 
     :param data: object containing training and associated metadata
     :param parameters: object that stores neural net parameters for each
         layer
-    :param alpha: learning rate :math:`\alpha`
+    :param alpha: learning rate :math:`\alpha` (ADAM only, since L-BFGS
+        takes quasi-Newton steps of unit length)
     :param beta: LSE coefficients [defaulted to one] (optional)
     :param gamma: jacobian-enhancement regularization coefficient
         [defaulted to zero] (optional)
@@ -107,7 +611,7 @@ def train_model(
     :param beta_2: exponential decay rate of 2nd moment vector
         :math:`\beta_2\in[0, 1)`
     :param tau: amount by which to reduce :math:`\alpha := \tau \times
-        \alpha` on each iteration
+        \alpha` on each iteration of backtracking line search
     :param tol: stop when cost function doesn't improve more than
         specified tolerance
     :param max_count: stop when line search iterations exceed maximum
@@ -121,51 +625,207 @@ def train_model(
     :param shuffle: swhether to huffle data points or not
     :param random_state: random seed (useful to make runs repeatable)
     :param is_backtracking: whether or not to use backtracking during
-        line search
-    :param is_verbose: print out progress for each iteration, each
-        batch, each epoch
+        line search, with at most `max_count` cost evaluations per step
+        (see `line_search`)
+    :param is_verbose: print out progress of iterations (at most once
+        per second), convergence of each batch and end of each epoch
+        (see `ConsoleLogger`)
+    :param is_mixed_precision: run forward and backward propagation in
+        single precision, while the cost function, the gradient
+        accumulation and the optimizer state remain in double precision
+    :param optimizer: optimization algorithm, either "adam", "lbfgs"
+        (quasi-Newton with strong-Wolfe line search) or "lm"
+        (Levenberg-Marquardt, which exploits the least squares structure
+        of the cost function), where the latter two are recommended for
+        full-batch training and do not use the ADAM and backtracking
+        hyperparameters
+    :param history_every: record cost function every `history_every`
+        iterations, or not at all if zero [defaulted to every iteration]
+        (optional)
+    :param history_size: only keep the cost function of the last
+        `history_size` recorded iterations of each batch [defaulted to
+        all] (optional)
+    :param is_best: end each batch with the parameters that achieved the
+        lowest cost function (rather than the last iterate), using a
+        snapshot updated during optimization [defaulted to False]
+        (optional)
+    :param callbacks: objects notified during training (see `Callback`),
+        any of which may request early termination (optional)
+    :param profiler: object that times the phases of training and counts
+        evaluations while training (see `Profiler`), whose summary is
+        added to the history as `history["profile"]` (optional)
+    :param validation: data on which to evaluate the cost function during
+        training, in order to stop when it no longer improves and end
+        with the parameters that achieved the lowest validation cost (see
+        `EarlyStopping`), where the validation cost is added to the
+        history as `history["validation"]` (optional)
+    :param validation_every: evaluate validation cost every
+        `validation_every` iterations [defaulted to 10] (optional)
+    :param patience: stop after `patience` validation evaluations
+        without improvement [defaulted to 10] (optional)
+    :param time_budget: wall-clock time after which training stops (in
+        seconds), ending with the parameters that achieved the lowest
+        training cost in the interrupted batch (unless validation data is
+        provided), where the
+        fraction of the budget used by each phase of training is added
+        to the history as `history["budget"]` (see `TimeBudget`)
+        (optional)
+    :param checkpoint: file in which to save the training state every
+        `checkpoint_every` iterations and after each batch, in order to
+        resume training if interrupted (see `Checkpoint`) (optional)
+    :param checkpoint_every: save checkpoint every `checkpoint_every`
+        iterations of each batch [defaulted to 100] (optional)
+    :param resume_from: checkpoint file from which to continue training,
+        which must have been saved with the same data, parameters and
+        options, in which case the result is the same as that of the
+        uninterrupted run (except for callbacks, e.g. early stopping and
+        time budget, which start over) (optional)
+    :param n_threads: number of threads among which the examples of each
+        batch are split to evaluate the cost function and its gradient
+        (data parallelism), with the same result as on one thread up to
+        round-off, whatever the scheduling (ADAM and L-BFGS only)
+        [defaulted to one] (optional)
+    :param line_search: line search used if `is_backtracking`, either
+        "backtracking", which reduces the step size by `tau` until the
+        cost function decreases (see `Backtracking`), or "armijo", which
+        selects step sizes satisfying the sufficient decrease condition
+        by interpolation (see `Armijo`) [defaulted to "backtracking"]
+        (optional)
     :return: cost function training history accessed as `cost =
-        history[epoch][batch][iter]`
+        history[epoch][batch][iter]`, array of recorded values for each
+        batch
     """
-    history: dict[str, dict[str, Union[list[np.ndarray], None]]] = defaultdict(dict)
-    optimizer = ADAMOptimizer(
-        beta_1=beta1,
-        beta_2=beta2,
-        tau=tau,
-        tol=tol,
-        max_count=is_backtracking * max_count,
+    history: dict[str, Any] = defaultdict(dict)
+    if n_threads > 1 and optimizer == "lm":
+        msg = "n_threads > 1 is not supported by optimizer 'lm'"
+        raise ValueError(msg)
+    algorithm = _optimizer(
+        optimizer, beta1, beta2, tau, tol, max_count, is_backtracking, line_search
     )
+    if optimizer == "lbfgs":
+        alpha = 1.0
+    callback, early_stopping, budget = _callbacks(
+        parameters,
+        callbacks,
+        is_verbose,
+        validation,
+        validation_every,
+        patience,
+        time_budget,
+    )
+    timer = profiler
+    if budget is not None:
+        timer = timer or Profiler(is_trace=False)  # budget use per phase
+    rng = np.random.default_rng()  # shuffles epochs if no random_state
+    start = (0, 0)  # epoch and batch from which to train
+    resume: dict[str, Any] = {}
+    if resume_from is not None:
+        resume = _resume(resume_from, parameters, algorithm, rng, history)
+        start = (resume["epoch"], resume["batch"])
+        if resume.get("iteration") is None:
+            start = (resume["epoch"], resume["batch"] + 1)  # batch was finished
+
+    def snapshot(
+        epoch: int,
+        batch: int,
+        iteration: Union[int, None],
+        params: Union[np.ndarray, None],
+    ) -> dict:
+        """Return copy of training state for checkpoint."""
+        state = dict(
+            epoch=epoch,
+            batch=batch,
+            iteration=iteration,
+            x=parameters.stack() if params is None else np.array(params),
+            optimizer=algorithm.state(),
+            rng=rng_state,
+            history={key: dict(value) for key, value in history.items()},
+        )
+        if iteration is not None:
+            state["record"] = record.state()
+        return state
+
+    saver = None
+    if checkpoint is not None:
+        saver = Checkpoint(checkpoint, snapshot, every=checkpoint_every)
+        callback.callbacks.append(saver)
     data.set_weights(beta, gamma)
-    for e in range(epochs):
-        batches = data.mini_batches(batch_size, shuffle, random_state)
-        for b, batch in enumerate(batches):
-            cache = Cache(parameters.layer_sizes, batch.m)
-            cost = Cost(batch, parameters, lambd)
-            func = functools.partial(
-                objective_function,
-                batch.X,
-                cost,
-                parameters,
-                cache,
-            )
-            grad = functools.partial(
-                objective_gradient,
-                batch,
-                parameters,
-                cache,
-                lambd,
-            )
-            optimizer.minimize(
-                x=parameters.stack(),
-                f=func,
-                dfdx=grad,
-                alpha=alpha,
-                max_iter=max_iter,
-                epsilon_absolute=epsilon_absolute,
-                epsilon_relative=epsilon_relative,
-                verbose=is_verbose,
-                epoch=e,
-                batch=b,
-            )
-            history[f"epoch_{e}"][f"batch_{b}"] = optimizer.cost_history
+    working = parameters  # parameters used for propagation
+    if is_mixed_precision:
+        working = _mixed_precision_copy(parameters)
+    pool = ThreadPoolExecutor(n_threads) if n_threads > 1 else None
+    with contextlib.ExitStack() as stack:
+        for context in (timer, saver, pool):
+            if context is not None:
+                stack.enter_context(context)
+        for e in range(start[0], epochs):
+            rng_state = json.dumps(rng.bit_generator.state)
+            seed = random_state
+            if seed is None:
+                seed = int(rng.integers(2**63))
+            with profiling.phase("batch"):
+                batches = data.mini_batches(batch_size, shuffle, seed)
+            for b, batch in enumerate(batches):
+                if (e, b) < start:
+                    continue
+                with profiling.phase("batch"):
+                    batch = _to_namespace(batch, working.xp)  # noqa: PLW2901
+                    cache = Cache(
+                        parameters.layer_sizes,
+                        batch.m,
+                        batch.n_p,
+                        dtype=working.dtype,
+                        array_namespace=working.array_namespace,
+                    )
+                func, grad = _objective(
+                    optimizer, batch, working, cache, lambd, pool, n_threads
+                )
+                record = History(
+                    max_iter + 1,
+                    every=history_every,
+                    size=history_size,
+                    is_best=is_best,
+                )
+                state = None
+                with profiling.phase("stack"):
+                    x0 = parameters.stack()
+                if (e, b) == start and resume.get("iteration") is not None:
+                    x0 = resume["x"]
+                    state = resume["optimizer"]
+                    record.restore(resume["record"])
+                x = algorithm.minimize(
+                    x=x0,
+                    f=func,
+                    dfdx=grad,
+                    alpha=alpha,
+                    max_iter=max_iter,
+                    epsilon_absolute=epsilon_absolute,
+                    epsilon_relative=epsilon_relative,
+                    epoch=e,
+                    batch=b,
+                    history=record,
+                    callback=callback,
+                    state=state,
+                )
+                if is_best and record.best_params is not None:
+                    x = record.best_params
+                with profiling.phase("unstack"):
+                    parameters.unstack(x)
+                history[f"epoch_{e}"][f"batch_{b}"] = record.cost
+                callback.on_batch_end(e, b, record.cost)
+                if callback.is_stopped:
+                    break
+            callback.on_epoch_end(e, history)
+            if callback.is_stopped:
+                break
+    if budget is not None:
+        if budget.is_exhausted and budget.best_params is not None:
+            parameters.unstack(budget.best_params)
+        history["budget"] = budget.report(timer.summary() if timer else None)
+    if early_stopping is not None:  # takes precedence over training cost
+        if early_stopping.best_params is not None:
+            parameters.unstack(early_stopping.best_params)
+        history["validation"] = np.array(early_stopping.costs)
+    if profiler is not None:
+        history["profile"] = profiler.summary()
     return history
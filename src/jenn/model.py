@@ -33,6 +33,13 @@ functions doing computations under-the-hood.
     # Predict response and partials in one step (preferred)
     y_pred, dydx_pred = nn.evaluate(x_test) 
 
+    # Predict directional derivative dy/dx * v only (one pass for any n_x)
+    dydv_pred = nn.jvp(x_test, v)
+
+    # Predict second-order partials d2y/dx2 (or Hessian-vector products)
+    d2ydx2_pred = nn.predict_hessian(x_test)
+    d2ydx2_v_pred = nn.hvp(x_test, v)
+
 .. Note::
     The method `evaluate()` is preferred over separately 
     calling `predict()` followed by `predict_partials()` 
@@ -45,18 +52,140 @@ functions doing computations under-the-hood.
     due to how some target optimization software architected for example.  
 """  # noqa: W291
 
+import copy
+import os
+import tempfile
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Any, List, Tuple, Union
 
 import numpy as np
+from numpy.typing import DTypeLike
 
+from .core import _array_api
 from .core.cache import Cache
-from .core.data import Dataset, denormalize, denormalize_partials, normalize
+from .core.callbacks import Callback
+from .core.checkpoint import load as load_checkpoint
+from .core.data import (
+    Dataset,
+    denormalize,
+    denormalize_directional_partials,
+    denormalize_hessian,
+    denormalize_hvp,
+    denormalize_partials,
+    normalize,
+    normalize_directions,
+)
+from .core.ensemble import (
+    EnsembleCache,
+    EnsembleParameters,
+    ensemble_forward,
+    ensemble_partials_forward,
+    train_ensemble,
+)
+from .core.optimization import History
 from .core.parameters import Parameters
-from .core.propagation import model_forward, model_partials_forward, partials_forward
+from .core.profiling import Profiler
+from .core.propagation import (
+    jvp_forward,
+    model_forward,
+    model_hessian_forward,
+    model_partials_forward,
+    partials_forward,
+)
 from .core.training import train_model
 
-__all__ = ["NeuralNet"]
+__all__ = ["NeuralNet", "NeuralNetEnsemble"]
+
+
+class _Screened(Exception):  # noqa: N818
+    """Raised to interrupt a start once it has been screened."""
+
+    def __init__(self, cost: float):  # noqa D107
+        super().__init__(cost)
+        self.cost = cost
+
+
+class _Screen(Callback):
+    """Interrupt training once the first batch has been trained for a
+    given number of iterations (just after it has been checkpointed).
+
+    :param iterations: number of iterations after which to interrupt
+    """
+
+    def __init__(self, iterations: int):  # noqa D107
+        self.iterations = iterations
+        self.cost = np.inf
+
+    def on_iteration(  # noqa: D102
+        self,
+        epoch: Union[int, None],
+        batch: Union[int, None],
+        iteration: int,
+        cost: float,
+        params: np.ndarray,
+    ) -> None:
+        if epoch == 0 and batch == 0:
+            if iteration > self.iterations:  # checkpoint saved at previous
+                raise _Screened(self.cost)
+            self.cost = cost
+
+
+def _final_cost(history: dict) -> float:
+    """Return lowest validation cost if any, otherwise final training cost
+    (averaged over the batches of the last epoch)."""
+    if len(history.get("validation", [])):
+        return float(np.min(history["validation"]))
+    epochs = [key for key in history if key.startswith("epoch_")]
+    costs = [cost[-1] for cost in history[epochs[-1]].values() if cost.size]
+    return float(np.mean(costs)) if costs else np.inf
+
+
+def _fit_start(
+    model: "NeuralNet",
+    args: tuple,
+    options: dict,
+) -> Tuple["NeuralNet", float, dict, bool]:
+    """Train model (e.g. in worker process).
+
+    :param model: neural net to be trained
+    :param args: training data `(x, y, dydx)`
+    :param options: keyword arguments of `NeuralNet.fit`
+    :return: trained model, its cost (see `_final_cost`), its history and
+        whether training was interrupted by `_Screen`
+    """
+    try:
+        model.fit(*args, **options)
+    except _Screened as screened:
+        record = History(0)
+        record.restore(load_checkpoint(options["checkpoint"])["record"])
+        return model, screened.cost, {"epoch_0": {"batch_0": record.cost}}, True
+    assert model.history is not None
+    return model, _final_cost(model.history), model.history, False
+
+
+def _map(
+    function: Callable,
+    arguments: List[tuple],
+    n_jobs: int = 1,
+) -> list:
+    """Call function for each tuple of arguments, in a pool of `n_jobs`
+    processes (all CPUs if negative) or sequentially if one.
+
+    :param function: function to be called (at module level, such that
+        it can be sent to other processes)
+    :param arguments: positional arguments of each call
+    :param n_jobs: number of processes
+    :return: value returned by each call, in the same order
+    """
+    if n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = min(n_jobs, len(arguments))
+    if n_jobs <= 1:
+        return [function(*args) for args in arguments]
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        return list(pool.map(function, *zip(*arguments)))
 
 
 class NeuralNet:
@@ -66,6 +195,29 @@ class NeuralNet:
         input/output layers)
     :param hidden_activation: activation function used in hidden layers
     :param output_activation: activation function used in output layer
+    :param dtype: floating point precision used for inference, e.g.
+        `np.float32` to halve memory traffic [defaulted to double
+        precision] (optional)
+    :param backend: kernels used for propagation, either "numpy" or
+        "numba" (JIT-compiled fused loops, which are faster for small
+        networks and fall back to "numpy" if Numba is not installed)
+        [defaulted to "numpy"] (optional)
+    :param array_namespace: name of the array API compatible module used
+        for propagation, e.g. "array_api_strict", so that alternative array
+        libraries can be used as drop-in replacements for NumPy. Inputs and
+        outputs of the model remain NumPy arrays [defaulted to "numpy"]
+        (optional)
+    :param is_approximate: use fast approximations of activation functions
+        with bounded error for inference, e.g. a rational approximation of
+        tanh accurate to about 3e-7 (see `jenn.core.activation.FastTanh`)
+        [defaulted to False] (optional)
+
+    .. note::
+        Training is done in double precision (or mixed precision, see
+        `fit`) with exact activation functions. The parameters are cast to
+        `dtype` (and activations switched to their approximations if
+        `is_approximate`) once training is complete, so that inference is
+        carried out in that precision end to end.
     """
 
     def __init__(
@@ -73,12 +225,21 @@ class NeuralNet:
         layer_sizes: List[int],
         hidden_activation: str = "tanh",
         output_activation: str = "linear",
+        dtype: DTypeLike = np.float64,
+        backend: str = "numpy",
+        array_namespace: str = "numpy",
+        is_approximate: bool = False,
     ):  # noqa D107
         self.history: Union[dict[Any, Any], None] = None
+        self.starts: Union[List[dict[str, Any]], None] = None
         self.parameters = Parameters(
             layer_sizes,
             hidden_activation,
             output_activation,
+            dtype,
+            backend,
+            array_namespace,
+            is_approximate,
         )
 
     def fit(
@@ -106,12 +267,34 @@ class NeuralNet:
         is_backtracking: bool = False,
         is_warmstart: bool = False,
         is_verbose: bool = False,
+        wrt: Union[List[int], None] = None,
+        is_mixed_precision: bool = False,
+        optimizer: str = "adam",
+        history_every: int = 1,
+        history_size: Union[int, None] = None,
+        is_best: bool = False,
+        callbacks: Union[List[Callback], None] = None,
+        profiler: Union[Profiler, None] = None,
+        validation_data: Union[Tuple[np.ndarray, ...], None] = None,
+        validation_fraction: float = 0.0,
+        validation_every: int = 10,
+        patience: int = 10,
+        time_budget: Union[float, None] = None,
+        checkpoint: Union[str, Path, None] = None,
+        checkpoint_every: int = 100,
+        resume_from: Union[str, Path, None] = None,
+        n_starts: int = 1,
+        n_jobs: int = 1,
+        prune_after: Union[int, None] = None,
+        n_threads: int = 1,
+        line_search: str = "backtracking",
     ) -> "NeuralNet":  # noqa: PLR0913
         r"""Train neural network.
 
         :param x: training data inputs, array of shape (n_x, m)
         :param y: training data outputs, array of shape (n_y, m)
-        :param dydx: training data Jacobian, array of shape (n_y, n_x, m)
+        :param dydx: training data Jacobian, array of shape (n_y, n_x, m),
+            or (n_y, len(wrt), m) if only provided for a subset of inputs
         :param is_normalize: normalize training by mean and variance
         :param alpha: optimizer learning rate for line search
         :param beta: LSE coefficients [defaulted to one] (optional)
@@ -120,7 +303,7 @@ class NeuralNet:
         :param beta1: `ADAM <https://arxiv.org/abs/1412.6980>`_ optimizer hyperparameter to control momentum
         :param beta2: ADAM optimizer hyperparameter to control momentum
         :param tau: amount by which to reduce :math:`\alpha := \tau \times
-            \alpha` on each iteration
+            \alpha` on each iteration of backtracking line search
         :param tol: stop when cost function doesn't improve more than
             specified tolerance
         :param max_count: stop when line search iterations exceed maximum
@@ -132,9 +315,96 @@ class NeuralNet:
         :param max_iter: max number of optimizer iterations
         :param shuffle: shuffle minibatches or not
         :param random_state: control repeatability
-        :param is_backtracking: use backtracking line search or not
+        :param is_backtracking: use backtracking line search or not,
+            with at most `max_count` cost evaluations per step (see
+            `line_search`)
         :param is_warmstart: do not initialize parameters
-        :param is_verbose: print out progress for each (iteration, batch, epoch)
+        :param is_verbose: print out progress of iterations (at most once
+            per second), convergence of each batch and end of each epoch
+        :param wrt: indices of the inputs w.r.t. which `dydx` is provided
+            [defaulted to all inputs] (optional)
+        :param is_mixed_precision: run forward and backward propagation in
+            single precision during training, while the cost function,
+            gradient accumulation and optimizer state remain in double
+            precision
+        :param optimizer: optimization algorithm, either "adam", "lbfgs"
+            (quasi-Newton with strong-Wolfe line search) or "lm"
+            (Levenberg-Marquardt, which exploits the least squares
+            structure of the cost function). The latter two usually
+            converge in far fewer cost evaluations for full-batch
+            training, in which case `alpha`, `beta1`, `beta2`, `tau`,
+            `tol`, `max_count` and `is_backtracking` are not used
+        :param history_every: record cost function every `history_every`
+            iterations in `history`, or not at all if zero (optional)
+        :param history_size: only keep the last `history_size` recorded
+            values of each batch, in a ring buffer (optional)
+        :param is_best: end each batch with the parameters that achieved
+            the lowest cost function rather than the last iterate
+            (optional)
+        :param callbacks: objects notified at each iteration, upon
+            convergence, and at the end of each batch and epoch, any of
+            which may request early termination, e.g. `ConsoleLogger` or
+            `JSONLWriter` (see :mod:`jenn.core.callbacks`) (optional)
+        :param profiler: object that times the phases of training and
+            counts cost function and gradient evaluations (see
+            :mod:`jenn.core.profiling`), whose summary is added to
+            `history` as `history["profile"]` (optional)
+        :param validation_data: held-out data `(x, y)` or `(x, y, dydx)`,
+            with the same shapes as the training data, on which the cost
+            function is evaluated during training in order to stop when
+            it no longer improves and restore the parameters that
+            achieved the lowest validation cost (optional)
+        :param validation_fraction: fraction of the training data held
+            out at random as validation data, if `validation_data` is not
+            provided [defaulted to none] (optional)
+        :param validation_every: evaluate validation cost every
+            `validation_every` iterations (forward propagation only)
+        :param patience: stop training after `patience` validation
+            evaluations without improvement
+        :param time_budget: wall-clock time after which training stops
+            cleanly (in seconds), leaving in place the parameters with the
+            lowest training cost seen in the interrupted batch (or
+            validation cost, if validation data is provided), and
+            reporting the fraction of the budget
+            used by each phase in `history["budget"]` (optional)
+        :param checkpoint: file in which the training state (parameters,
+            optimizer state, position and random number generator) is
+            saved every `checkpoint_every` iterations and after each
+            batch, atomically and on a background thread (see
+            :mod:`jenn.core.checkpoint`) (optional)
+        :param checkpoint_every: save checkpoint every `checkpoint_every`
+            iterations of each batch
+        :param resume_from: checkpoint file from which to continue an
+            interrupted run called with the same data and options, which
+            then ends with the same result as if it had not been
+            interrupted (optional)
+        :param n_starts: number of independently seeded copies to train
+            (seeds drawn from `random_state`), keeping the one with the
+            lowest validation cost (if validation data is provided) or
+            training cost, where every start is recorded in `starts`
+            [defaulted to one] (optional)
+        :param n_jobs: number of processes in which to train starts in
+            parallel, or all CPUs if -1, in which case callbacks are copied
+            to each process (and profilers are not supported) [defaulted
+            to one, i.e. sequentially] (optional)
+        :param prune_after: train all starts for `prune_after` iterations
+            of the first batch, then only finish the better half (from
+            where they were interrupted, such that their result is the
+            same as without pruning, except with validation data, since
+            early stopping is not checkpointed and restarts its patience
+            and best parameters upon resuming) [defaulted to no pruning]
+            (optional)
+        :param n_threads: number of threads among which the examples of
+            each batch are split to compute the cost function and its
+            gradient at every iteration, which speeds up training on
+            large batches given enough cores, with the same result as on
+            one thread up to round-off [defaulted to one] (optional)
+        :param line_search: line search used if `is_backtracking`, either
+            "backtracking", which reduces the step size by `tau` until the
+            cost function decreases, or "armijo", which selects step sizes
+            satisfying the sufficient decrease condition by interpolation
+            and usually needs fewer cost evaluations [defaulted to
+            "backtracking"] (optional)
         :return: NeuralNet instance (self)
 
         .. warning::
@@ -143,10 +413,63 @@ class NeuralNet:
                 normalizing by the variance has the undesirable effect
                 of dividing by a very small number and should not be used.
         """
-        data = Dataset(x, y, dydx)
+        if n_starts > 1:
+            options = dict(  # other arguments, as given
+                is_normalize=is_normalize,
+                alpha=alpha,
+                beta=beta,
+                gamma=gamma,
+                lambd=lambd,
+                beta1=beta1,
+                beta2=beta2,
+                tau=tau,
+                tol=tol,
+                max_count=max_count,
+                epsilon_absolute=epsilon_absolute,
+                epsilon_relative=epsilon_relative,
+                epochs=epochs,
+                batch_size=batch_size,
+                max_iter=max_iter,
+                shuffle=shuffle,
+                random_state=random_state,
+                is_backtracking=is_backtracking,
+                is_warmstart=is_warmstart,
+                is_verbose=is_verbose,
+                wrt=wrt,
+                is_mixed_precision=is_mixed_precision,
+                optimizer=optimizer,
+                history_every=history_every,
+                history_size=history_size,
+                is_best=is_best,
+                callbacks=callbacks,
+                profiler=profiler,
+                validation_data=validation_data,
+                validation_fraction=validation_fraction,
+                validation_every=validation_every,
+                patience=patience,
+                time_budget=time_budget,
+                checkpoint=checkpoint,
+                checkpoint_every=checkpoint_every,
+                resume_from=resume_from,
+                n_threads=n_threads,
+                line_search=line_search,
+            )
+            return self._fit_starts(x, y, dydx, options, n_starts, n_jobs, prune_after)
+        data = Dataset(x, y, dydx, wrt=wrt)
+        validation = None
+        if validation_data is not None:
+            x_val, y_val, *dydx_val = validation_data
+            J_val = dydx_val[0] if dydx_val else None
+            validation = Dataset(x_val, y_val, J_val, wrt=wrt)
+        elif validation_fraction > 0.0:
+            data, validation = data.split(validation_fraction, random_state)
         params = self.parameters
+        dtype = params.dtype
+        is_approximate = params.is_approximate
+        params.astype(np.float64)  # train in double precision
         if not is_warmstart:
             params.initialize(random_state)
+        params.approximate(False)  # train with exact activations
         params.mu_x[:] = 0.0
         params.mu_y[:] = 0.0
         params.sigma_x[:] = 1.0
@@ -156,6 +479,8 @@ class NeuralNet:
             params.mu_y[:] = data.avg_y
             params.sigma_x[:] = data.std_x
             params.sigma_y[:] = data.std_y
+            if validation is not None:
+                validation = validation.normalize(reference=data)
             data = data.normalize()
         self.history = train_model(
             data,
@@ -180,9 +505,121 @@ class NeuralNet:
             random_state=random_state,
             is_backtracking=is_backtracking,
             is_verbose=is_verbose,
+            is_mixed_precision=is_mixed_precision,
+            optimizer=optimizer,
+            history_every=history_every,
+            history_size=history_size,
+            is_best=is_best,
+            callbacks=callbacks,
+            profiler=profiler,
+            validation=validation,
+            validation_every=validation_every,
+            patience=patience,
+            time_budget=time_budget,
+            checkpoint=checkpoint,
+            checkpoint_every=checkpoint_every,
+            resume_from=resume_from,
+            n_threads=n_threads,
+            line_search=line_search,
+        )
+        params.astype(dtype)
+        params.approximate(is_approximate)
+        return self
+
+    def _fit_starts(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        dydx: Union[np.ndarray, None],
+        options: dict[str, Any],
+        n_starts: int,
+        n_jobs: int = 1,
+        prune_after: Union[int, None] = None,
+    ) -> "NeuralNet":
+        """Train independently seeded copies and keep the best (see `fit`).
+
+        :param x: training data inputs, array of shape (n_x, m)
+        :param y: training data outputs, array of shape (n_y, m)
+        :param dydx: training data Jacobian, array of shape (n_y, n_x, m)
+        :param options: other arguments of `fit`
+        :param n_starts: number of starts
+        :param n_jobs: number of processes
+        :param prune_after: iterations after which to keep better half
+        :return: NeuralNet instance (self)
+        """
+        if options["checkpoint"] is not None or options["resume_from"] is not None:
+            msg = "checkpoint and resume_from are not supported with n_starts > 1"
+            raise ValueError(msg)
+        random_state = options["random_state"]
+        if options["validation_data"] is None and options["validation_fraction"] > 0:
+            data = Dataset(x, y, dydx, wrt=options["wrt"])
+            data, validation = data.split(options["validation_fraction"], random_state)
+            x, y, dydx = data.X, data.Y, data.J  # same split for all starts
+            if validation.J is None:
+                options["validation_data"] = (validation.X, validation.Y)
+            else:
+                options["validation_data"] = (validation.X, validation.Y, validation.J)
+            options["validation_fraction"] = 0.0
+        rng = np.random.default_rng(random_state)
+        seeds = rng.integers(2**31, size=n_starts).tolist()
+        callbacks = list(options["callbacks"] or [])
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [Path(directory) / f"start_{k}.ckpt" for k in range(n_starts)]
+            jobs = []
+            for seed, path in zip(seeds, paths):
+                start = dict(options, random_state=seed)
+                if prune_after:
+                    start.update(
+                        checkpoint=path,
+                        checkpoint_every=prune_after,
+                        callbacks=[*callbacks, _Screen(prune_after)],
+                    )
+                jobs.append((copy.deepcopy(self), (x, y, dydx), start))
+            results = _map(_fit_start, jobs, n_jobs)
+            survivors = np.argsort([result[1] for result in results], kind="stable")
+            resumed = [k for k in survivors[: -(-n_starts // 2)] if results[k][3]]
+            jobs = [
+                (
+                    copy.deepcopy(self),
+                    (x, y, dydx),
+                    dict(options, random_state=seeds[k], resume_from=paths[k]),
+                )
+                for k in resumed
+            ]
+            for k, result in zip(resumed, _map(_fit_start, jobs, n_jobs)):
+                results[k] = result
+        self.starts = [
+            dict(random_state=seed, cost=cost, history=history, is_pruned=is_pruned)
+            for seed, (_, cost, history, is_pruned) in zip(seeds, results)
+        ]
+        best = min(
+            (k for k, result in enumerate(results) if not result[3]),
+            key=lambda k: results[k][1],
         )
+        model = results[best][0]
+        self.parameters = model.parameters
+        self.history = model.history
         return self
 
+    def _cache(self, m: int, n_p: Union[int, None] = None, n_q: int = 0) -> Cache:
+        """Allocate cache in the precision and namespace of the parameters."""
+        params = self.parameters
+        return Cache(
+            params.layer_sizes,
+            m,
+            n_p,
+            n_q,
+            dtype=params.dtype,
+            array_namespace=params.array_namespace,
+        )
+
+    def _normalize(self, x: np.ndarray) -> np.ndarray:
+        """Normalize inputs and convert them to the namespace of the parameters."""
+        params = self.parameters
+        x = x.astype(params.dtype, copy=False)
+        x_norm = normalize(x, params.mu_x, params.sigma_x)
+        return _array_api.asarray(x_norm, params.xp)
+
     def predict(self, x: np.ndarray) -> np.ndarray:
         r"""Predict responses.
 
@@ -190,40 +627,148 @@ class NeuralNet:
         :return: predicted response(s), array of shape (n_y, m)
         """
         params = self.parameters
-        cache = Cache(params.layer_sizes, m=x.shape[1])
-        x_norm = normalize(x, params.mu_x, params.sigma_x)
+        cache = self._cache(x.shape[1])
+        x_norm = self._normalize(x)
         y_norm = model_forward(x_norm, params, cache)
+        y_norm = _array_api.to_numpy(y_norm)
         y = denormalize(y_norm, params.mu_y, params.sigma_y)
         return y
 
-    def predict_partials(self, x: np.ndarray) -> np.ndarray:
+    def predict_partials(
+        self, x: np.ndarray, wrt: Union[List[int], None] = None
+    ) -> np.ndarray:
         r"""Predict partials.
 
         :param x: vectorized inputs, array of shape (n_x, m)
-        :return: predicted partial(s), array of shape (n_y, n_x, m)
+        :param wrt: indices of inputs w.r.t. which to compute partials, such
+            that cost and memory scale with len(wrt) instead of n_x
+            [defaulted to all inputs] (optional)
+        :return: predicted partial(s), array of shape (n_y, n_x, m), or
+            (n_y, len(wrt), m) if `wrt` is provided
         """
         params = self.parameters
-        cache = Cache(params.layer_sizes, m=x.shape[1])
-        x_norm = normalize(x, params.mu_x, params.sigma_x)
-        dydx_norm = partials_forward(x_norm, params, cache)
-        dydx = denormalize_partials(dydx_norm, params.sigma_x, params.sigma_y)
+        n_p = None if wrt is None else len(wrt)
+        cache = self._cache(x.shape[1], n_p)
+        x_norm = self._normalize(x)
+        dydx_norm = partials_forward(x_norm, params, cache, wrt)
+        dydx_norm = _array_api.to_numpy(dydx_norm)
+        sigma_x = params.sigma_x if wrt is None else params.sigma_x[wrt]
+        dydx = denormalize_partials(dydx_norm, sigma_x, params.sigma_y)
         return dydx
 
-    def evaluate(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    def evaluate(
+        self, x: np.ndarray, wrt: Union[List[int], None] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
         r"""Predict responses and their partials.
 
         :param x: vectorized inputs, array of shape (n_x, m)
+        :param wrt: indices of inputs w.r.t. which to compute partials, such
+            that cost and memory scale with len(wrt) instead of n_x
+            [defaulted to all inputs] (optional)
         :return: predicted response(s), array of shape (n_y, m)
-        :return: predicted partial(s), array of shape (n_y, n_x, m)
+        :return: predicted partial(s), array of shape (n_y, n_x, m), or
+            (n_y, len(wrt), m) if `wrt` is provided
         """
         params = self.parameters
-        cache = Cache(params.layer_sizes, m=x.shape[1])
-        x_norm = normalize(x, params.mu_x, params.sigma_x)
-        y_norm, dydx_norm = model_partials_forward(x_norm, params, cache)
+        n_p = None if wrt is None else len(wrt)
+        cache = self._cache(x.shape[1], n_p)
+        x_norm = self._normalize(x)
+        y_norm, dydx_norm = model_partials_forward(x_norm, params, cache, wrt)
+        y_norm = _array_api.to_numpy(y_norm)
+        dydx_norm = _array_api.to_numpy(dydx_norm)
         y = denormalize(y_norm, params.mu_y, params.sigma_y)
-        dydx = denormalize_partials(dydx_norm, params.sigma_x, params.sigma_y)
+        sigma_x = params.sigma_x if wrt is None else params.sigma_x[wrt]
+        dydx = denormalize_partials(dydx_norm, sigma_x, params.sigma_y)
         return y, dydx
 
+    def jvp(self, x: np.ndarray, v: np.ndarray) -> np.ndarray:
+        r"""Predict Jacobian-vector product, i.e. directional derivative(s).
+
+        Rather than computing all n_x columns of the Jacobian, only one
+        tangent per direction is propagated forward through the layers,
+        which costs about two forward passes per direction.
+
+        :param x: vectorized inputs, array of shape (n_x, m)
+        :param v: direction(s) along which to differentiate, either one
+            direction per example as an array of shape (n_x, m) or many
+            directions per example as an array of shape (n_x, k, m)
+        :return: directional derivative(s) :math:`\frac{dy}{dx} \cdot v`,
+            array of shape (n_y, m) or (n_y, k, m) consistent with `v`
+        """
+        params = self.parameters
+        n_x, m = x.shape
+        V = v.reshape((n_x, -1, m))  # one direction is the special case k = 1
+        V = V.astype(params.dtype, copy=False)
+        cache = self._cache(m, V.shape[1])
+        x_norm = self._normalize(x)
+        V_norm = normalize_directions(V, params.sigma_x)
+        V_norm = _array_api.asarray(V_norm, params.xp)
+        dydv_norm = jvp_forward(x_norm, V_norm, params, cache)
+        dydv_norm = _array_api.to_numpy(dydv_norm)
+        dydv = denormalize_directional_partials(dydv_norm, params.sigma_y)
+        return dydv.reshape((params.n_y,) + v.shape[1:])
+
+    def predict_hessian(self, x: np.ndarray) -> np.ndarray:
+        r"""Predict second-order partials.
+
+        Second-order terms are propagated forward analytically through
+        the layers (no finite difference).
+
+        :param x: vectorized inputs, array of shape (n_x, m)
+        :return: predicted Hessian(s) :math:`\frac{\partial^2 y}{\partial
+            x_j \partial x_k}`, array of shape (n_y, n_x, n_x, m)
+        """
+        params = self.parameters
+        cache = self._cache(x.shape[1], n_q=params.n_x)
+        x_norm = self._normalize(x)
+        _, _, d2ydx2_norm = model_hessian_forward(x_norm, params, cache)
+        d2ydx2_norm = _array_api.to_numpy(d2ydx2_norm)
+        return denormalize_hessian(d2ydx2_norm, params.sigma_x, params.sigma_y)
+
+    def hvp(self, x: np.ndarray, v: np.ndarray) -> np.ndarray:
+        r"""Predict Hessian-vector product(s).
+
+        :param x: vectorized inputs, array of shape (n_x, m)
+        :param v: direction(s) along which to differentiate the partials,
+            either one direction per example as an array of shape (n_x, m)
+            or many directions per example as an array of shape (n_x, k, m)
+        :return: Hessian-vector product(s) :math:`\frac{\partial^2 y}{
+            \partial x^2} \cdot v`, array of shape (n_y, n_x, m) or
+            (n_y, n_x, k, m) consistent with `v`
+        """
+        params = self.parameters
+        n_x, m = x.shape
+        V = v.reshape((n_x, -1, m))  # one direction is the special case k = 1
+        V = V.astype(params.dtype, copy=False)
+        cache = self._cache(m, n_q=V.shape[1])
+        x_norm = self._normalize(x)
+        V_norm = normalize_directions(V, params.sigma_x)
+        V_norm = _array_api.asarray(V_norm, params.xp)
+        _, _, hvp_norm = model_hessian_forward(x_norm, params, cache, V_norm)
+        hvp_norm = _array_api.to_numpy(hvp_norm)
+        hvp = denormalize_hvp(hvp_norm, params.sigma_x, params.sigma_y)
+        return hvp.reshape((params.n_y, n_x) + v.shape[1:])
+
+    def astype(self, dtype: DTypeLike) -> "NeuralNet":
+        """Cast parameters to specified precision used for inference.
+
+        :param dtype: floating point precision, e.g. `np.float32`
+        :return: NeuralNet instance (self)
+        """
+        self.parameters.astype(dtype)
+        return self
+
+    def approximate(self, is_approximate: bool = True) -> "NeuralNet":
+        """Switch to fast approximations of activation functions for
+        inference (or back to exact ones).
+
+        :param is_approximate: use approximations if True, exact
+            activations otherwise
+        :return: NeuralNet instance (self)
+        """
+        self.parameters.approximate(is_approximate)
+        return self
+
     def save(self, file: Union[str, Path] = "parameters.json") -> None:
         """Serialize parameters and save to JSON file."""
         self.parameters.save(file)
@@ -232,3 +777,176 @@ class NeuralNet:
         """Load previously saved parameters from json file."""
         self.parameters.load(file)
         return self
+
+
+class NeuralNetEnsemble:
+    """Ensemble of neural networks trained at once.
+
+    The members share the same architecture and training data, but are
+    initialized independently, such that the spread of their predictions
+    estimates the uncertainty of the model. Their weights are stored as
+    tensors of shape (K, n^[l], n^[l-1]) and propagated with batched
+    matrix multiplications, which is much faster than training K small
+    networks one by one (see `jenn.core.ensemble`).
+
+    .. code-block:: python
+
+        ensemble = NeuralNetEnsemble([2, 12, 12, 1], members=8).fit(x, y, dydx)
+        y_mean, y_std = ensemble.predict(x_test)
+
+    :param layer_sizes: number of nodes in each layer (including
+        input/output layers)
+    :param members: number of networks K in the ensemble [defaulted to 8]
+        (optional)
+    :param hidden_activation: activation function used in hidden layers
+    :param output_activation: activation function used in output layer
+    """
+
+    def __init__(
+        self,
+        layer_sizes: List[int],
+        members: int = 8,
+        hidden_activation: str = "tanh",
+        output_activation: str = "linear",
+    ):  # noqa D107
+        self.history: Union[dict[Any, Any], None] = None
+        self.parameters = EnsembleParameters(
+            layer_sizes, members, hidden_activation, output_activation
+        )
+
+    def fit(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        dydx: Union[np.ndarray, None] = None,
+        is_normalize: bool = False,
+        alpha: float = 0.05,
+        beta: Union[np.ndarray, float] = 1.0,
+        gamma: Union[np.ndarray, float] = 1.0,
+        lambd: float = 0.0,
+        beta1: float = 0.9,
+        beta2: float = 0.99,
+        epsilon_absolute: float = 1e-12,
+        epsilon_relative: float = 1e-12,
+        epochs: int = 1,
+        batch_size: Union[int, None] = None,
+        max_iter: int = 1000,
+        shuffle: bool = True,
+        random_state: Union[int, None] = None,
+        is_warmstart: bool = False,
+        wrt: Union[List[int], None] = None,
+    ) -> "NeuralNetEnsemble":  # noqa: PLR0913
+        r"""Train all members at once using ADAM (without line search).
+
+        :param x: training data inputs, array of shape (n_x, m)
+        :param y: training data outputs, array of shape (n_y, m)
+        :param dydx: training data Jacobian, array of shape (n_y, n_x, m),
+            or (n_y, len(wrt), m) if `wrt` is provided (optional)
+        :param is_normalize: normalize training by mean and variance
+        :param alpha: learning rate :math:`\alpha`
+        :param beta: regularization coefficient :math:`\beta` (multiplier
+            on response error)
+        :param gamma: gradient-enhancement coefficient :math:`\gamma`
+            (multiplier on partials error)
+        :param lambd: regularization coefficient :math:`\lambda`
+        :param beta1: ADAM optimizer hyperparameter to control momentum
+        :param beta2: ADAM optimizer hyperparameter to control momentum
+        :param epsilon_absolute: absolute convergence criterion
+        :param epsilon_relative: relative convergence criterion
+        :param epochs: number of passes through data
+        :param batch_size: size of each batch for minibatch
+        :param max_iter: max number of optimizer iterations
+        :param shuffle: shuffle minibatches or not
+        :param random_state: control randomness (for repeatability), from
+            which the seed of each member is drawn
+        :param is_warmstart: do not initialize parameters
+        :param wrt: indices of the inputs w.r.t. which `dydx` is provided
+            [defaulted to all inputs] (optional)
+        :return: NeuralNetEnsemble instance (self)
+        """
+        data = Dataset(x, y, dydx, wrt=wrt)
+        params = self.parameters
+        if not is_warmstart:
+            params.initialize(random_state)
+        params.mu_x[:] = 0.0
+        params.mu_y[:] = 0.0
+        params.sigma_x[:] = 1.0
+        params.sigma_y[:] = 1.0
+        if is_normalize:
+            params.mu_x[:] = data.avg_x
+            params.mu_y[:] = data.avg_y
+            params.sigma_x[:] = data.std_x
+            params.sigma_y[:] = data.std_y
+            data = data.normalize()
+        self.history = train_ensemble(
+            data,
+            params,
+            alpha=alpha,
+            beta=beta,
+            gamma=gamma,
+            lambd=lambd,
+            beta1=beta1,
+            beta2=beta2,
+            epsilon_absolute=epsilon_absolute,
+            epsilon_relative=epsilon_relative,
+            epochs=epochs,
+            max_iter=max_iter,
+            batch_size=batch_size,
+            shuffle=shuffle,
+            random_state=random_state,
+        )
+        return self
+
+    def _cache(self, m: int, n_p: Union[int, None] = None) -> EnsembleCache:
+        """Allocate cache for all members."""
+        params = self.parameters
+        return EnsembleCache(params.layer_sizes, params.K, m, n_p)
+
+    def predict(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        r"""Predict mean and spread of responses across members.
+
+        :param x: vectorized inputs, array of shape (n_x, m)
+        :return: mean and standard deviation of predicted response(s)
+            across members, arrays of shape (n_y, m)
+        """
+        params = self.parameters
+        x_norm = normalize(x, params.mu_x, params.sigma_x)
+        y_norm = ensemble_forward(x_norm, params, self._cache(x.shape[1]))
+        y_mean = denormalize(y_norm.mean(axis=0), params.mu_y, params.sigma_y)
+        y_std = params.sigma_y * y_norm.std(axis=0)
+        return y_mean, y_std
+
+    def predict_partials(
+        self, x: np.ndarray, wrt: Union[List[int], None] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        r"""Predict mean and spread of partials across members.
+
+        :param x: vectorized inputs, array of shape (n_x, m)
+        :param wrt: indices of inputs w.r.t. which to compute partials
+            [defaulted to all inputs] (optional)
+        :return: mean and standard deviation of predicted partial(s)
+            across members, arrays of shape (n_y, n_x, m), or (n_y,
+            len(wrt), m) if `wrt` is provided
+        """
+        params = self.parameters
+        n_p = None if wrt is None else len(wrt)
+        x_norm = normalize(x, params.mu_x, params.sigma_x)
+        cache = self._cache(x.shape[1], n_p)
+        _, dydx_norm = ensemble_partials_forward(x_norm, params, cache, wrt)
+        sigma_x = params.sigma_x if wrt is None else params.sigma_x[wrt]
+        sigma_y = params.sigma_y
+        dydx_mean = denormalize_partials(dydx_norm.mean(axis=0), sigma_x, sigma_y)
+        dydx_std = denormalize_partials(dydx_norm.std(axis=0), sigma_x, sigma_y)
+        return dydx_mean, dydx_std
+
+    def member(self, k: int) -> NeuralNet:
+        """Return member k as a standalone neural net (copy).
+
+        :param k: index of the member
+        """
+        params = self.parameters
+        nn = NeuralNet(
+            params.layer_sizes, params.hidden_activation, params.output_activation
+        )
+        nn.parameters = params.member(k)
+        return nn
@@ -0,0 +1,369 @@
+"""Search.
+==========
+
+This module implements a hyperparameter search driver, which trains a
+neural net for each configuration drawn from a search space (full grid
+or random samples) and returns the best one:
+
+.. code-block:: python
+
+    import jenn
+
+    nn = jenn.search.search(
+        dict(
+            layer_sizes=[[2, 8, 8, 1], [2, 16, 16, 1]],
+            alpha=[0.01, 0.05],
+            lambd=(1e-6, 1e-2),  # range, sampled log-uniformly
+        ),
+        x_train, y_train, dydx_train,
+        n_trials=16,  # random search (omit for full grid)
+        n_jobs=4,  # trials trained in a pool of processes
+        journal="search.jsonl",  # resume where it left off if interrupted
+        max_iter=1000,  # other arguments of NeuralNet.fit (fixed)
+    )
+    print(nn.history["search"])  # configuration and loss of each trial
+
+Configurations are compared on held-out validation data, where the loss
+is :math:`1 - R^2` of the predicted responses (averaged over outputs),
+such that configurations with different cost functions (e.g. `gamma`,
+`lambd` or `is_normalize`) are compared on equal terms.
+
+Bad configurations are pruned early by `successive halving
+<https://arxiv.org/abs/1502.07943>`_: all trials are trained for
+`min_iter` iterations, only the best `1/eta` of them are trained for `eta`
+times as many, and so on until a single one is trained to completion.
+Trials are interrupted right after they are checkpointed (see
+:mod:`jenn.core.checkpoint`), such that promoted trials resume exactly
+where they left off, and the trial trained to completion is the same as
+if it had been trained on its own.
+
+.. note::
+    The results of each rung are appended to a journal (JSON lines),
+    next to which the checkpoints of the trials are kept, such that an
+    interrupted search can be resumed by calling `search` again with the
+    same arguments: finished rungs are read from the journal instead of
+    being trained again.
+"""  # noqa: W291
+
+import inspect
+import itertools
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, List, Tuple, Union
+
+import numpy as np
+
+from .core.checkpoint import load as load_checkpoint
+from .core.checkpoint import save as save_checkpoint
+from .core.data import Dataset
+from .model import NeuralNet, _final_cost, _map, _Screen, _Screened
+
+__all__ = ["search"]
+
+_MODEL_OPTIONS = list(inspect.signature(NeuralNet.__init__).parameters)[1:]
+
+
+def _loss(model: NeuralNet, validation: Dataset) -> float:
+    """Return :math:`1 - R^2` of predicted responses on validation data,
+    averaged over outputs (infinite if the prediction is not finite)."""
+    Y = validation.Y
+    SSE = np.sum(np.square(model.predict(validation.X) - Y), axis=1)
+    SSTO = np.sum(np.square(Y - np.mean(Y, axis=1, keepdims=True)), axis=1)
+    loss = float(np.mean(SSE / (SSTO + 1e-12)))
+    return loss if np.isfinite(loss) else np.inf
+
+
+def _configurations(
+    space: dict[str, Union[list, tuple]],
+    n_trials: Union[int, None],
+    rng: np.random.Generator,
+) -> List[dict[str, Any]]:
+    """Return every combination of values (grid), or `n_trials` random
+    samples if given, where lists are choices and tuples are ranges."""
+    if n_trials is None:
+        if any(isinstance(values, tuple) for values in space.values()):
+            msg = "ranges (tuples) are only supported by random search (n_trials)"
+            raise ValueError(msg)
+        return [
+            dict(zip(space, values)) for values in itertools.product(*space.values())
+        ]
+    configurations = []
+    for _ in range(n_trials):
+        configuration = {}
+        for key, values in space.items():
+            if not isinstance(values, tuple):
+                configuration[key] = values[int(rng.integers(len(values)))]
+            elif all(isinstance(value, int) for value in values):
+                configuration[key] = int(rng.integers(values[0], values[1] + 1))
+            else:
+                low, high = np.log(values)
+                configuration[key] = float(np.exp(rng.uniform(low, high)))
+        configurations.append(configuration)
+    return configurations
+
+
+def _read(journal: Path) -> List[dict[str, Any]]:
+    """Return records of journal (ignoring a truncated last line)."""
+    if not journal.exists():
+        return []
+    records = []
+    with journal.open(encoding="utf-8") as file:
+        for line in file:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+    return records
+
+
+def _open(
+    journal: Path, random_state: Union[int, None]
+) -> Tuple[int, List[dict[str, Any]]]:
+    """Return random state and records of existing journal, or create
+    journal starting with the random state (drawn if None)."""
+    records = _read(journal)
+    if records:
+        return records[0]["random_state"], records
+    if random_state is None:  # recorded, such that search can be resumed
+        random_state = int(np.random.default_rng().integers(2**31))
+    _append(journal, dict(random_state=random_state))
+    return random_state, [dict(random_state=random_state)]
+
+
+def _append(journal: Path, record: dict[str, Any]) -> None:
+    """Append record to journal (flushed to disk)."""
+    with journal.open("a", encoding="utf-8") as file:
+        file.write(json.dumps(record) + "\n")
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def _split(configuration: dict[str, Any]) -> Tuple[NeuralNet, dict[str, Any]]:
+    """Return neural net built from the arguments of `NeuralNet` in
+    configuration, and the other arguments (those of `NeuralNet.fit`)."""
+    fit = dict(configuration)
+    model = NeuralNet(**{key: fit.pop(key) for key in _MODEL_OPTIONS if key in fit})
+    return model, fit
+
+
+def _train_trial(
+    model: NeuralNet,
+    args: tuple,
+    options: dict[str, Any],
+    iterations: Union[int, None],
+    validation: Dataset,
+) -> Tuple[float, float, bool]:
+    """Train trial until interrupted after given number of iterations of
+    its first batch, or until complete (e.g. in worker process).
+
+    :param model: neural net to be trained
+    :param args: training data `(x, y, dydx)`
+    :param options: keyword arguments of `NeuralNet.fit`, including the
+        checkpoint from which to resume (if it exists)
+    :param iterations: number of iterations after which to interrupt
+        training (None to train to completion)
+    :param validation: data on which the trial is evaluated
+    :return: validation loss, training cost and whether training is
+        complete, in which case the model and its history are saved next
+        to the checkpoint
+    """
+    path = Path(options["checkpoint"])
+    if path.exists():
+        options = dict(options, resume_from=path)
+    if iterations is not None:
+        callbacks = [*(options.get("callbacks") or []), _Screen(iterations)]
+        options = dict(options, callbacks=callbacks)
+    try:
+        model.fit(*args, **options)
+    except _Screened as screened:
+        model.parameters.unstack(load_checkpoint(path)["x"])
+        return _loss(model, validation), screened.cost, False
+    assert model.history is not None
+    model.save(path.with_suffix(".json"))
+    save_checkpoint(path.with_suffix(".npz"), model.history)
+    return _loss(model, validation), _final_cost(model.history), True
+
+
+def _rung(  # noqa: PLR0913
+    trials: List[int],
+    rung: int,
+    iterations: Union[int, None],
+    configurations: List[dict[str, Any]],
+    options: dict[str, Any],
+    data: Tuple[Dataset, Dataset],
+    directory: Path,
+    min_iter: int,
+    n_jobs: int,
+    done: dict[Tuple[int, int], dict[str, Any]],
+    journal: Union[Path, None],
+) -> None:
+    """Train trials of rung that are not done yet, and add their results
+    to `done` (and journal, if any).
+
+    :param trials: indices of trials in rung
+    :param rung: index of rung
+    :param iterations: number of iterations after which to interrupt
+        training (None to train to completion)
+    :param configurations: searched arguments of each trial
+    :param options: arguments of `NeuralNet` and `NeuralNet.fit` that are
+        the same for all trials (overridden by those searched)
+    :param data: training and validation data
+    :param directory: directory in which trials are checkpointed
+    :param min_iter: number of iterations between checkpoints
+    :param n_jobs: number of processes in which trials are trained
+    :param done: results of each (trial, rung) already computed
+    :param journal: JSON lines file to which results are appended
+        (optional)
+    """
+    training, validation = data
+    args = (training.X, training.Y, training.J)
+    jobs = []
+    for trial in trials:
+        if (trial, rung) in done:
+            continue
+        model, fit = _split(dict(options, **configurations[trial]))
+        fit["checkpoint"] = directory / f"trial_{trial}.ckpt"
+        fit["checkpoint_every"] = min_iter
+        jobs.append((model, args, fit, iterations, validation))
+    computed = iter(_map(_train_trial, jobs, n_jobs))
+    for trial in trials:
+        if (trial, rung) in done:
+            continue
+        loss, cost, is_complete = next(computed)
+        done[trial, rung] = dict(
+            trial=trial,
+            rung=rung,
+            config=configurations[trial],
+            loss=loss,
+            cost=cost,
+            iterations=None if is_complete else iterations,
+        )
+        if journal is not None:
+            _append(journal, done[trial, rung])
+
+
+def search(
+    space: dict[str, Union[list, tuple]],
+    x: np.ndarray,
+    y: np.ndarray,
+    dydx: Union[np.ndarray, None] = None,
+    n_trials: Union[int, None] = None,
+    min_iter: int = 50,
+    eta: int = 2,
+    n_jobs: int = 1,
+    journal: Union[str, Path, None] = None,
+    validation_data: Union[Tuple[np.ndarray, ...], None] = None,
+    validation_fraction: float = 0.2,
+    random_state: Union[int, None] = None,
+    **options: Any,  # noqa: ANN401
+) -> NeuralNet:
+    r"""Search for the best hyperparameters using successive halving.
+
+    :param space: values of the arguments of `NeuralNet` or
+        `NeuralNet.fit` to be searched, e.g. `layer_sizes`, `alpha`,
+        `lambd`, `gamma` or `batch_size`, given as a list of choices or,
+        for random search only, a tuple `(low, high)` from which floats are
+        sampled log-uniformly and integers uniformly (inclusive)
+    :param x: training data inputs, array of shape (n_x, m)
+    :param y: training data outputs, array of shape (n_y, m)
+    :param dydx: training data Jacobian, array of shape (n_y, n_x, m)
+        (optional)
+    :param n_trials: number of configurations sampled at random from the
+        search space [defaulted to all combinations, i.e. grid search]
+        (optional)
+    :param min_iter: number of iterations for which all trials are trained
+        before the worse are pruned, which is multiplied by `eta` at each
+        rung (it refers to the first batch of the first epoch, such that
+        training with mini-batches is only pruned during its first batch)
+        [defaulted to 50] (optional)
+    :param eta: keep the best `1/eta` trials at each rung [defaulted to 2,
+        i.e. the better half] (optional)
+    :param n_jobs: number of processes in which trials are trained (all
+        CPUs if negative) [defaulted to one, i.e. sequentially] (optional)
+    :param journal: JSON lines file to which the results are appended and
+        from which an interrupted search is resumed, whose checkpoints are
+        kept in the directory of the same name with suffix "_checkpoints"
+        [defaulted to None, i.e. temporary directory] (optional)
+    :param validation_data: data `(x, y)` on which trials are compared
+        [defaulted to `validation_fraction` of the training data]
+        (optional)
+    :param validation_fraction: fraction of training data held out to
+        compare trials, if `validation_data` is not provided [defaulted
+        to 0.2] (optional)
+    :param random_state: random seed from which the configurations, the
+        validation split and the initialization of all trials are
+        determined (the same for all trials, unless searched), which is
+        drawn and recorded in the journal if not given (optional)
+    :param options: other arguments of `NeuralNet` and `NeuralNet.fit`,
+        which are the same for all trials (e.g. `layer_sizes` if not
+        searched or `max_iter`)
+    :return: best trained neural net, where the configuration, validation
+        loss, training cost and number of iterations (None if complete) of
+        each trial are added to its history as `history["search"]`
+    """
+    if eta < 2:  # noqa: PLR2004
+        msg = "eta must be an integer greater than one"
+        raise ValueError(msg)
+    fixed = [key for key in ["checkpoint", "resume_from", "n_starts"] if key in options]
+    if fixed:
+        msg = f"{fixed} not supported by search"
+        raise ValueError(msg)
+    records: List[dict[str, Any]] = []
+    if journal is not None:
+        journal = Path(journal)
+        random_state, records = _open(journal, random_state)
+    rng = np.random.default_rng(random_state)
+    configurations = json.loads(json.dumps(_configurations(space, n_trials, rng)))
+    data = Dataset(x, y, dydx, wrt=options.get("wrt"))
+    if validation_data is not None:
+        validation = Dataset(validation_data[0], validation_data[1])
+    else:
+        data, validation = data.split(validation_fraction, random_state)
+    done = {(record["trial"], record["rung"]): record for record in records[1:]}
+    for trial, rung in done:
+        if done[trial, rung]["config"] != configurations[trial]:
+            msg = f"journal {journal} does not match search space"
+            raise ValueError(msg)
+    with tempfile.TemporaryDirectory() as temporary:
+        directory = Path(temporary)
+        if journal is not None:
+            directory = journal.with_name(journal.stem + "_checkpoints")
+            directory.mkdir(exist_ok=True)
+        results: dict[int, dict[str, Any]] = {}
+        trials = list(range(len(configurations)))
+        for rung in itertools.count():
+            iterations = min_iter * eta ** rung if len(trials) > 1 else None
+            _rung(
+                trials,
+                rung,
+                iterations,
+                configurations,
+                dict(options, random_state=random_state),
+                (data, validation),
+                directory,
+                min_iter,
+                n_jobs,
+                done,
+                journal,
+            )
+            results.update({trial: done[trial, rung] for trial in trials})
+            if iterations is None:
+                break
+            ranking = sorted(trials, key=lambda trial: results[trial]["loss"])
+            trials = [
+                trial
+                for trial in ranking[: -(-len(trials) // eta)]
+                if results[trial]["iterations"] is not None  # not complete
+            ]
+            if not trials:
+                break
+        complete = [k for k, result in results.items() if result["iterations"] is None]
+        best = min(complete, key=lambda trial: results[trial]["loss"])
+        path = directory / f"trial_{best}.ckpt"
+        model, _ = _split(dict(options, **configurations[best]))
+        model.load(path.with_suffix(".json"))
+        model.history = load_checkpoint(path.with_suffix(".npz"))
+    model.history["search"] = [results[trial] for trial in sorted(results)]
+    return model
@@ -4,6 +4,7 @@
 # Distributed under the terms of the MIT License.
 
 from . import metrics, plot
+from ._cross_validation import cross_validate
 from ._jmp import from_jmp
 from ._rbf import rbf
 
@@ -12,4 +13,5 @@ __all__ = [
     "plot",
     "rbf",
     "from_jmp",
+    "cross_validate",
 ]
@@ -0,0 +1,106 @@
+"""Cross-Validation."""
+
+import copy
+from typing import Any, List, Tuple, Union
+
+import numpy as np
+
+from ..core.data import Dataset
+from ..model import NeuralNet, _map
+from .metrics import r_square
+
+
+def _fit_fold(
+    model: NeuralNet,
+    data: Dataset,
+    fold: Tuple[np.ndarray, np.ndarray],
+    options: dict[str, Any],
+) -> Tuple[NeuralNet, np.ndarray, Union[np.ndarray, None]]:
+    """Train model on one fold and evaluate it (e.g. in worker process).
+
+    :param model: neural net to be trained
+    :param data: all data, from which the fold is extracted
+    :param fold: indices of the training and validation examples of the
+        fold (see `Dataset.folds`)
+    :param options: keyword arguments of `NeuralNet.fit`
+    :return: trained model and R-square of its responses and partials
+        (None if validation data has no partials)
+    """
+    training = data._subset(fold[0])
+    validation = data._subset(fold[1])
+    model.fit(training.X, training.Y, training.J, wrt=training.wrt, **options)
+    if validation.J is None:
+        return model, r_square(model.predict(validation.X), validation.Y), None
+    y_pred, dydx_pred = model.evaluate(validation.X, wrt=validation.wrt)
+    return model, r_square(y_pred, validation.Y), r_square(dydx_pred, validation.J)
+
+
+def cross_validate(
+    model: NeuralNet,
+    x: np.ndarray,
+    y: np.ndarray,
+    dydx: Union[np.ndarray, None] = None,
+    k: int = 5,
+    n_jobs: int = 1,
+    shuffle: bool = True,
+    random_state: Union[int, None] = None,
+    is_warmstart: bool = False,
+    wrt: Union[List[int], None] = None,
+    **options: Any,  # noqa: ANN401
+) -> dict[str, Any]:
+    """Estimate generalization error using k-fold cross-validation.
+
+    A copy of the model is trained on each fold (see `Dataset.folds`) and
+    evaluated on the examples left out, where each fold is extracted from
+    the data only when it is trained.
+
+    .. code-block:: python
+
+        scores = jenn.utils.cross_validate(
+            NeuralNet([2, 12, 12, 1]), x, y, dydx, k=5, n_jobs=5, max_iter=500
+        )
+        print(scores["r_square"].mean(axis=0))  # for each output
+
+    :param model: neural net to be trained on each fold (not modified)
+    :param x: training data inputs, array of shape (n_x, m)
+    :param y: training data outputs, array of shape (n_y, m)
+    :param dydx: training data Jacobian, array of shape (n_y, n_x, m), or
+        (n_y, len(wrt), m) if `wrt` is provided (optional)
+    :param k: number of folds [defaulted to 5] (optional)
+    :param n_jobs: number of processes in which folds are trained (all
+        CPUs if negative) [defaulted to one, i.e. sequentially] (optional)
+    :param shuffle: shuffle examples before allocating them to folds
+    :param random_state: random seed used to allocate folds and to
+        initialize the parameters, which are thus the same for all folds
+        (optional)
+    :param is_warmstart: start every fold from the current parameters of
+        `model` (initialized once if they are not), e.g. those of a model
+        already trained on all data, so that folds converge in fewer
+        iterations. Note that the estimate is then optimistic, since the
+        parameters have seen the data left out [defaulted to False]
+        (optional)
+    :param wrt: indices of the inputs w.r.t. which `dydx` is provided
+        [defaulted to all inputs] (optional)
+    :param options: other arguments of `NeuralNet.fit`, e.g. `max_iter`
+    :return: dictionary with the R-square of the responses of each fold,
+        array of shape (k, n_y), the R-square of their partials, array of
+        shape (k, n_y, n_x) or (k, n_y, len(wrt)) (None if `dydx` is not
+        provided), and the model trained on each fold
+    """
+    if is_warmstart and not hasattr(model.parameters, "W"):
+        model = copy.deepcopy(model)
+        model.parameters.initialize(random_state)
+    options = dict(options, random_state=random_state, is_warmstart=is_warmstart)
+    data = Dataset(x, y, dydx, wrt=wrt)
+    jobs = [
+        (copy.deepcopy(model), data, fold, options)
+        for fold in data._fold_indices(k, shuffle, random_state)
+    ]
+    results = _map(_fit_fold, jobs, n_jobs)
+    return dict(
+        r_square=np.array([result[1] for result in results]),
+        r_square_partials=(
+            None if dydx is None else np.array([result[2] for result in results])
+        ),
+        models=[result[0] for result in results],
+    )
@@ -8,12 +8,14 @@ import numpy as np
 def r_square(y_pred: np.ndarray, y_true: np.ndarray) -> np.ndarray:
     """Compute R-square value for each output.
 
-    :param y_pred: predicted values, array of shape (n_y, m)
-    :param y_true: actuial values, array of shape (n_y, m)
-    :return: R-Squared values for each predicted reponse
+    :param y_pred: predicted values, array of shape (n_y, m), or (n_y,
+        n_x, m) for partials
+    :param y_true: actuial values, array of same shape as `y_pred`
+    :return: R-Squared values for each predicted reponse, array of shape
+        (n_y,), or (n_y, n_x) for partials
     """
     axis = y_true.ndim - 1
-    y_bar = np.mean(y_true, axis=axis)
+    y_bar = np.mean(y_true, axis=axis, keepdims=True)
     SSE = np.sum(np.square(y_pred - y_true), axis=axis)
     SSTO = np.sum(np.square(y_true - y_bar) + 1e-12, axis=axis)
     return 1 - SSE / SSTO
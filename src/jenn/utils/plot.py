@@ -213,7 +213,7 @@ def convergence(
     linestyles = iter(LINE_STYLES.values())
     for history in histories:
         linestyle = next(linestyles)
-        epochs = list(history.keys())
+        epochs = [key for key in history if key.startswith("epoch_")]
         if len(epochs) > 1:
             avg_costs = []
             for epoch in epochs:
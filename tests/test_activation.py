@@ -17,6 +17,7 @@ ACTIVATIONS = dict(
     relu=jenn.core.activation.Relu,
     tanh=jenn.core.activation.Tanh,
     linear=jenn.core.activation.Linear,
+    fast_tanh=jenn.core.activation.FastTanh,
 )
 
 
@@ -93,6 +94,23 @@ class TestActivation:
         assert np.allclose(ACTIVATIONS['tanh'].evaluate(x), np.tanh(x), atol=1e-6)
         _check_activation_partials(x, activation=jenn.core.activation.Tanh)
 
+    def test_fast_tanh(self):
+        """Test fast approximation of tanh against documented max error"""
+        x = np.linspace(-20, 20, 100_001).reshape((1, -1))
+        y = ACTIVATIONS['fast_tanh'].evaluate(x)
+        dy = ACTIVATIONS['fast_tanh'].first_derivative(x, y)
+        ddy = ACTIVATIONS['fast_tanh'].second_derivative(x, y, dy)
+        tanh = ACTIVATIONS['tanh']
+        assert np.max(np.abs(y - tanh.evaluate(x))) < 3e-7
+        assert np.max(np.abs(dy - tanh.first_derivative(x))) < 6e-7
+        assert np.max(np.abs(ddy - tanh.second_derivative(x))) < 1.1e-6
+        assert np.all(np.abs(y) <= 1.0)
+        assert np.allclose(y, -ACTIVATIONS['fast_tanh'].evaluate(-x))  # odd
+        # Beyond the clamp, analytic derivatives are within the max error 
+        # above but finite difference is zero (constant response)
+        x = np.linspace(-7.5, 7.5, 51).reshape((1, -1))
+        _check_activation_partials(x, activation=jenn.core.activation.FastTanh)
+
     def test_linear(self):
         """Test linear activation"""
         x = np.linspace(-10, 10, 51).reshape((1, -1))
@@ -112,6 +130,25 @@ class TestActivation:
         _check_activation_partials(
             x[positive].reshape((1, -1)), activation=jenn.core.activation.Relu)
 
+    def test_evaluate_all(self):
+        """Test that fused evaluation matches separate evaluations."""
+        x = np.linspace(-10, 10, 51).reshape((1, -1))
+        for name, activation in ACTIVATIONS.items():
+            y, dy, ddy = np.zeros(x.shape), np.zeros(x.shape), np.zeros(x.shape)
+            ids = id(y), id(dy), id(ddy)
+            activation.evaluate_all(x, y, dy, ddy)
+            assert (id(y), id(dy), id(ddy)) == ids, f'{name} not in place'
+            assert np.allclose(y, activation.evaluate(x)), name
+            assert np.allclose(dy, activation.first_derivative(x)), name
+            assert np.allclose(ddy, activation.second_derivative(x)), name
+
+            # Only requested orders are computed
+            y, ddy = np.zeros(x.shape), np.full(x.shape, np.nan)
+            activation.evaluate_all(x, y)
+            assert np.allclose(y, activation.evaluate(x)), name
+            activation.evaluate_all(x, y, ddy=ddy)
+            assert np.allclose(ddy, activation.second_derivative(x)), name
+
     @classmethod
     def plot_activation(cls, name: str):
         """Plot specified activation."""
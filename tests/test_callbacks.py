@@ -0,0 +1,97 @@
+"""Test that training callbacks are called and can stop training."""
+import io
+import json
+import jenn
+import numpy as np
+
+
+class Recorder(jenn.core.callbacks.Callback):
+    """Record events and stop after a given number of iterations."""
+
+    def __init__(self, stop_at: int = -1):
+        self.stop_at = stop_at
+        self.events = []
+
+    def on_iteration(self, epoch, batch, iteration, cost, params):
+        self.events.append(('iteration', epoch, batch, iteration))
+        return len(self.events) == self.stop_at
+
+    def on_converged(self, epoch, batch, iteration, reason):
+        self.events.append(('converged', epoch, batch, reason))
+
+    def on_batch_end(self, epoch, batch, cost):
+        self.events.append(('batch_end', epoch, batch))
+
+    def on_epoch_end(self, epoch, history):
+        self.events.append(('epoch_end', epoch))
+
+
+class TestCallbacks:
+    """Check callbacks using sinusoid."""
+
+    x, y, dydx = jenn.synthetic.Sinusoid.sample(0, 10)
+
+    def fit(self, callbacks: list, **kwargs) -> jenn.model.NeuralNet:
+        """Train small model with callbacks."""
+        return jenn.model.NeuralNet([1, 12, 1]).fit(
+            self.x, self.y, self.dydx, callbacks=callbacks, random_state=0,
+            **kwargs)
+
+    def test_events(self):
+        """Test that all hooks are called in order."""
+        recorder = Recorder()
+        self.fit([recorder], max_iter=3, epochs=2, batch_size=5)
+        batch_end = [e for e in recorder.events if e[0] == 'batch_end']
+        assert batch_end == [
+            ('batch_end', 0, 0), ('batch_end', 0, 1),
+            ('batch_end', 1, 0), ('batch_end', 1, 1),
+        ]
+        assert recorder.events[:4] == [
+            ('iteration', 0, 0, 0),
+            ('iteration', 0, 0, 1),
+            ('iteration', 0, 0, 2),
+            ('batch_end', 0, 0),
+        ]
+        assert recorder.events[-1] == ('epoch_end', 1)
+
+    def test_early_termination(self):
+        """Test that returning True stops training altogether."""
+        recorder = Recorder(stop_at=5)
+        nn = self.fit([recorder], max_iter=100, epochs=3)
+        assert recorder.events == [
+            ('iteration', 0, 0, 0),
+            ('iteration', 0, 0, 1),
+            ('iteration', 0, 0, 2),
+            ('iteration', 0, 0, 3),
+            ('iteration', 0, 0, 4),
+            ('converged', 0, 0, 'callback'),
+            ('batch_end', 0, 0),
+            ('epoch_end', 0),
+        ]
+        assert len(nn.history['epoch_0']['batch_0']) == 5
+        assert 'epoch_1' not in nn.history
+
+    def test_console_logger(self):
+        """Test that console output is rate limited."""
+        stream = io.StringIO()
+        logger = jenn.core.callbacks.ConsoleLogger(interval=60.0, stream=stream)
+        self.fit([logger], max_iter=100, epochs=2)
+        lines = stream.getvalue().splitlines()
+        assert lines[0].startswith('epoch = 0, batch = 0, iter = 0')
+        assert lines[1].startswith('epoch = 0, end')
+        assert lines[2].startswith('epoch = 1, end')
+        assert len(lines) == 3  # instead of 200 iterations
+
+    def test_jsonl_writer(self, tmp_path):
+        """Test that progress is written as one JSON object per line."""
+        path = tmp_path / 'progress.jsonl'
+        writer = jenn.core.callbacks.JSONLWriter(path, every=10)
+        nn = self.fit([writer], max_iter=100)
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line['event'] for line in lines] == \
+            ['iteration'] * 10 + ['batch_end', 'epoch_end']
+        assert [line['iteration'] for line in lines[:-2]] == \
+            list(range(0, 100, 10))
+        cost = nn.history['epoch_0']['batch_0']
+        assert np.allclose([line['cost'] for line in lines[:-2]], cost[::10])
+        assert lines[-2]['cost'] == cost[-1]
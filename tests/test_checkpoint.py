@@ -0,0 +1,85 @@
+"""Test that interrupted training resumes exactly from checkpoint."""
+import shutil
+import jenn
+import numpy as np
+import pytest
+
+
+class Interrupt(jenn.core.callbacks.Callback):
+    """Raise exception after a given number of iterations (preemption)."""
+
+    def __init__(self, at: int):
+        self.at = at
+        self.count = 0
+
+    def on_iteration(self, epoch, batch, iteration, cost, params):
+        self.count += 1
+        if self.count == self.at:
+            raise KeyboardInterrupt
+
+
+class TestCheckpoint:
+    """Check checkpoint and resume using sinusoid."""
+
+    x, y, dydx = jenn.synthetic.Sinusoid.sample(0, 20)
+
+    def fit(self, **kwargs) -> jenn.model.NeuralNet:
+        """Train small model."""
+        return jenn.model.NeuralNet([1, 12, 1]).fit(
+            self.x, self.y, self.dydx, **kwargs)
+
+    def interrupt(self, path, at: int = 75, **kwargs) -> None:
+        """Train small model until interrupted."""
+        with pytest.raises(KeyboardInterrupt):
+            self.fit(checkpoint=path, checkpoint_every=7,
+                     callbacks=[Interrupt(at)], **kwargs)
+
+    @pytest.mark.parametrize(
+        'at, options',
+        [
+            (175, dict(optimizer='adam', epochs=3, batch_size=8, max_iter=50)),
+            (75, dict(optimizer='adam', is_backtracking=True, max_iter=120)),
+            (75, dict(optimizer='adam', is_best=True, history_every=3,
+                      history_size=5, max_iter=120)),
+            (25, dict(optimizer='lbfgs', max_iter=60)),
+            (25, dict(optimizer='lm', max_iter=30)),
+        ]
+    )
+    def test_resume(self, tmp_path, at, options):
+        """Test that resumed run is identical to uninterrupted run."""
+        path = tmp_path / 'training.ckpt'
+        expected = self.fit(random_state=0, **options)
+        self.interrupt(path, at, random_state=0, **options)
+        assert not (tmp_path / 'training.ckpt.tmp').exists()  # atomic
+        resumed = self.fit(random_state=0, checkpoint=path,
+                           resume_from=path, **options)
+        assert np.array_equal(
+            resumed.parameters.stack(), expected.parameters.stack())
+        assert list(resumed.history) == list(expected.history)
+        for epoch, batches in expected.history.items():
+            assert list(resumed.history[epoch]) == list(batches)
+            for batch, cost in batches.items():
+                assert np.array_equal(resumed.history[epoch][batch], cost)
+
+    def test_shuffle(self, tmp_path):
+        """Test that mini-batches are shuffled the same way on resume
+        without random state."""
+        path = tmp_path / 'training.ckpt'
+        options = dict(epochs=3, batch_size=8, max_iter=20)
+        self.interrupt(path, at=50, **options)  # during second epoch
+        state = jenn.core.checkpoint.load(path)
+        assert state['epoch'] == 1
+        results = []
+        for i in range(2):
+            copy = shutil.copy(path, tmp_path / f'copy_{i}.ckpt')
+            nn = self.fit(resume_from=copy, **options)
+            results.append(nn.parameters.stack())
+        assert np.array_equal(*results)
+
+    def test_mismatch(self, tmp_path):
+        """Test that checkpoint of different model is rejected."""
+        path = tmp_path / 'training.ckpt'
+        self.fit(checkpoint=path, max_iter=10)
+        with pytest.raises(ValueError):
+            jenn.model.NeuralNet([1, 6, 1]).fit(
+                self.x, self.y, resume_from=path, max_iter=10)
@@ -20,7 +20,18 @@ def test_least_squares():
     eps = 2 * np.random.rand()
     assert cost.evaluate(y + eps, dydx + eps) != 0
 
-    # TODO: check prediction returns known result
+
+def test_weighted_least_squares(beta: float = 2.0, gamma: float = 0.5):
+    """Test that weights multiply the squared errors of response and partials."""
+    x, y, dydx = jenn.synthetic.Sinusoid.sample(100)
+    parameters = jenn.core.parameters.Parameters(layer_sizes=[1, 2, 1])
+    parameters.initialize()
+    data = jenn.core.data.Dataset(x, y, dydx)
+    data.set_weights(beta, gamma)
+    cost = jenn.core.cost.Cost(data, parameters, lambd=0.0)
+    m = data.m
+    expected = 0.5 / m * (beta * 0.1**2 * m + gamma * 0.2**2 * m)
+    assert np.isclose(cost.evaluate(y + 0.1, dydx + 0.2), expected)
 
 
 def test_regularization():
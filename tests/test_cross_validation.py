@@ -0,0 +1,73 @@
+"""Test k-fold cross-validation."""
+import jenn
+import numpy as np
+import pytest
+
+
+class TestCrossValidation:
+    """Check cross-validation using sinusoid."""
+
+    x, y, dydx = jenn.synthetic.Sinusoid.sample(0, 30)
+
+    def test_folds(self, k: int = 4):
+        """Test that each example is left out exactly once."""
+        data = jenn.core.data.Dataset(self.x, self.y, self.dydx)
+        folds = data.folds(k, random_state=0)
+        assert len(folds) == k
+        left_out = np.concatenate([validation.X for _, validation in folds], axis=1)
+        assert np.array_equal(np.sort(left_out.ravel()), np.sort(self.x.ravel()))
+        pairs = dict(zip(data.X[0], data.J[0, 0]))
+        for training, validation in folds:
+            assert training.m + validation.m == data.m
+            assert not np.isin(training.X, validation.X).any()
+            for fold in [training, validation]:  # partials follow examples
+                assert all(
+                    pairs[x] == dydx for x, dydx in zip(fold.X[0], fold.J[0, 0]))
+        with pytest.raises(ValueError):
+            data.folds(1)
+
+    def test_cross_validate(self, k: int = 3):
+        """Test that each fold is scored on the examples it left out, the
+        same whether folds are trained sequentially or in processes."""
+        model = jenn.model.NeuralNet([1, 12, 1])
+        options = dict(k=k, random_state=0, max_iter=200, is_normalize=True)
+        scores = jenn.utils.cross_validate(model, self.x, self.y, self.dydx, **options)
+        assert scores['r_square'].shape == (k, 1)
+        assert scores['r_square_partials'].shape == (k, 1, 1)
+        assert np.all(scores['r_square'] > 0.9)
+        assert np.all(scores['r_square_partials'] > 0.9)
+        assert not hasattr(model.parameters, 'W')  # not modified
+        data = jenn.core.data.Dataset(self.x, self.y, self.dydx)
+        training, validation = data.folds(k, random_state=0)[-1]
+        expected = jenn.model.NeuralNet([1, 12, 1]).fit(
+            training.X, training.Y, training.J, random_state=0, max_iter=200,
+            is_normalize=True)
+        assert np.array_equal(
+            scores['models'][-1].parameters.stack(), expected.parameters.stack())
+        assert np.allclose(
+            scores['r_square'][-1],
+            jenn.utils.metrics.r_square(expected.predict(validation.X), validation.Y))
+        parallel = jenn.utils.cross_validate(
+            model, self.x, self.y, self.dydx, n_jobs=k, **options)
+        assert np.array_equal(parallel['r_square'], scores['r_square'])
+        assert np.array_equal(
+            parallel['r_square_partials'], scores['r_square_partials'])
+        scores = jenn.utils.cross_validate(model, self.x, self.y, **options)
+        assert scores['r_square_partials'] is None
+
+    def test_warmstart(self, k: int = 3):
+        """Test that folds start from the shared initialization."""
+        model = jenn.model.NeuralNet([1, 12, 1]).fit(
+            self.x, self.y, self.dydx, random_state=0, max_iter=500)
+        params = model.parameters.stack()
+        cold = jenn.utils.cross_validate(
+            model, self.x, self.y, self.dydx, k=k, random_state=0, max_iter=20)
+        warm = jenn.utils.cross_validate(
+            model, self.x, self.y, self.dydx, k=k, random_state=0, max_iter=20,
+            is_warmstart=True)
+        assert np.array_equal(model.parameters.stack(), params)  # not modified
+        for cold_model, warm_model in zip(cold['models'], warm['models']):
+            cold_cost = cold_model.history['epoch_0']['batch_0']
+            warm_cost = warm_model.history['epoch_0']['batch_0']
+            assert warm_cost[0] < cold_cost[0]
+        assert np.all(warm['r_square'] > cold['r_square'])
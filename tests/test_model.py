@@ -1,6 +1,11 @@
 """Test training and prediction (including partials)."""
+import inspect
 import jenn
+import pytest
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
+from time import time
 
 from ._utils import finite_difference
 
@@ -126,4 +131,683 @@ class TestRastrigin:
     @classmethod
     def test_gradient_enhanced_neural_net(self): 
         """TODO"""
-        pass 
\ No newline at end of file
+        pass 
+
+class TestDirectionalDerivatives: 
+    """Check Jacobian-vector products against full Jacobian."""
+
+    @pytest.fixture
+    def nn(self) -> jenn.model.NeuralNet:
+        """Return untrained neural net with normalization."""
+        nn = jenn.model.NeuralNet([3, 8, 8, 2], 'tanh')
+        nn.parameters.initialize(random_state=0)
+        nn.parameters.mu_x[:] = np.array([[1.0], [-2.0], [0.5]])
+        nn.parameters.sigma_x[:] = np.array([[2.0], [0.5], [3.0]])
+        nn.parameters.mu_y[:] = np.array([[0.1], [0.2]])
+        nn.parameters.sigma_y[:] = np.array([[4.0], [0.25]])
+        return nn
+
+    def test_jvp(self, nn: jenn.model.NeuralNet, m: int = 10):
+        """Check single direction per example against dy/dx * v."""
+        rng = np.random.default_rng(1)
+        x = rng.normal(size=(3, m))
+        v = rng.normal(size=(3, m))
+        expected = np.einsum('ijm,jm->im', nn.predict_partials(x), v)
+        computed = nn.jvp(x, v)
+        assert computed.shape == (2, m)
+        assert np.allclose(computed, expected)
+
+    def test_batched_jvp(self, nn: jenn.model.NeuralNet, m: int = 10, k: int = 4):
+        """Check many directions per example against dy/dx * v."""
+        rng = np.random.default_rng(2)
+        x = rng.normal(size=(3, m))
+        v = rng.normal(size=(3, k, m))
+        expected = np.einsum('ijm,jkm->ikm', nn.predict_partials(x), v)
+        computed = nn.jvp(x, v)
+        assert computed.shape == (2, k, m)
+        assert np.allclose(computed, expected)
+
+    def test_partials_subset(self, nn: jenn.model.NeuralNet, m: int = 10):
+        """Check partials w.r.t. subset of inputs against full Jacobian."""
+        x = np.random.default_rng(3).normal(size=(3, m))
+        y, dydx = nn.evaluate(x)
+        computed = nn.predict_partials(x, wrt=[2, 0])
+        assert computed.shape == (2, 2, m)
+        assert np.allclose(computed, dydx[:, [2, 0], :])
+        _, computed = nn.evaluate(x, wrt=[1])
+        assert np.allclose(computed, dydx[:, [1], :])
+
+    def test_hessian(self, nn: jenn.model.NeuralNet, m: int = 10, dx: float = 1e-6):
+        """Check Hessian against finite difference of partials."""
+        x = np.random.default_rng(4).normal(size=(3, m))
+        computed = nn.predict_hessian(x)
+        assert computed.shape == (2, 3, 3, m)
+        for k in range(3):
+            step = np.zeros((3, 1))
+            step[k] = dx
+            expected = (
+                nn.predict_partials(x + step) - nn.predict_partials(x - step)
+            ) / (2 * dx)
+            assert np.allclose(computed[:, :, k, :], expected, atol=1e-6)
+        assert np.allclose(computed, np.swapaxes(computed, 1, 2))  # symmetry
+
+    def test_hvp(self, nn: jenn.model.NeuralNet, m: int = 10, k: int = 4):
+        """Check Hessian-vector products against full Hessian."""
+        rng = np.random.default_rng(5)
+        x = rng.normal(size=(3, m))
+        hessian = nn.predict_hessian(x)
+        v = rng.normal(size=(3, m))
+        computed = nn.hvp(x, v)
+        assert computed.shape == (2, 3, m)
+        assert np.allclose(computed, np.einsum('ijkm,km->ijm', hessian, v))
+        v = rng.normal(size=(3, k, m))
+        computed = nn.hvp(x, v)
+        assert computed.shape == (2, 3, k, m)
+        assert np.allclose(computed, np.einsum('ijkm,kqm->ijqm', hessian, v))
+
+
+class TestPrecision: 
+    """Check single precision inference against double precision."""
+
+    @pytest.mark.parametrize(
+        'test_function', 
+        [
+            jenn.synthetic.Sinusoid, 
+            jenn.synthetic.Rastrigin, 
+            jenn.synthetic.Rosenbrock,
+        ],
+    )
+    def test_float32_accuracy(self, test_function: jenn.synthetic.TestFunction):
+        """Check that float32 is carried end to end with bounded error."""
+        x_train, y_train, dydx_train = test_function.sample(0, 5)
+        x_test, _, _ = test_function.sample(100, 0, random_state=0)
+        n_x = x_train.shape[0]
+        nn = jenn.model.NeuralNet([n_x, 12, 12, 1]).fit(
+            x_train, y_train, dydx_train, is_normalize=True, max_iter=100, 
+            random_state=0,
+        )
+        y_64, dydx_64 = nn.evaluate(x_test)
+        nn.astype(np.float32)
+        y_32, dydx_32 = nn.evaluate(x_test)
+        assert y_32.dtype == np.float32
+        assert dydx_32.dtype == np.float32
+        assert nn.predict(x_test.astype(np.float32)).dtype == np.float32
+        scale = np.max(np.abs(y_train))  # error relative to output range
+        assert np.max(np.abs(y_32 - y_64)) / scale < 1e-5
+        scale = np.max(np.abs(dydx_train))
+        assert np.max(np.abs(dydx_32 - dydx_64)) / scale < 1e-5
+
+    def test_float32_training(self):
+        """Check that training a float32 model yields float32 model."""
+        x, y, dydx = jenn.synthetic.Sinusoid.sample(0, 5)
+        nn = jenn.model.NeuralNet([1, 6, 1], dtype=np.float32)
+        nn.fit(x, y, dydx, max_iter=10)
+        assert all(W.dtype == np.float32 for W in nn.parameters.W)
+
+    @pytest.mark.parametrize(
+        'test_function, layer_sizes', 
+        [
+            (jenn.synthetic.Sinusoid, [1, 12, 1]), 
+            (jenn.synthetic.Rosenbrock, [2, 12, 12, 1]),
+        ],
+    )
+    def test_mixed_precision_convergence(
+            self, test_function: jenn.synthetic.TestFunction, layer_sizes: list):
+        """Check that mixed precision training converges like double precision."""
+        x_train, y_train, dydx_train = test_function.sample(0, 5)
+        x_test, y_test, _ = test_function.sample(100, 0, random_state=1)
+        reduction = {}
+        for is_mixed_precision in [False, True]:
+            nn = jenn.model.NeuralNet(layer_sizes).fit(
+                x_train, y_train, dydx_train, is_normalize=True, max_iter=1000, 
+                random_state=0, is_mixed_precision=is_mixed_precision,
+            )
+            assert all(W.dtype == np.float64 for W in nn.parameters.W)
+            cost = nn.history['epoch_0']['batch_0']
+            reduction[is_mixed_precision] = 1 - cost[-1] / cost[0]
+            score = jenn.utils.metrics.r_square(nn.predict(x_test), y_test)
+            assert np.all(score > 0.95), f'r-square = {score} < 0.95'
+        assert np.isclose(reduction[True], reduction[False], atol=1e-2)
+
+    @pytest.mark.benchmark
+    def test_float32_speed(self, m: int = 100_000, repeat: int = 5):
+        """Benchmark float32 against float64 inference on Rastrigin."""
+        x, _, _ = jenn.synthetic.Rastrigin.sample(m, 0, random_state=0)
+        nn = jenn.model.NeuralNet([2, 32, 32, 1])
+        nn.parameters.initialize(random_state=0)
+        elapsed = {}
+        for dtype in [np.float64, np.float32]:
+            nn.astype(dtype)
+            x_cast = x.astype(dtype)
+            tic = time()
+            for _ in range(repeat):
+                nn.evaluate(x_cast)
+            toc = time()
+            elapsed[dtype] = (toc - tic) / repeat
+        # Speed about "2 x": 0.24s > 0.12s for x.shape = (2, 1e5)
+        assert elapsed[np.float32] < elapsed[np.float64]
+
+
+class TestApproximation: 
+    """Check fast approximate activations for inference against exact ones."""
+
+    @pytest.mark.parametrize(
+        'test_function', 
+        [
+            jenn.synthetic.Sinusoid, 
+            jenn.synthetic.Rastrigin, 
+            jenn.synthetic.Rosenbrock,
+        ],
+    )
+    def test_approximation_error(
+            self, test_function: jenn.synthetic.TestFunction):
+        """Check error of approximate inference on synthetic functions."""
+        x_train, y_train, dydx_train = test_function.sample(0, 5)
+        x_test, _, _ = test_function.sample(100, 0, random_state=0)
+        n_x = x_train.shape[0]
+        nn = jenn.model.NeuralNet([n_x, 12, 12, 1], is_approximate=True).fit(
+            x_train, y_train, dydx_train, is_normalize=True, max_iter=100, 
+            random_state=0,
+        )
+        assert nn.parameters.a == ['linear', 'fast_tanh', 'fast_tanh', 'linear']
+        y_approx, dydx_approx = nn.evaluate(x_test)
+        d2ydx2_approx = nn.predict_hessian(x_test)
+        nn.approximate(False)
+        y, dydx = nn.evaluate(x_test)
+        d2ydx2 = nn.predict_hessian(x_test)
+        errors = [
+            np.max(np.abs(y_approx - y)) / np.max(np.abs(y)), 
+            np.max(np.abs(dydx_approx - dydx)) / np.max(np.abs(dydx)), 
+            np.max(np.abs(d2ydx2_approx - d2ydx2)) / np.max(np.abs(d2ydx2)), 
+        ]
+        assert errors[0] < 1e-5
+        assert errors[1] < 1e-5
+        assert errors[2] < 1e-4
+
+    def test_serialization(self, tmp_path):
+        """Check that saved files refer to exact activations."""
+        x, y, dydx = jenn.synthetic.Sinusoid.sample(0, 5)
+        nn = jenn.model.NeuralNet([1, 6, 1], is_approximate=True)
+        nn.fit(x, y, dydx, max_iter=10)
+        nn.save(tmp_path / 'parameters.json')
+        reloaded = jenn.model.NeuralNet([1, 6, 1]).load(
+            tmp_path / 'parameters.json')
+        assert reloaded.parameters.a == ['linear', 'tanh', 'linear']
+        assert np.allclose(reloaded.approximate().predict(x), nn.predict(x))
+
+    @pytest.mark.benchmark
+    @pytest.mark.parametrize('backend', ['numpy', 'numba'])
+    def test_approximation_speed(
+            self, backend: str, m: int = 100_000, repeat: int = 5):
+        """Benchmark approximate against exact inference on Rastrigin."""
+        if backend == 'numba' and find_spec('numba') is None: 
+            pytest.skip('numba not installed')
+        x, _, _ = jenn.synthetic.Rastrigin.sample(m, 0, random_state=0)
+        nn = jenn.model.NeuralNet([2, 32, 32, 1], backend=backend)
+        nn.parameters.initialize(random_state=0)
+        elapsed = {}
+        for is_approximate in [False, True]:
+            nn.approximate(is_approximate)
+            nn.predict(x[:, :10])  # compile kernels (if any)
+            elapsed[is_approximate] = np.inf
+            for _ in range(repeat):  # best of repeats (noisy timings)
+                tic = time()
+                nn.predict(x)
+                toc = time()
+                elapsed[is_approximate] = min(elapsed[is_approximate], toc - tic)
+        if backend == 'numba': 
+            # Speed about "2.3 x": 0.29s > 0.13s for x.shape = (2, 1e5)
+            assert elapsed[True] < elapsed[False]
+        # NumPy speed depends on whether np.tanh is vectorized for the 
+        # platform: about "1.7 x" faster without AVX-512 in double precision, 
+        # but slower otherwise, hence no assertion.
+
+
+class TestOptimizer: 
+    """Check L-BFGS against ADAM for full-batch training."""
+
+    @staticmethod
+    def _evaluations(profiler: jenn.core.profiling.Profiler) -> int:
+        """Return number of cost function and gradient evaluations."""
+        counters = profiler.summary()['counters']
+        return counters['cost_evaluations'] + counters['gradient_evaluations']
+
+    @pytest.mark.parametrize(
+        'test_function, layer_sizes', 
+        [
+            (jenn.synthetic.Sinusoid, [1, 12, 1]), 
+            # Rastrigin omitted: ADAM reaches 5e-3 in 1000 iterations, which 
+            # L-BFGS matches only after about 1500 iterations (slower)
+            (jenn.synthetic.Rosenbrock, [2, 12, 12, 1]),
+        ],
+    )
+    def test_lbfgs_evaluations_to_accuracy(
+            self, test_function: jenn.synthetic.TestFunction, layer_sizes: list):
+        """Check that L-BFGS reaches the cost ADAM reaches in far fewer
+        evaluations of the cost function and its gradient."""
+        x, y, dydx = test_function.sample(0, 5)
+        options = dict(is_normalize=True, random_state=0)
+        profiler = jenn.core.profiling.Profiler()
+        nn = jenn.model.NeuralNet(layer_sizes).fit(
+            x, y, dydx, max_iter=1000, optimizer='adam', profiler=profiler, 
+            **options)
+        evaluations_adam = self._evaluations(profiler)
+        target = np.squeeze(nn.history['epoch_0']['batch_0'][-1])
+        nn = jenn.model.NeuralNet(layer_sizes).fit(
+            x, y, dydx, max_iter=1000, optimizer='lbfgs', **options)
+        cost = np.squeeze(nn.history['epoch_0']['batch_0'])
+        assert np.any(cost <= target), 'L-BFGS did not reach ADAM accuracy'
+        max_iter = int(np.argmax(cost <= target)) + 1  # iterations to target
+        profiler = jenn.core.profiling.Profiler()
+        jenn.model.NeuralNet(layer_sizes).fit(
+            x, y, dydx, max_iter=max_iter, optimizer='lbfgs', 
+            profiler=profiler, **options)
+        # About 240 evaluations vs 3000 for Rosenbrock (110 for Sinusoid)
+        assert self._evaluations(profiler) < evaluations_adam / 4
+
+    @pytest.mark.benchmark
+    @pytest.mark.parametrize(
+        'test_function, layer_sizes', 
+        [
+            (jenn.synthetic.Sinusoid, [1, 12, 1]), 
+            (jenn.synthetic.Rosenbrock, [2, 12, 12, 1]),
+        ],
+    )
+    def test_lbfgs_time_to_accuracy(
+            self, test_function: jenn.synthetic.TestFunction, layer_sizes: list):
+        """Benchmark time for L-BFGS to reach the cost ADAM reaches."""
+        x, y, dydx = test_function.sample(0, 5)
+        options = dict(is_normalize=True, random_state=0)
+        tic = time()
+        nn = jenn.model.NeuralNet(layer_sizes).fit(
+            x, y, dydx, max_iter=1000, optimizer='adam', **options)
+        toc = time()
+        elapsed_adam = toc - tic
+        target = np.squeeze(nn.history['epoch_0']['batch_0'][-1])
+        nn = jenn.model.NeuralNet(layer_sizes).fit(
+            x, y, dydx, max_iter=1000, optimizer='lbfgs', **options)
+        cost = np.squeeze(nn.history['epoch_0']['batch_0'])
+        max_iter = int(np.argmax(cost <= target)) + 1  # iterations to target
+        tic = time()
+        jenn.model.NeuralNet(layer_sizes).fit(
+            x, y, dydx, max_iter=max_iter, optimizer='lbfgs', **options)
+        toc = time()
+        elapsed_lbfgs = toc - tic
+        # Speed about "20 x": 0.38s > 0.02s for Sinusoid (about "9 x" for 
+        # Rosenbrock)
+        assert elapsed_lbfgs < elapsed_adam
+
+    def test_history(self, max_iter: int = 100):
+        """Check that recording options bound training history and that 
+        the best parameters can be restored."""
+        x, y, dydx = jenn.synthetic.Sinusoid.sample(0, 10)
+        options = dict(is_normalize=True, random_state=0, max_iter=max_iter)
+        nn = jenn.model.NeuralNet([1, 12, 1]).fit(x, y, dydx, **options)
+        cost = nn.history['epoch_0']['batch_0']
+        nn = jenn.model.NeuralNet([1, 12, 1]).fit(
+            x, y, dydx, history_every=10, **options)
+        assert np.all(nn.history['epoch_0']['batch_0'] == cost[::10])
+        nn = jenn.model.NeuralNet([1, 12, 1]).fit(
+            x, y, dydx, history_size=5, **options)
+        assert np.all(nn.history['epoch_0']['batch_0'] == cost[-5:])
+        nn = jenn.model.NeuralNet([1, 12, 1]).fit(
+            x, y, dydx, is_best=True, alpha=1.0, **options)  # unstable steps
+        best = np.min(nn.history['epoch_0']['batch_0'])
+        assert best < nn.history['epoch_0']['batch_0'][-1]
+        data = jenn.core.data.Dataset(x, y, dydx)
+        data.set_weights()
+        data = data.normalize()
+        cost = jenn.core.training.objective_function(
+            data.X, 
+            jenn.core.cost.Cost(data, nn.parameters), 
+            nn.parameters, 
+            jenn.core.cache.Cache(nn.parameters.layer_sizes, data.m), 
+            nn.parameters.stack(),
+        )
+        assert np.isclose(cost, best, rtol=1e-12)
+
+    def test_armijo_forward_passes(self, monkeypatch, max_iter: int = 100):
+        """Check that Armijo line search reuses known cost and gradient,
+        such that fewer forward passes are needed per accepted step than
+        with backtracking."""
+        x, y, dydx = jenn.synthetic.Rosenbrock.sample(0, 5)
+        count = []
+        objective_function = jenn.core.training.objective_function
+        def counted(*args, **kwargs):
+            count.append(None)
+            return objective_function(*args, **kwargs)
+        monkeypatch.setattr(jenn.core.training, 'objective_function', counted)
+        passes = {}
+        for is_backtracking, line_search in [
+                (False, 'backtracking'), (True, 'backtracking'), (True, 'armijo')]:
+            count.clear()
+            nn = jenn.model.NeuralNet([2, 12, 12, 1]).fit(
+                x, y, dydx, is_normalize=True, max_iter=max_iter, 
+                random_state=0, is_backtracking=is_backtracking, max_count=20, 
+                line_search=line_search,
+            )
+            iterations = len(nn.history['epoch_0']['batch_0'])
+            passes[is_backtracking, line_search] = len(count) / iterations
+        # current point + trial point (was 3 before reuse)
+        assert passes[False, 'backtracking'] == 2
+        # about 3 (6.5 by backtracking, i.e. without interpolation)
+        assert passes[True, 'armijo'] < 4
+        assert passes[True, 'armijo'] < passes[True, 'backtracking']
+
+    def test_line_search(self):
+        """Check that backtracking is the default line search, reducing
+        the step size by tau, while Armijo is opt-in."""
+        optimizer = jenn.core.training._optimizer
+        args = ('adam', 0.9, 0.99, 0.3, 1e-12, 20, True)
+        line_search = optimizer(*args, 'backtracking').line_search
+        assert isinstance(line_search, jenn.core.optimization.Backtracking)
+        assert line_search.tau == 0.3
+        line_search = optimizer(*args, 'armijo').line_search
+        assert isinstance(line_search, jenn.core.optimization.Armijo)
+        x, y, _ = jenn.synthetic.Sinusoid.sample(5)
+        with pytest.raises(ValueError):
+            jenn.model.NeuralNet([1, 4, 1]).fit(x, y, line_search='wolfe')
+
+    @pytest.mark.parametrize(
+        'test_function, layer_sizes', 
+        [
+            (jenn.synthetic.Sinusoid, [1, 12, 1]), 
+            (jenn.synthetic.Rastrigin, [2, 12, 12, 1]),
+            (jenn.synthetic.Rosenbrock, [2, 12, 12, 1]),
+        ],
+    )
+    def test_lm(self, test_function: jenn.synthetic.TestFunction, layer_sizes: list):
+        """Check that Levenberg-Marquardt beats ADAM in far fewer iterations."""
+        x, y, dydx = test_function.sample(0, 5)
+        options = dict(is_normalize=True, random_state=0)
+        cost = {}
+        for optimizer, max_iter in [('adam', 1000), ('lm', 100)]:
+            nn = jenn.model.NeuralNet(layer_sizes).fit(
+                x, y, dydx, max_iter=max_iter, optimizer=optimizer, **options)
+            cost[optimizer] = np.squeeze(nn.history['epoch_0']['batch_0'])
+        assert cost['lm'][-1] < cost['adam'][-1]
+
+    @pytest.mark.parametrize('hidden_activation', ['tanh', 'relu'])
+    @pytest.mark.parametrize('beta, gamma', [(1.0, 1.0), (2.0, 1.0), (2.0, 0.5)])
+    def test_residual_jacobian(
+            self, hidden_activation: str, beta: float, gamma: float, 
+            lambd: float = 0.1):
+        """Check that residuals and their Jacobian are consistent with the 
+        cost function and its gradient used by backprop."""
+        x, y, dydx = jenn.synthetic.Rastrigin.sample(0, 3)
+        data = jenn.core.data.Dataset(x, y, dydx)
+        data.set_weights(beta=beta, gamma=gamma)
+        params = jenn.core.parameters.Parameters(
+            [2, 6, 6, 1], hidden_activation=hidden_activation)
+        params.initialize(random_state=0)
+        cache = jenn.core.cache.Cache(params.layer_sizes, data.m)
+        cost = jenn.core.cost.Cost(data, params, lambd)
+        stack = params.stack()
+        training = jenn.core.training
+        r = training.residual_function(data, params, cache, lambd, stack)
+        J = training.residual_jacobian(data, params, cache, lambd, stack)
+        f = training.objective_function(data.X, cost, params, cache, stack)
+        dfdx = training.objective_gradient(data, params, cache, lambd, stack)
+        assert np.isclose(0.5 * np.dot(r, r), f)
+        assert np.allclose(J.T @ r, dfdx.ravel())
+
+
+@pytest.mark.skipif(
+    find_spec('array_api_strict') is None, reason="array_api_strict not installed")
+class TestArrayNamespace: 
+    """Check the whole pipeline (training and prediction) in the strict 
+    reference array API namespace against NumPy."""
+
+    def test_strict_namespace(self, m: int = 10):
+        """Check that both namespaces train and predict the same model."""
+        x_train, y_train, dydx_train = jenn.synthetic.Rastrigin.sample(0, 3)
+        x_test, _, _ = jenn.synthetic.Rastrigin.sample(m, 0, random_state=0)
+        v = np.random.default_rng(0).normal(size=x_test.shape)
+        results = {}
+        for array_namespace in ['numpy', 'array_api_strict']:
+            nn = jenn.model.NeuralNet(
+                [2, 6, 6, 1], array_namespace=array_namespace).fit(
+                x_train, y_train, dydx_train, is_normalize=True, max_iter=20, 
+                random_state=0,
+            )
+            y, dydx = nn.evaluate(x_test)
+            results[array_namespace] = [
+                y, dydx, nn.jvp(x_test, v), nn.predict_hessian(x_test), 
+                nn.parameters.stack(),
+            ]
+        for computed, expected in zip(
+                results['array_api_strict'], results['numpy']):
+            assert isinstance(computed, np.ndarray)
+            assert np.allclose(computed, expected, atol=1e-12)
+
+
+class TestEarlyStopping: 
+    """Check early stopping on noisy sinusoid (prone to overfitting)."""
+
+    rng = np.random.default_rng(0)
+    x = np.linspace(-np.pi, np.pi, 20).reshape((1, -1))
+    y = np.sin(x) + 0.3 * rng.standard_normal(x.shape)
+    x_val = rng.uniform(-np.pi, np.pi, (1, 20))
+    y_val = np.sin(x_val) + 0.3 * rng.standard_normal(x_val.shape)
+    x_test = np.linspace(-np.pi, np.pi, 200).reshape((1, -1))
+    y_test = np.sin(x_test)
+    options = dict(is_normalize=True, max_iter=3000, random_state=0)
+
+    def rmse(self, nn: jenn.model.NeuralNet) -> float:
+        """Return error against noiseless test data."""
+        return float(np.sqrt(np.mean((nn.predict(self.x_test) - self.y_test) ** 2)))
+
+    def test_validation_data(self):
+        """Test that training stops early, restores the best parameters 
+        and generalizes better than training until max_iter."""
+        nn = jenn.model.NeuralNet([1, 32, 32, 1]).fit(
+            self.x, self.y, **self.options)
+        rmse_overfit = self.rmse(nn)
+        nn = jenn.model.NeuralNet([1, 32, 32, 1]).fit(
+            self.x, self.y, validation_data=(self.x_val, self.y_val), 
+            validation_every=10, patience=10, **self.options)
+        rmse = self.rmse(nn)
+        iterations = len(nn.history['epoch_0']['batch_0'])
+        validation = nn.history['validation']
+        # About 190 iterations instead of 3000 (and rmse 0.17 < 0.28)
+        assert iterations < self.options['max_iter'] // 5
+        assert len(validation) == (iterations - 1) // 10 + 1
+        assert np.argmin(validation) == len(validation) - 1 - 10  # patience
+        assert rmse < rmse_overfit
+        # Best parameters restored: same validation cost as the lowest one
+        data = jenn.core.data.Dataset(self.x_val, self.y_val)
+        data = data.normalize(reference=jenn.core.data.Dataset(self.x, self.y))
+        stopping = jenn.core.callbacks.EarlyStopping(data, nn.parameters)
+        cost = stopping.evaluate(nn.parameters.stack())
+        assert np.isclose(cost, np.min(validation), rtol=1e-12)
+
+    def test_validation_fraction(self):
+        """Test that validation data can be held out from training data."""
+        data = jenn.core.data.Dataset(self.x, self.y)
+        train, validation = data.split(0.25, random_state=0)
+        assert (train.m, validation.m) == (15, 5)
+        assert np.all(np.sort(np.concatenate([train.X, validation.X], axis=1)) 
+                      == self.x)
+        nn = jenn.model.NeuralNet([1, 32, 32, 1]).fit(
+            self.x, self.y, validation_fraction=0.25, **self.options)
+        assert len(nn.history['epoch_0']['batch_0']) < self.options['max_iter']
+        assert self.rmse(nn) < 0.28  # about 0.23 (vs 0.28 without)
+
+
+class TestTimeBudget: 
+    """Check that training stops cleanly within time budget."""
+
+    def test_time_budget(self, time_budget: float = 0.5, max_iter: int = 1_000_000):
+        """Test that training stops on time with the best parameters and 
+        reports use of the budget per phase."""
+        x, y, dydx = jenn.synthetic.Rastrigin.sample(0, 8)
+        nn = jenn.model.NeuralNet([2, 24, 24, 1]).fit(
+            x, y, dydx, is_normalize=True, max_iter=max_iter, alpha=0.5, 
+            random_state=0, time_budget=time_budget)
+        report = nn.history['budget']
+        assert report['is_exhausted']
+        assert report['used'] >= 1.0
+        assert np.isclose(sum(report['phases'].values()), report['used'])
+        assert report['phases']['backward'] > 0.0
+        # Lowest cost parameters left in place (large steps oscillate)
+        cost = nn.history['epoch_0']['batch_0']
+        assert len(cost) < max_iter
+        assert np.min(cost) < cost[-1]
+        data = jenn.core.data.Dataset(x, y, dydx)
+        data = data.normalize()
+        value = jenn.core.training.objective_function(
+            data.X, 
+            jenn.core.cost.Cost(data, nn.parameters), 
+            nn.parameters, 
+            jenn.core.cache.Cache(nn.parameters.layer_sizes, data.m), 
+            nn.parameters.stack(),
+        )
+        assert np.isclose(value, np.min(cost), rtol=1e-12)
+
+    def test_batches(self, time_budget: float = 0.2, epochs: int = 100_000):
+        """Test that budget is also checked between batches and epochs."""
+        x, y, dydx = jenn.synthetic.Rastrigin.sample(0, 8)
+        nn = jenn.model.NeuralNet([2, 24, 24, 1]).fit(
+            x, y, dydx, max_iter=10, batch_size=4, epochs=epochs, 
+            random_state=0, time_budget=time_budget)
+        assert nn.history['budget']['is_exhausted']
+        n_epochs = len([key for key in nn.history if key.startswith('epoch_')])
+        assert 1 < n_epochs < epochs
+
+    def test_not_exhausted(self):
+        """Test that training which ends within budget keeps its final 
+        parameters, rather than those of the lowest minibatch cost."""
+        x, y, dydx = jenn.synthetic.Rastrigin.sample(0, 8)
+        options = dict(max_iter=10, batch_size=16, epochs=3, random_state=0)
+        expected = jenn.model.NeuralNet([2, 24, 24, 1]).fit(x, y, dydx, **options)
+        nn = jenn.model.NeuralNet([2, 24, 24, 1]).fit(
+            x, y, dydx, time_budget=1e6, **options)
+        assert not nn.history['budget']['is_exhausted']
+        assert np.array_equal(nn.parameters.stack(), expected.parameters.stack())
+
+
+class TestMultiStart:
+    """Check that best of several independently seeded starts is kept."""
+
+    x, y, dydx = jenn.synthetic.Sinusoid.sample(0, 20)
+
+    def fit(self, **kwargs) -> jenn.model.NeuralNet:
+        """Train small model."""
+        return jenn.model.NeuralNet([1, 12, 1]).fit(
+            self.x, self.y, self.dydx, max_iter=300, random_state=0, 
+            **kwargs)
+
+    def test_best_of_n(self, n_starts: int = 4):
+        """Test that the start with the lowest cost is kept."""
+        nn = self.fit(n_starts=n_starts)
+        costs = [start['cost'] for start in nn.starts]
+        assert len(costs) == n_starts
+        assert len(set(start['random_state'] for start in nn.starts)) == n_starts
+        best = nn.starts[np.argmin(costs)]
+        cost = nn.history['epoch_0']['batch_0']
+        assert np.array_equal(cost, best['history']['epoch_0']['batch_0'])
+        assert cost[-1] == min(costs)
+        single = jenn.model.NeuralNet([1, 12, 1]).fit(
+            self.x, self.y, self.dydx, max_iter=300, 
+            random_state=best['random_state'])
+        assert np.array_equal(
+            single.parameters.stack(), nn.parameters.stack())
+
+    def test_validation(self, n_starts: int = 3):
+        """Test that starts are compared on the same validation data."""
+        nn = self.fit(n_starts=n_starts, validation_fraction=0.25)
+        costs = [start['cost'] for start in nn.starts]
+        assert np.min(nn.history['validation']) == min(costs)
+
+    def test_prune(self, n_starts: int = 4):
+        """Test that worse half is stopped early, while the result of the
+        other half is the same as without pruning."""
+        expected = self.fit(n_starts=n_starts)
+        nn = self.fit(n_starts=n_starts, prune_after=50)
+        assert sum(start['is_pruned'] for start in nn.starts) == n_starts // 2
+        for start, other in zip(nn.starts, expected.starts):
+            if start['is_pruned']:
+                assert len(start['history']['epoch_0']['batch_0']) == 51
+            else:
+                assert start['cost'] == other['cost']
+        with pytest.raises(ValueError):
+            self.fit(n_starts=n_starts, checkpoint='training.ckpt')
+
+    def test_options(self, monkeypatch):
+        """Test that starts are given every other argument of fit."""
+        received = {}
+        def fit_starts(self, x, y, dydx, options, *args):
+            received.update(options)
+            return self
+        monkeypatch.setattr(jenn.model.NeuralNet, '_fit_starts', fit_starts)
+        self.fit(n_starts=2, tau=0.3)
+        expected = set(inspect.signature(jenn.model.NeuralNet.fit).parameters)
+        expected -= {'self', 'x', 'y', 'dydx', 'n_starts', 'n_jobs', 'prune_after'}
+        assert set(received) == expected
+        assert received['tau'] == 0.3
+
+    def test_processes(self, n_starts: int = 4):
+        """Test that starts trained in parallel give the same result."""
+        expected = self.fit(n_starts=n_starts, prune_after=50)
+        nn = self.fit(n_starts=n_starts, prune_after=50, n_jobs=2)
+        assert [start['cost'] for start in nn.starts] == \
+            [start['cost'] for start in expected.starts]
+        assert np.array_equal(
+            nn.parameters.stack(), expected.parameters.stack())
+
+
+class TestDataParallel:
+    """Check that examples split among threads give the same training."""
+
+    x, y, dydx = jenn.synthetic.Rastrigin.sample(101, 0, random_state=0)
+
+    @pytest.mark.parametrize('n_threads', [4, 200])  # uneven, more than m
+    def test_gradient(self, n_threads: int, lambd: float = 0.1):
+        """Test that shards are reduced to same cost function and gradient."""
+        data = jenn.core.data.Dataset(self.x, self.y, self.dydx)
+        data.set_weights(beta=2.0, gamma=0.5)
+        parameters = jenn.core.parameters.Parameters([2, 6, 6, 1])
+        parameters.initialize(0)
+        cache = jenn.core.cache.Cache(parameters.layer_sizes, data.m, data.n_p)
+        x0 = parameters.stack()
+        func, grad = jenn.core.training._objective(
+            'adam', data, parameters, cache, lambd)
+        cost, gradient = func(x0), grad(x0).copy()
+        with ThreadPoolExecutor(n_threads) as pool:
+            func, grad = jenn.core.training._objective(
+                'adam', data, parameters, cache, lambd, pool, n_threads)
+            assert np.isclose(func(x0), cost, rtol=1e-14)
+            assert np.allclose(grad(x0), gradient, rtol=1e-12, atol=1e-14)
+
+    def test_training(self, n_threads: int = 4):
+        """Test that training is deterministic and same as on one thread
+        (up to round-off)."""
+        kwargs = dict(is_normalize=True, lambd=0.1, max_iter=50, random_state=0)
+        expected = jenn.model.NeuralNet([2, 6, 6, 1]).fit(
+            self.x, self.y, self.dydx, **kwargs)
+        results = [
+            jenn.model.NeuralNet([2, 6, 6, 1]).fit(
+                self.x, self.y, self.dydx, n_threads=n_threads, **kwargs)
+            for _ in range(2)
+        ]
+        assert np.array_equal(
+            results[0].parameters.stack(), results[1].parameters.stack())
+        assert np.allclose(
+            results[0].parameters.stack(), expected.parameters.stack(),
+            rtol=1e-8, atol=1e-10)
+        with pytest.raises(ValueError):
+            jenn.model.NeuralNet([2, 6, 1]).fit(
+                self.x, self.y, optimizer='lm', n_threads=n_threads)
+
+    def test_profile(self, n_threads: int = 4):
+        """Test that phases split among threads are timed once, such that
+        they add up to no more than the budget used."""
+        profiler = jenn.core.profiling.Profiler()
+        nn = jenn.model.NeuralNet([2, 6, 6, 1]).fit(
+            self.x, self.y, self.dydx, max_iter=20, random_state=0,
+            n_threads=n_threads, profiler=profiler, time_budget=1e6)
+        summary = profiler.summary()
+        assert summary['phases']['cost']['calls'] == \
+            summary['counters']['cost_evaluations']
+        assert 'partials' not in summary['phases']  # on worker threads
+        assert nn.history['budget']['phases']['other'] >= 0.0
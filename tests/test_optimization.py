@@ -4,6 +4,7 @@ import pytest
 import numpy as np
 import jenn
 from importlib.util import find_spec
+from time import time
 
 if find_spec("matplotlib"):
     from matplotlib import pyplot as plt
@@ -44,6 +45,81 @@ class TestLineSearch:
         assert line_search(x0, dfdx(x0), f, learning_rate=0.1) == -0.8
 
 
+class TestArmijo: 
+    """Check that Armijo line search is working 
+    using 1D parabola as test function."""
+
+    def test_finds_minimum(self):
+        """Test that interpolation finds the minimum of a parabola in one 
+        backtracking step, reusing the known cost at the initial point."""
+        count = []
+        def f(x):
+            count.append(x)
+            return jenn.synthetic.Parabola.evaluate(x, x0=1.0).item()
+        dfdx = lambda x: jenn.synthetic.Parabola.first_derivative(x, x0=1.0)
+        line_search = jenn.core.optimization.Armijo(
+            update=jenn.core.optimization.GD())
+        x0 = np.array([-1.0]).reshape((1, 1))
+        x = line_search(x0, dfdx(x0), f, learning_rate=2.0, f0=4.0)
+        assert np.allclose(x, 1.0)
+        assert len(count) == 2  # trial step rejected, interpolated accepted
+
+    def test_max_count(self):
+        """Test that cost evaluations are capped."""
+        count = []
+        def f(x):
+            count.append(x)
+            return jenn.synthetic.Parabola.evaluate(x, x0=1.0).item()
+        dfdx = lambda x: jenn.synthetic.Parabola.first_derivative(x, x0=1.0)
+        line_search = jenn.core.optimization.Armijo(
+            update=jenn.core.optimization.GD(), max_count=3)
+        x0 = np.array([-1.0]).reshape((1, 1))
+        line_search(x0, dfdx(x0), f, learning_rate=1e6)
+        assert len(count) == 1 + 3  # f0 (not provided) + trial steps
+
+    def test_backtracking_reuses_cost(self):
+        """Test that backtracking does not evaluate known cost again."""
+        count = []
+        def f(x):
+            count.append(x)
+            return jenn.synthetic.Parabola.evaluate(x, x0=1.0).item()
+        dfdx = lambda x: jenn.synthetic.Parabola.first_derivative(x, x0=1.0)
+        line_search = jenn.core.optimization.Backtracking(
+            update=jenn.core.optimization.GD())
+        x0 = np.array([-1.0]).reshape((1, 1))
+        line_search(x0, dfdx(x0), f, learning_rate=0.1, f0=f(x0))
+        assert len(count) == 2  # f0 + accepted trial step
+
+
+class TestStrongWolfe: 
+    """Check that strong-Wolfe line search is working 
+    using 1D parabola as test function."""
+
+    def test_finds_minimum(self):
+        """Test that the step satisfies the strong Wolfe conditions, 
+        whether the initial trial step is too short or too long."""
+        f = lambda x: jenn.synthetic.Parabola.evaluate(x, x0=1.0).item()
+        dfdx = lambda x: jenn.synthetic.Parabola.first_derivative(x, x0=1.0)
+        line_search = jenn.core.optimization.StrongWolfe(
+            update=jenn.core.optimization.GD(), c2=0.1)
+        x0 = np.array([-1.0]).reshape((1, 1))
+        s = -dfdx(x0).ravel()
+        for learning_rate in [0.01, 1.0, 10.0]:
+            x = line_search(x0, dfdx(x0), f, learning_rate, gradient=dfdx)
+            assert f(x) <= f(x0) + 1e-4 * np.dot(-s, x.ravel() - x0.ravel())
+            assert abs(np.dot(dfdx(x).ravel(), s)) <= 0.1 * np.dot(s, s)
+
+    def test_requires_gradient(self):
+        """Test that gradient is required to check curvature."""
+        f = lambda x: jenn.synthetic.Parabola.evaluate(x).item()
+        dfdx = lambda x: jenn.synthetic.Parabola.first_derivative(x)
+        line_search = jenn.core.optimization.StrongWolfe(
+            update=jenn.core.optimization.GD())
+        x0 = np.array([1.0]).reshape((1, 1))
+        with pytest.raises(ValueError):
+            line_search(x0, dfdx(x0), f)
+
+
 class TestUpdate: 
     """Test parameter update using a simple 
     linear function."""
@@ -64,6 +140,113 @@ class TestUpdate:
         x = update(x0, dydx, alpha=1).squeeze()
         assert np.allclose(x, np.array([4, 9]))
 
+    def test_ADAM_step_counter(self):
+        """Test that ADAM counts steps explicitly and reuses its buffers."""
+        update = jenn.core.optimization.ADAM()
+        x = np.zeros((3, 1))
+        grads = np.ones((3, 1))
+        update.step()
+        update(x, grads, alpha=0)  # same search direction, 
+        update(x, grads, alpha=1)  # different step sizes
+        assert update._t == 1
+        v = update._v
+        for t in range(2, 5):
+            grads[:] = t  # new gradient, same array
+            update.step()
+            x = update(x, grads, alpha=1)
+            assert update._t == t
+        assert update._v is v  # updated in place
+
+    def test_ADAM_inplace_gradient(self, max_iter: int = 5):
+        """Test that gradient updated in place gives the same steps as a 
+        new gradient array at every step."""
+        in_place = jenn.core.optimization.ADAM()
+        fresh = jenn.core.optimization.ADAM()
+        x = y = np.zeros((3, 1))
+        grads = np.zeros((3, 1))
+        for t in range(1, max_iter + 1):
+            grads[:] = t
+            in_place.step()
+            x = in_place(x, grads, alpha=0.1)
+            fresh.step()
+            y = fresh(y, np.full((3, 1), float(t)), alpha=0.1)
+        assert np.array_equal(x, y)
+
+    @pytest.mark.benchmark
+    def test_ADAM_speed(self, n: int = 100_000, max_iter: int = 100):
+        """Benchmark per-step overhead for large models."""
+        update = jenn.core.optimization.ADAM()
+        x = np.zeros((n, 1))
+        grads = np.random.default_rng(0).random((n, 1))
+        tic = time()
+        for _ in range(max_iter):
+            update.step()
+            x = update(x, grads, alpha=0.01)
+        toc = time()
+        elapsed = (toc - tic) / max_iter
+        # Speed about "60 x": 87 ms > 1.5 ms per step (with lists of ids)
+        assert elapsed < 0.02
+
+    def test_LBFGS(self):
+        """Test L-BFGS using simple quadratic function."""
+        A = np.array([[3.0, 1.0], [1.0, 2.0]])  # Hessian of f = x.T A x / 2
+        update = jenn.core.optimization.LBFGS(memory=2)
+        x0 = np.array([[1.0], [1.0]])
+        x1 = update(x0, A @ x0, alpha=0.1)  # normalized steepest descent
+        assert np.isclose(np.linalg.norm(x1 - x0), 0.1)
+        update(x1, A @ x1, alpha=1.0)  # new gradient adds (s, y) pair
+        s, y = x1 - x0, A @ (x1 - x0)
+        assert np.allclose(update(x1, y, alpha=1.0) - x1, -s)  # H y = s
+        x = x1
+        for _ in range(5):
+            x = update(x, A @ x, alpha=0.5)
+        assert len(update._s) == 2  # memory is bounded
+
+
+class TestHistory: 
+    """Check recording options of optimization history."""
+
+    @staticmethod
+    def run(history: jenn.core.optimization.History, max_iter: int = 10):
+        """Record cost y = 10 - i (best at i = 5) for each iteration i."""
+        for i in range(max_iter):
+            y = 10.0 - i if i <= 5 else float(i)
+            history.record(i, y, np.full((2, 1), float(i)))
+        return history
+
+    def test_every(self):
+        """Test that every k-th iteration is recorded."""
+        history = self.run(jenn.core.optimization.History(10, every=3))
+        assert np.all(history.iteration == [0, 3, 6, 9])
+        assert np.all(history.cost == [10.0, 7.0, 6.0, 9.0])
+        assert history.params is None  # parameters not kept by default
+        assert history.best_params is None
+
+    def test_off(self):
+        """Test that nothing is recorded."""
+        history = self.run(jenn.core.optimization.History(10, every=0))
+        assert history.cost.size == 0
+
+    def test_ring_buffer(self):
+        """Test that only the last values are kept (in order)."""
+        history = jenn.core.optimization.History(10, size=4, is_params=True)
+        self.run(history)
+        assert np.all(history.iteration == [6, 7, 8, 9])
+        assert history._cost.size == 4  # preallocated, never grows
+        assert [x[0, 0] for x in history.params] == [6.0, 7.0, 8.0, 9.0]
+
+    def test_best(self):
+        """Test that the parameters with lowest cost are kept."""
+        history = self.run(jenn.core.optimization.History(10, is_best=True))
+        assert history.best_iteration == 5
+        assert history.best_cost == 5.0
+        assert np.all(history.best_params == 5.0)
+
+    def test_grow(self):
+        """Test that more iterations than preallocated can be recorded."""
+        history = self.run(jenn.core.optimization.History(3), max_iter=10)
+        assert np.all(history.iteration == np.arange(10))
+
 
 class TestOptimizer: 
     """Test optimizer using banana Rosenbrock function."""
@@ -107,7 +290,7 @@ class TestOptimizer:
                     [X1[i, j]],
                     [X2[i, j]],
                 ])
-                Y[i, j] = f(X)
+                Y[i, j] = f(X).item()
 
         if not MATPLOTLIB_INSTALLED:
             # raise ImportError("Matplotlib must be installed.")
@@ -136,5 +319,50 @@ class TestOptimizer:
         assert np.allclose(xf[1], 1.0, atol=0.2)
 
 
+    def test_rosenbrock_lbfgs(self, max_iter: int = 200):
+        """Check that L-BFGS converges to the optimum of rosenbrock function."""
+        x0 = np.array([1.25, -1.75]).reshape((2, 1))
+        f = lambda x: jenn.synthetic.Rosenbrock.evaluate(x).item()
+        dfdx = jenn.synthetic.Rosenbrock.first_derivative
+        opt = jenn.core.optimization.LBFGSOptimizer()
+        xf = opt.minimize(x0, f, dfdx, max_iter=max_iter)
+        assert np.allclose(xf, 1.0, atol=1e-6)
+        assert len(opt.cost_history) < 50  # vs. about 1000 for ADAM
+
+
+class TestLM: 
+    """Test Levenberg-Marquardt using banana Rosenbrock function written 
+    as least squares problem."""
+
+    @staticmethod
+    def residuals(x: np.ndarray) -> np.ndarray:
+        """Return residuals r such that rosenbrock = r.T r."""
+        return np.array([10 * (x[1, 0] - x[0, 0] ** 2), 1 - x[0, 0]])
+
+    @staticmethod
+    def jacobian(x: np.ndarray) -> np.ndarray:
+        """Return Jacobian of residuals."""
+        return np.array([[-20 * x[0, 0], 10.0], [-1.0, 0.0]])
+
+    def test_rosenbrock(self, max_iter: int = 100):
+        """Check that LM converges to the optimum in few iterations."""
+        x0 = np.array([1.25, -1.75]).reshape((2, 1))
+        opt = jenn.core.optimization.LMOptimizer()
+        xf = opt.minimize(x0, self.residuals, self.jacobian, max_iter=max_iter)
+        assert np.allclose(xf, 1.0, atol=1e-6)
+        assert len(opt.cost_history) < 20
+        assert np.all(np.diff(opt.cost_history) <= 0.0)  # only accepts descent
+
+    def test_underdetermined(self):
+        """Check that fewer residuals than parameters yields minimum norm 
+        step (solved in residual space)."""
+        J = np.array([[1.0, 2.0, 3.0]])
+        f = lambda x: J @ x.ravel() - 6.0
+        opt = jenn.core.optimization.LMOptimizer()
+        xf = opt.minimize(np.zeros((3, 1)), f, lambda x: J, max_iter=20)
+        assert np.allclose(J @ xf, 6.0)
+        assert np.allclose(xf.ravel(), 6.0 * J.ravel() / 14.0)  # min norm
+
+
 if __name__ == "__main__":
     TestOptimizer.test_rosenbrock(alpha=0.1, max_iter=1_000, is_adam=True, is_plot=True)
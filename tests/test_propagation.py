@@ -4,7 +4,9 @@ parameters is known exactly."""
 import numpy as np
 import pytest 
 from copy import deepcopy
-from typing import List
+from importlib.util import find_spec
+from time import time
+from typing import List, Tuple
 
 import jenn
 
@@ -172,4 +174,294 @@ class TestXOR:
         assert _grad_check(dydx, dydx_FD)
 
 
+class TestPartialsSubset: 
+    """Check gradient-enhanced backprop when the Jacobian is only 
+    provided for a subset of inputs."""
+
+    @pytest.fixture
+    def data(self) -> jenn.core.data.Dataset:
+        """Return Rosenbrock data with partials w.r.t. last input only."""
+        x, y, dydx = jenn.synthetic.Rosenbrock.sample(0, 3)
+        return jenn.core.data.Dataset(x, y, dydx[:, [1], :], wrt=[1])
+
+    @pytest.fixture
+    def params(self) -> jenn.core.parameters.Parameters:
+        """Return random parameters."""
+        parameters = jenn.core.parameters.Parameters(layer_sizes=[2, 3, 1])
+        parameters.initialize(random_state=0)
+        return parameters
+
+    def test_partials_forward(
+            self, 
+            data: jenn.core.data.Dataset, 
+            params: jenn.core.parameters.Parameters, 
+        ) -> None:
+        """Test that subset of partials matches corresponding full partials."""
+        cache = jenn.core.cache.Cache(params.layer_sizes, data.m)
+        expected = jenn.core.propagation.partials_forward(data.X, params, cache)
+        cache = jenn.core.cache.Cache(params.layer_sizes, data.m, n_p=1)
+        computed = jenn.core.propagation.partials_forward(
+            data.X, params, cache, wrt=[1])
+        assert computed.shape == (1, 1, data.m)
+        assert np.allclose(computed, expected[:, [1], :])
+
+    def test_model_backward(
+            self, 
+            data: jenn.core.data.Dataset, 
+            params: jenn.core.parameters.Parameters, 
+        ) -> None:
+        """Test gradient-enhanced backprop against finite difference."""
+        cache = jenn.core.cache.Cache(params.layer_sizes, data.m, n_p=data.n_p)
+        jenn.core.propagation.model_partials_forward(
+            data.X, params, cache, data.wrt)  # predict to populate cache
+        jenn.core.propagation.model_backward(
+            data, params, cache)  # partials computed in place
+
+        def cost_FD(x):
+            parameters = deepcopy(params)  # make copy b/c arrays updated in place
+            cost = jenn.core.cost.Cost(data, parameters)
+            parameters.unstack(x)
+            Y_pred, J_pred = jenn.core.propagation.model_partials_forward(
+                data.X, parameters, deepcopy(cache), data.wrt)
+            return cost.evaluate(Y_pred, J_pred)
+
+        dydx = params.stack_partials_per_layer()
+        dydx_FD = _finite_difference(cost_FD, params.stack_per_layer())
+
+        assert _grad_check(dydx, dydx_FD)
+
+
+def test_activation_derivatives_computed_once(monkeypatch: pytest.MonkeyPatch):
+    """Check that backprop reuses activation derivatives from forward prop."""
+    x, y, dydx = jenn.synthetic.Rastrigin.sample(0, 3)
+    data = jenn.core.data.Dataset(x, y, dydx)
+    params = jenn.core.parameters.Parameters([2, 5, 4, 1])
+    params.initialize(random_state=0)
+    cache = jenn.core.cache.Cache(params.layer_sizes, data.m)
+    jenn.core.propagation.model_partials_forward(data.X, params, cache)
+    expected = deepcopy(cache.G_prime)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("1st derivative recomputed")
+
+    for activation in jenn.core.activation.ACTIVATIONS.values():
+        monkeypatch.setattr(activation, 'first_derivative', fail)
+    jenn.core.propagation.model_backward(data, params, cache)
+    for computed, array in zip(cache.G_prime, expected):
+        assert np.all(computed == array)
+
+
+def test_backward_after_model_forward():
+    """Check that backprop after forward prop of the response only (which
+    does not compute activation derivatives) gives the same gradient as
+    after forward prop of the partials, including on a reused cache."""
+    x, y, _ = jenn.synthetic.Rastrigin.sample(0, 5)
+    data = jenn.core.data.Dataset(x, y)
+    params = jenn.core.parameters.Parameters([2, 6, 1])
+    params.initialize(random_state=0)
+    cache = jenn.core.cache.Cache(params.layer_sizes, data.m)
+    jenn.core.propagation.model_partials_forward(data.X, params, cache)
+    jenn.core.propagation.model_backward(data, params, cache)
+    expected = params.stack_partials().copy()
+    fresh = jenn.core.cache.Cache(params.layer_sizes, data.m)
+    jenn.core.propagation.model_forward(data.X, params, fresh)
+    jenn.core.propagation.model_backward(data, params, fresh)
+    assert np.allclose(params.stack_partials(), expected, rtol=1e-14)
+    params.W[1] += 1.0  # leaves derivatives of other parameters in cache
+    jenn.core.propagation.model_partials_forward(data.X, params, cache)
+    params.W[1] -= 1.0
+    jenn.core.propagation.model_forward(data.X, params, cache)
+    jenn.core.propagation.model_backward(data, params, cache)
+    assert np.allclose(params.stack_partials(), expected, rtol=1e-14)
+
+class TestActivationSpecializations: 
+    """Check code paths that skip multiplications by g' = 1 and g'' = 0."""
+
+    @pytest.fixture
+    def data(self) -> jenn.core.data.Dataset:
+        """Return Rastrigin data with partials."""
+        x, y, dydx = jenn.synthetic.Rastrigin.sample(1000, 0, random_state=0)
+        return jenn.core.data.Dataset(x, y, dydx)
+
+    @staticmethod
+    def _generic(monkeypatch: pytest.MonkeyPatch) -> None:
+        """Disable specializations, so that all activations are treated alike."""
+        for name in ['_is_linear', '_is_piecewise_linear']:
+            monkeypatch.setattr(
+                jenn.core.propagation, name, lambda parameters, layer: False)
+
+    @staticmethod
+    def _propagate(
+            data: jenn.core.data.Dataset, 
+            params: jenn.core.parameters.Parameters, 
+        ) -> Tuple[np.ndarray, ...]:
+        """Return response, partials, Hessian and gradient."""
+        cache = jenn.core.cache.Cache(params.layer_sizes, data.m, n_q=2)
+        H = jenn.core.propagation.model_hessian_forward(data.X, params, cache)[-1]
+        Y, J = jenn.core.propagation.model_partials_forward(data.X, params, cache)
+        jenn.core.propagation.model_backward(data, params, cache, lambd=0.1)
+        return Y.copy(), J.copy(), H.copy(), params.stack_partials()
+
+    @pytest.mark.parametrize('activation', ['tanh', 'relu', 'linear'])
+    def test_specializations(
+            self, 
+            data: jenn.core.data.Dataset, 
+            activation: str, 
+            monkeypatch: pytest.MonkeyPatch,
+        ):
+        """Check that specialized and generic code paths agree."""
+        params = jenn.core.parameters.Parameters([2, 5, 4, 1], activation)
+        params.initialize(random_state=0)
+        expected = self._propagate(data, params)
+        self._generic(monkeypatch)
+        computed = self._propagate(data, params)
+        for array_computed, array_expected in zip(computed, expected):
+            assert np.allclose(array_computed, array_expected, atol=1e-12)
+
+    @pytest.mark.benchmark
+    def test_speed(
+            self, 
+            data: jenn.core.data.Dataset, 
+            monkeypatch: pytest.MonkeyPatch, 
+            repeat: int = 300,
+        ):
+        """Benchmark output layer of default model (linear output activation)."""
+        params = jenn.core.parameters.Parameters([2, 16, 16, 1])
+        params.initialize(random_state=0)
+        cache = jenn.core.cache.Cache(params.layer_sizes, data.m)
+        jenn.core.propagation.model_partials_forward(data.X, params, cache)
+        layer = params.L - 1
+        elapsed = {}
+        for is_specialized in [True, False]:
+            if not is_specialized:
+                self._generic(monkeypatch)
+            best = np.inf
+            for _ in range(5):
+                tic = time()
+                for _ in range(repeat):
+                    jenn.core.propagation.next_layer_partials(layer, params, cache)
+                    jenn.core.propagation.next_layer_backward(
+                        layer, params, cache, data, 0.0)
+                    jenn.core.propagation.gradient_enhancement(
+                        layer, params, cache, data)
+                toc = time()
+                best = min(best, (toc - tic) / repeat)
+            elapsed[is_specialized] = best
+        # Speed about "1.7 x": 1.1e-4s > 6.5e-5s for m = 1000
+        assert elapsed[True] < elapsed[False]
+
+class TestNumbaBackend: 
+    """Check that Numba kernels agree with NumPy implementation."""
+
+    @pytest.fixture
+    def data(self) -> jenn.core.data.Dataset:
+        """Return Rastrigin data with partials."""
+        x, y, dydx = jenn.synthetic.Rastrigin.sample(0, 3)
+        return jenn.core.data.Dataset(x, y, dydx)
+
+    @staticmethod
+    def _propagate(
+            data: jenn.core.data.Dataset, 
+            params: jenn.core.parameters.Parameters, 
+        ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return response, partials and gradient after forward and backprop."""
+        cache = jenn.core.cache.Cache(params.layer_sizes, data.m)
+        Y, J = jenn.core.propagation.model_partials_forward(data.X, params, cache)
+        jenn.core.propagation.model_backward(data, params, cache, lambd=0.1)
+        return Y.copy(), J.copy(), params.stack_partials()
+
+    @pytest.mark.parametrize('activation', ['tanh', 'relu', 'linear'])
+    def test_kernels(
+            self, 
+            data: jenn.core.data.Dataset, 
+            activation: str, 
+            monkeypatch: pytest.MonkeyPatch,
+        ):
+        """Check that both backends yield the same result."""
+        params = jenn.core.parameters.Parameters([2, 5, 4, 1], activation)
+        params.initialize(random_state=0)
+        expected = self._propagate(data, params)
+        params.backend = 'numba'
+        # Kernels are plain python functions when numba is missing: force 
+        # their use, so they are tested either way (instead of falling back)
+        monkeypatch.setattr(jenn.core._numba, 'NUMBA_INSTALLED', True)
+        computed = self._propagate(data, params)
+        for array_computed, array_expected in zip(computed, expected):
+            assert np.allclose(array_computed, array_expected, atol=1e-12)
+
+    @pytest.mark.benchmark
+    @pytest.mark.skipif(
+        not jenn.core._numba.NUMBA_INSTALLED, reason="Numba not installed")
+    def test_speed(self, data: jenn.core.data.Dataset, repeat: int = 1_000):
+        """Benchmark Numba against NumPy backend for a small network."""
+        elapsed = {}
+        for backend in ['numpy', 'numba']:
+            params = jenn.core.parameters.Parameters(
+                [2, 8, 8, 1], backend=backend)
+            params.initialize(random_state=0)
+            self._propagate(data, params)  # warm up (JIT compilation)
+            tic = time()
+            for _ in range(repeat):
+                self._propagate(data, params)
+            toc = time()
+            elapsed[backend] = (toc - tic) / repeat
+        # Speed about "4 x": 4e-4s > 9e-5s for layer_sizes = [2, 8, 8, 1]
+        assert elapsed['numba'] < elapsed['numpy']
+
+    def test_unknown_backend(self):
+        """Check that unknown backend raises error."""
+        with pytest.raises(ValueError):
+            jenn.core.parameters.Parameters([2, 2, 1], backend='unknown')
+
+
+@pytest.mark.skipif(
+    find_spec('array_api_strict') is None, reason="array_api_strict not installed")
+class TestArrayNamespace: 
+    """Check that propagation in the strict reference array API namespace 
+    agrees with the NumPy implementation."""
+
+    @pytest.fixture
+    def data(self) -> jenn.core.data.Dataset:
+        """Return Rastrigin data with partials."""
+        x, y, dydx = jenn.synthetic.Rastrigin.sample(0, 3)
+        return jenn.core.data.Dataset(x, y, dydx)
+
+    @staticmethod
+    def _propagate(
+            data: jenn.core.data.Dataset, 
+            params: jenn.core.parameters.Parameters, 
+        ) -> Tuple[np.ndarray, ...]:
+        """Return response, partials, Hessian, cost and gradient."""
+        xp = params.xp
+        data = jenn.core.training._to_namespace(data, xp)
+        cache = jenn.core.cache.Cache(
+            params.layer_sizes, data.m, n_q=2, array_namespace=params.array_namespace)
+        _, _, H = jenn.core.propagation.model_hessian_forward(data.X, params, cache)
+        Y, J = jenn.core.propagation.model_partials_forward(data.X, params, cache)
+        cost = jenn.core.cost.Cost(data, params, lambd=0.1).evaluate(Y, J)
+        jenn.core.propagation.model_backward(data, params, cache, lambd=0.1)
+        arrays = [Y, J, H]
+        return tuple(
+            [np.asarray(np.from_dlpack(array)) for array in arrays] 
+            + [np.array(cost), params.stack_partials()]
+        )
+
+    @pytest.mark.parametrize('activation', ['tanh', 'relu', 'linear'])
+    def test_strict_namespace(self, data: jenn.core.data.Dataset, activation: str):
+        """Check that both namespaces yield the same result."""
+        results = []
+        for array_namespace in ['numpy', 'array_api_strict']:
+            params = jenn.core.parameters.Parameters(
+                [2, 5, 4, 1], activation, array_namespace=array_namespace)
+            params.initialize(random_state=0)
+            results.append(self._propagate(data, params))
+        expected, computed = results
+        for array_computed, array_expected in zip(computed, expected):
+            assert np.allclose(array_computed, array_expected, atol=1e-12)
+
+    def test_unknown_namespace(self):
+        """Check that modules that are not array namespaces raise error."""
+        with pytest.raises(ValueError):
+            jenn.core.parameters.Parameters([2, 2, 1], array_namespace='json')
+
 # TODO: add test(s) for gradient-enhanced backprop and forward prop of partials
\ No newline at end of file
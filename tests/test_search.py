@@ -0,0 +1,102 @@
+"""Test hyperparameter search with successive halving."""
+import json
+import jenn
+import numpy as np
+import pytest
+
+
+class Count(jenn.core.callbacks.Callback):
+    """Count iterations (to check what is trained)."""
+
+    def __init__(self):
+        self.count = 0
+
+    def on_iteration(self, epoch, batch, iteration, cost, params):
+        self.count += 1
+
+
+class TestSearch:
+    """Check search using sinusoid."""
+
+    x, y, dydx = jenn.synthetic.Sinusoid.sample(0, 30)
+
+    space = dict(
+        alpha=[0.001, 0.05],
+        layer_sizes=[[1, 3, 1], [1, 12, 1]],
+        gamma=[0.0, 1.0],
+    )
+
+    def search(self, **kwargs) -> jenn.model.NeuralNet:
+        """Search grid for a few iterations."""
+        return jenn.search.search(
+            self.space, self.x, self.y, self.dydx, min_iter=10, max_iter=100,
+            random_state=0, is_normalize=True, **kwargs)
+
+    def test_halving(self):
+        """Test that worse half is pruned at each rung and best complete
+        trial is returned, same as if it had been trained on its own."""
+        nn = self.search()
+        trials = nn.history['search']
+        assert len(trials) == 8
+        rungs = [trial['rung'] for trial in trials]
+        assert sorted(rungs) == [0, 0, 0, 0, 1, 1, 2, 3]
+        for trial in trials:
+            if trial['iterations'] is not None:  # pruned
+                assert trial['iterations'] == 10 * 2 ** trial['rung']
+        best = min(trials, key=lambda trial: trial['loss'])
+        assert best['iterations'] is None  # complete
+        data = jenn.core.data.Dataset(self.x, self.y, self.dydx)
+        data, validation = data.split(0.2, random_state=0)
+        expected = jenn.model.NeuralNet(best['config']['layer_sizes']).fit(
+            data.X, data.Y, data.J, alpha=best['config']['alpha'],
+            gamma=best['config']['gamma'], max_iter=100, random_state=0,
+            is_normalize=True)
+        assert np.array_equal(nn.parameters.stack(), expected.parameters.stack())
+        assert np.array_equal(
+            nn.history['epoch_0']['batch_0'], expected.history['epoch_0']['batch_0'])
+        assert np.isclose(best['loss'], jenn.search._loss(expected, validation))
+
+    def test_random(self, n_trials: int = 5):
+        """Test that random configurations are sampled within ranges, and
+        that trials trained in processes give the same result."""
+        space = dict(alpha=(1e-3, 1e-1), layer_sizes=[[1, 6, 1]], max_iter=(20, 60))
+        kwargs = dict(n_trials=n_trials, min_iter=10, random_state=0)
+        nn = jenn.search.search(space, self.x, self.y, **kwargs)
+        trials = nn.history['search']
+        assert len(trials) == n_trials
+        assert all(1e-3 <= trial['config']['alpha'] <= 1e-1 for trial in trials)
+        assert all(20 <= trial['config']['max_iter'] <= 60 for trial in trials)
+        assert all(isinstance(trial['config']['max_iter'], int) for trial in trials)
+        parallel = jenn.search.search(space, self.x, self.y, n_jobs=2, **kwargs)
+        assert parallel.history['search'] == trials
+        assert np.array_equal(parallel.parameters.stack(), nn.parameters.stack())
+        with pytest.raises(ValueError):
+            jenn.search.search(space, self.x, self.y)  # ranges need n_trials
+
+    def test_journal(self, tmp_path):
+        """Test that interrupted search resumes from journal."""
+        journal = tmp_path / 'search.jsonl'
+        count = Count()
+        expected = self.search(journal=journal, callbacks=[count])
+        total = count.count
+        lines = journal.read_text().splitlines()
+        assert json.loads(lines[0]) == dict(random_state=0)
+        assert len(lines) == 1 + 8 + 4 + 2 + 1  # one record per trial and rung
+        assert (tmp_path / 'search_checkpoints').is_dir()
+        count = Count()
+        nn = self.search(journal=journal, callbacks=[count])  # all done
+        assert count.count == 0
+        assert nn.history['search'] == expected.history['search']
+        assert np.array_equal(nn.parameters.stack(), expected.parameters.stack())
+        # Killed during third rung, before last trial was checkpointed
+        journal.write_text('\n'.join(lines[:13]) + '\n{"trial": 6, "ru')
+        for path in (tmp_path / 'search_checkpoints').glob('trial_7.*'):
+            path.unlink()
+        nn = self.search(journal=journal, callbacks=[count])
+        assert 0 < count.count < total
+        assert nn.history['search'] == expected.history['search']
+        assert np.array_equal(nn.parameters.stack(), expected.parameters.stack())
+        with pytest.raises(ValueError):  # journal of another search
+            jenn.search.search(
+                dict(alpha=[0.01]), self.x, self.y, journal=journal,
+                layer_sizes=[1, 3, 1])